@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+# /// script
+# requires-python = ">=3.12"
+# dependencies = []
+# ///
+"""
+This script changes the folder layout of the picture archive, e.g. from the
+flat YYYY-MM-DD folders written by image_syncer to YYYY/MM/YYYY-MM-DD, or back
+from YYYY/YYYY-MM-DD (year_organizer) to flat folders.
+
+Whole day folders are renamed, files are never copied, so even a large archive
+is restructured in seconds.
+"""
+
+import argparse
+import logging
+from pathlib import Path
+
+from papa_toolkit.archive_index import INDEX_FILENAME, ArchiveIndex
+from papa_toolkit.layout import Layout, apply_relayout, find_day_folders, plan_relayout
+from papa_toolkit.metrics import Metrics
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(levelname)s - %(message)s",
+    datefmt="%H:%M:%S",
+)
+_logger = logging.getLogger(__name__)
+
+
+def _print_banner():
+    """Print a nice banner for the application"""
+    print("=" * 70)
+    print("  🗂️  REORGANIZADOR DEL ARCHIVO DE FOTOS - PAPA TOOLKIT 📁")
+    print("=" * 70)
+    print()
+
+
+def _print_summary(stats, metrics: Metrics | None = None):
+    """Print a summary of the operation"""
+    print("\n" + "=" * 50)
+    print("  📊 RESUMEN DEL PROCESO")
+    print("=" * 50)
+    print(f"  Carpetas de día encontradas: {stats['found']}")
+    print(f"  Carpetas ya en su sitio: {stats['in_place']}")
+    print(f"  Carpetas movidas: {stats['moved']}")
+    print(f"  Carpetas renombradas (_NN): {stats['renamed']}")
+    print(f"  Errores: {stats['errors']}")
+    if stats["dry_run"]:
+        print("  🔍 Modo simulación - No se movieron carpetas")
+    if metrics is not None:
+        print("-" * 50)
+        for line in metrics.summary_lines("carpetas"):
+            print(line)
+    print("=" * 50)
+    print()
+
+
+def relayout_archive(
+    archive_folder: Path, pattern: str, dry_run: bool, workers: int = 4
+) -> None:
+    """
+    Move the day folders of the archive into the layout given by ``pattern``.
+
+    Args:
+        archive_folder: Root of the picture archive
+        pattern: Target layout, e.g. "YYYY/MM/YYYY-MM-DD" (see papa_toolkit.layout)
+        dry_run: If True, only show what would be moved
+        workers: Number of years moved in parallel
+    """
+    layout = Layout(pattern)
+    stats = {
+        "found": 0,
+        "in_place": 0,
+        "moved": 0,
+        "renamed": 0,
+        "errors": 0,
+        "dry_run": dry_run,
+    }
+    metrics = Metrics()
+
+    print("🔍 Buscando carpetas de día (YYYY-MM-DD)...")
+    with metrics.phase("scan"):
+        day_folders = find_day_folders(archive_folder)
+    stats["found"] = len(day_folders)
+    if not day_folders:
+        print("❌ No se encontraron carpetas con formato YYYY-MM-DD.")
+        return
+
+    with metrics.phase("plan"):
+        moves = plan_relayout(archive_folder, layout, day_folders)
+    stats["in_place"] = len(day_folders) - len(moves)
+    stats["renamed"] = sum(1 for m in moves if m.destination.name != m.source.name)
+    print(f"📋 {len(moves)} de {len(day_folders)} carpetas cambian de sitio.")
+    print()
+
+    if dry_run:
+        for move in moves:
+            _logger.debug(
+                "%s -> %s",
+                move.source.relative_to(archive_folder),
+                move.destination.relative_to(archive_folder),
+            )
+        stats["moved"] = len(moves)
+    elif moves:
+        with metrics.phase("move"):
+            done, errors = apply_relayout(archive_folder, moves, workers)
+        stats["moved"] = len(done)
+        stats["errors"] = len(errors)
+
+        # Keep the index written by image_syncer in sync with the new layout
+        if (archive_folder / INDEX_FILENAME).exists():
+            with metrics.phase("index"), ArchiveIndex(archive_folder) as index:
+                for move in done:
+                    index.rename_folder(move.source, move.destination)
+
+    metrics.add_items(len(day_folders))
+    metrics.stop()
+
+    # Print final summary
+    _print_summary(stats, metrics)
+
+    if stats["moved"] > 0:
+        print("✅ ¡Proceso completado exitosamente!")
+    else:
+        print("⚠️  No se movieron carpetas.")
+    print()
+
+
+def main() -> None:
+    # Print banner first
+    _print_banner()
+
+    parser = argparse.ArgumentParser(
+        description="Cambia la estructura de carpetas del archivo de fotos."
+    )
+    parser.add_argument(
+        "archive_folder",
+        type=Path,
+        help="Carpeta raíz del archivo de fotos",
+    )
+    parser.add_argument(
+        "-p",
+        "--pattern",
+        default="YYYY/YYYY-MM-DD",
+        help="Estructura de destino, p. ej. YYYY-MM-DD, YYYY/YYYY-MM-DD o "
+        "YYYY/MM/YYYY-MM-DD (por defecto: %(default)s)",
+    )
+    parser.add_argument(
+        "-n",
+        "--dry-run",
+        action="store_true",
+        help="Modo simulación (sin mover ni crear carpetas)",
+    )
+    parser.add_argument(
+        "-w",
+        "--workers",
+        type=int,
+        default=4,
+        help="Número de años movidos en paralelo (por defecto: %(default)s)",
+    )
+    parser.add_argument(
+        "-v",
+        "--verbose",
+        action="store_true",
+        help="Mostrar información detallada durante el proceso",
+    )
+    args = parser.parse_args()
+
+    # Set logging level based on verbose flag
+    if args.verbose:
+        logging.getLogger().setLevel(logging.DEBUG)
+
+    archive_folder = args.archive_folder
+    if not archive_folder.is_dir():
+        print(f"❌ Error: La carpeta no existe: {archive_folder}")
+        return
+
+    print(f"📂 Archivo de fotos: {archive_folder}")
+    print(f"🗂️  Estructura de destino: {args.pattern}")
+    if args.dry_run:
+        print("🔍 Modo simulación activado")
+    print()
+
+    try:
+        relayout_archive(
+            archive_folder, args.pattern, args.dry_run, max(1, args.workers)
+        )
+    except ValueError as e:
+        print(f"❌ Error: {e}")
+    except KeyboardInterrupt:
+        print("\n⏹️  Proceso interrumpido por el usuario.")
+    except OSError as e:
+        print(f"\n❌ Error inesperado: {e}")
+        if args.verbose:
+            _logger.error("Error detallado: %s", e, exc_info=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,6 @@
+"""
+Benchmarks of the papa-toolkit scripts on a synthetic archive.
+
+Run them from the repository root with ``python -m benchmarks.run``, see
+``python -m benchmarks.run --help``.
+"""
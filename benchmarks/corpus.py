@@ -0,0 +1,138 @@
+"""
+Generator of a synthetic upload folder and picture archive.
+
+The corpus mimics what the scripts see in practice: JPEGs with and without
+EXIF dates, WhatsApp named images, small MP4/MOV videos with an ``mvhd``
+creation time, junk files, and an archive with thousands of ``YYYY-MM-DD``
+folders. Files are small so generating even tens of thousands of them takes
+seconds; the benchmarks measure per-file overheads, not disk bandwidth.
+
+Generation is deterministic for a given seed.
+"""
+
+import io
+import random
+import struct
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import NamedTuple
+
+from PIL import Image
+
+# Fixed width placeholder patched with the date of each generated JPEG
+_EXIF_PLACEHOLDER = b"2000:01:01 00:00:00"
+_EXIF_DATETIME_ORIGINAL = 36867
+_EXIF_IFD = 0x8769
+
+_MAC_EPOCH = datetime(1904, 1, 1)
+_FIRST_DATE = datetime(2005, 1, 1)
+_DAYS = 20 * 365
+
+
+class Corpus(NamedTuple):
+    source: Path  # upload folder, input of organize_files
+    archive: Path  # flat YYYY-MM-DD folders, input of organize_folders_by_year
+    counts: dict[str, int]
+
+
+def _jpeg_template(with_exif: bool) -> bytes:
+    image = Image.new("RGB", (64, 48), (90, 120, 150))
+    buffer = io.BytesIO()
+    if with_exif:
+        exif = Image.Exif()
+        exif.get_ifd(_EXIF_IFD)[_EXIF_DATETIME_ORIGINAL] = _EXIF_PLACEHOLDER.decode()
+        image.save(buffer, "JPEG", exif=exif.tobytes())
+    else:
+        image.save(buffer, "JPEG")
+    return buffer.getvalue()
+
+
+def _box(box_type: bytes, payload: bytes) -> bytes:
+    return struct.pack(">I4s", 8 + len(payload), box_type) + payload
+
+
+def _video(brand: bytes, date: datetime) -> bytes:
+    """Minimal MP4/MOV: ``ftyp``, ``moov`` with a version 0 ``mvhd``."""
+    seconds = int((date - _MAC_EPOCH).total_seconds())
+    mvhd = struct.pack(">B3xIIII", 0, seconds, seconds, 1000, 1000) + bytes(80)
+    return _box(b"ftyp", brand + b"\0\0\0\0" + brand) + _box(
+        b"moov", _box(b"mvhd", mvhd)
+    ) + _box(b"mdat", bytes(256))
+
+
+def _random_date(rng: random.Random) -> datetime:
+    return _FIRST_DATE + timedelta(
+        days=rng.randrange(_DAYS), seconds=rng.randrange(86400)
+    )
+
+
+def _padding(rng: random.Random) -> bytes:
+    # Distinct sizes and contents, so that files are not taken as duplicates
+    return rng.randbytes(rng.randrange(1, 4096))
+
+
+def generate_corpus(
+    root: Path, files: int = 1000, date_folders: int = 2000, seed: int = 0
+) -> Corpus:
+    """
+    Write a corpus below ``root`` (which must be empty or missing).
+
+    Args:
+        root: Where to create the ``uploads`` and ``archive`` folders
+        files: Number of files in the upload folder
+        date_folders: Number of ``YYYY-MM-DD`` folders in the archive
+        seed: Seed of the random generator
+    """
+    rng = random.Random(seed)
+    source = root / "uploads"
+    archive = root / "archive"
+    source.mkdir(parents=True)
+    archive.mkdir(parents=True)
+
+    exif_jpeg = _jpeg_template(with_exif=True)
+    plain_jpeg = _jpeg_template(with_exif=False)
+    placeholder_at = exif_jpeg.index(_EXIF_PLACEHOLDER)
+
+    # Share of each kind of file in the upload folder
+    kinds = ["exif_jpeg"] * 50 + ["whatsapp"] * 20 + ["plain_jpeg"] * 10
+    kinds += ["mp4"] * 8 + ["mov"] * 4 + ["junk"] * 8
+    counts = dict.fromkeys(sorted(set(kinds)), 0)
+
+    for i in range(files):
+        kind = rng.choice(kinds)
+        counts[kind] += 1
+        date = _random_date(rng)
+        if kind == "exif_jpeg":
+            stamp = date.strftime("%Y:%m:%d %H:%M:%S").encode()
+            data = (
+                exif_jpeg[:placeholder_at]
+                + stamp
+                + exif_jpeg[placeholder_at + len(stamp) :]
+            )
+            name = f"DSC_{i:06d}.jpg"
+        elif kind == "whatsapp":
+            data = plain_jpeg
+            name = f"IMG-{date:%Y%m%d}-WA{i % 10000:04d}.jpg"
+        elif kind == "plain_jpeg":
+            # No date at all: skipped by organize_files
+            data = plain_jpeg
+            name = f"scan_{i:06d}.jpg"
+        elif kind == "mp4":
+            data = _video(b"isom", date)
+            name = f"VID_{i:06d}.mp4"
+        elif kind == "mov":
+            data = _video(b"qt  ", date)
+            name = f"IMG_{i:06d}.MOV"
+        else:
+            data = b""
+            name = rng.choice([f"notes_{i}.txt", f"{i}.picasa.ini", f"data_{i}.bin"])
+        (source / name).write_bytes(data + _padding(rng))
+
+    days = rng.sample(range(_DAYS), min(date_folders, _DAYS))
+    for day in days:
+        folder = archive / f"{_FIRST_DATE + timedelta(days=day):%Y-%m-%d}"
+        folder.mkdir()
+        (folder / "IMG_0001.jpg").write_bytes(plain_jpeg)
+    counts["date_folders"] = len(days)
+
+    return Corpus(source, archive, counts)
@@ -0,0 +1,231 @@
+"""
+Run the benchmarks and save the results as JSON.
+
+Every phase runs on a freshly generated corpus (generation is not timed) and
+is repeated a few times; the best time is the figure to compare, the others
+show the noise. Results of two commits can be compared with ``--compare``.
+
+    python -m benchmarks.run --files 5000 --out before.json
+    python -m benchmarks.run --files 5000 --out after.json --compare before.json
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import logging
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+import image_syncer
+import year_organizer
+from papa_toolkit.filename_dates import parse_filename_dates
+from papa_toolkit.media_types import detect_media_type
+from papa_toolkit.move_executor import MoveExecutor
+from papa_toolkit.scanner import scan_files
+
+from .corpus import Corpus, generate_corpus
+
+
+def _bench_scan(corpus: Corpus) -> int:
+    return sum(1 for _ in scan_files(corpus.source))
+
+
+def _bench_detect(corpus: Corpus) -> int:
+    files = list(scan_files(corpus.source))
+    for source in files:
+        detect_media_type(source.path)
+    return len(files)
+
+
+def _bench_dates(corpus: Corpus) -> int:
+    files = list(scan_files(corpus.source))
+    for source in files:
+        image_syncer._analyze_file(source, None)
+    return len(files)
+
+
+def _bench_filenames(corpus: Corpus) -> int:
+    names = os.listdir(corpus.source)
+    parse_filename_dates(names)
+    return len(names)
+
+
+def _bench_move(corpus: Corpus) -> int:
+    analyzed = [
+        info
+        for info in image_syncer._analyze_files(scan_files(corpus.source), None, 1)
+        if info.date_taken is not None
+    ]
+    destination = corpus.source.parent / "organized"
+    with MoveExecutor() as mover:
+        for info in analyzed:
+            target = destination / info.date_taken.strftime("%Y-%m-%d") / info.path.name
+            mover.move(info.path, mover.unique_destination(target))
+    return len(analyzed)
+
+
+def _bench_organize(corpus: Corpus) -> int:
+    files = sum(1 for _ in scan_files(corpus.source))
+    image_syncer.organize_files(
+        corpus.source, corpus.source.parent / "organized", False, cache=None
+    )
+    return files
+
+
+def _bench_year_folders(corpus: Corpus) -> int:
+    year_organizer.organize_folders_by_year(corpus.archive, False)
+    return corpus.counts["date_folders"]
+
+
+# Phase name -> function timed on a fresh corpus, returns the items processed
+BENCHMARKS: dict[str, Callable[[Corpus], int]] = {
+    "scan": _bench_scan,
+    "detect": _bench_detect,
+    "dates": _bench_dates,
+    "filenames": _bench_filenames,
+    "move": _bench_move,
+    "organize_files": _bench_organize,
+    "year_folders": _bench_year_folders,
+}
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmark(
+    name: str, files: int, date_folders: int, repeat: int, workdir: Path
+) -> dict:
+    """Time one phase ``repeat`` times, each on a new corpus."""
+    timings = []
+    items = 0
+    for i in range(repeat):
+        root = Path(tempfile.mkdtemp(prefix=f"{name}-", dir=workdir))
+        try:
+            corpus = generate_corpus(root, files, date_folders, seed=i)
+            # The scripts print progress, only the timing matters here
+            with contextlib.redirect_stdout(io.StringIO()):
+                start = time.perf_counter()
+                items = BENCHMARKS[name](corpus)
+                timings.append(time.perf_counter() - start)
+        finally:
+            shutil.rmtree(root, ignore_errors=True)
+
+    best = min(timings)
+    return {
+        "items": items,
+        "best_s": best,
+        "median_s": statistics.median(timings),
+        "timings_s": timings,
+        "items_per_s": items / best if best else None,
+    }
+
+
+def _print_comparison(results: dict, baseline: dict) -> None:
+    print(f"\nComparación con {baseline.get('commit') or 'la referencia'}:")
+    for name, result in results["results"].items():
+        before = baseline.get("results", {}).get(name)
+        if not before:
+            continue
+        ratio = result["best_s"] / before["best_s"] if before["best_s"] else 0
+        print(
+            f"  {name:16} {before['best_s'] * 1000:9.1f} ms -> "
+            f"{result['best_s'] * 1000:9.1f} ms  ({ratio:.2f}x)"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Mide el rendimiento de las fases de los scripts."
+    )
+    parser.add_argument(
+        "-f",
+        "--files",
+        type=int,
+        default=2000,
+        help="Archivos en la carpeta de subidas (por defecto: %(default)s)",
+    )
+    parser.add_argument(
+        "-d",
+        "--date-folders",
+        type=int,
+        default=2000,
+        help="Carpetas YYYY-MM-DD en el archivo (por defecto: %(default)s)",
+    )
+    parser.add_argument(
+        "-r",
+        "--repeat",
+        type=int,
+        default=3,
+        help="Repeticiones de cada fase (por defecto: %(default)s)",
+    )
+    parser.add_argument(
+        "-b",
+        "--benchmark",
+        choices=list(BENCHMARKS),
+        action="append",
+        help="Fase a medir (se puede repetir), por defecto todas",
+    )
+    parser.add_argument(
+        "--workdir",
+        type=Path,
+        help="Carpeta donde generar los archivos de prueba (por defecto la temporal)",
+    )
+    parser.add_argument(
+        "-o", "--out", type=Path, help="Guardar los resultados en este archivo JSON"
+    )
+    parser.add_argument(
+        "--compare", type=Path, help="Resultados JSON de referencia a comparar"
+    )
+    args = parser.parse_args()
+
+    # Errors and warnings of the scripts are expected on junk files
+    logging.disable(logging.CRITICAL)
+
+    results = {
+        "commit": _git_commit(),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "params": {
+            "files": args.files,
+            "date_folders": args.date_folders,
+            "repeat": args.repeat,
+        },
+        "results": {},
+    }
+    for name in args.benchmark or BENCHMARKS:
+        result = run_benchmark(
+            name, args.files, args.date_folders, max(1, args.repeat), args.workdir
+        )
+        results["results"][name] = result
+        print(
+            f"  {name:16} {result['best_s'] * 1000:9.1f} ms  "
+            f"{result['items_per_s'] or 0:10.0f} /s  ({result['items']})"
+        )
+
+    if args.out:
+        args.out.write_text(json.dumps(results, indent=2))
+        print(f"\nResultados guardados en {args.out}")
+    if args.compare:
+        _print_comparison(results, json.loads(args.compare.read_text()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+# /// script
+# requires-python = ">=3.12"
+# dependencies = [
+#     "send2trash",
+# ]
+# ///
+"""
+This script finds pictures and videos that are stored more than once in the
+archive, comparing their content rather than their names. Duplicates can be
+listed or sent to the recycle bin, always keeping one copy of each file.
+
+It replaces the old scripts/borraduplicados.py, that only looked at names
+ending in " (2)" or " - copia" and compared files by size.
+"""
+
+import argparse
+import logging
+from pathlib import Path
+
+from papa_toolkit.duplicates import find_duplicates
+from papa_toolkit.metrics import format_size
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(levelname)s - %(message)s",
+    datefmt="%H:%M:%S",
+)
+_logger = logging.getLogger(__name__)
+
+
+def _print_banner():
+    """Print a nice banner for the application"""
+    print("=" * 70)
+    print("  🔎 BUSCADOR DE ARCHIVOS DUPLICADOS - PAPA TOOLKIT 🗑️")
+    print("=" * 70)
+    print()
+
+
+def _print_summary(stats):
+    """Print a summary of the operation"""
+    print("\n" + "=" * 50)
+    print("  📊 RESUMEN DEL PROCESO")
+    print("=" * 50)
+    print(f"  Grupos de duplicados: {stats['groups']}")
+    print(f"  Archivos duplicados: {stats['duplicates']}")
+    print(f"  Espacio recuperable: {format_size(stats['bytes'])}")
+    print(f"  Enviados a la papelera: {stats['trashed']}")
+    print(f"  Errores: {stats['errors']}")
+    if stats["dry_run"]:
+        print("  🔍 Modo simulación - No se borraron archivos")
+    print("=" * 50)
+    print()
+
+
+def remove_duplicates(
+    folders: list[Path], dry_run: bool, workers: int = 4, min_size: int = 1
+) -> None:
+    """
+    Find identical files below ``folders`` and send the extra copies to the trash.
+
+    Args:
+        folders: Folders to search, duplicates are also found across them
+        dry_run: If True, only list the duplicates
+        workers: Number of threads hashing files
+        min_size: Files smaller than this (in bytes) are ignored
+    """
+    stats = {
+        "groups": 0,
+        "duplicates": 0,
+        "bytes": 0,
+        "trashed": 0,
+        "errors": 0,
+        "dry_run": dry_run,
+    }
+
+    if not dry_run:
+        # Optional dependency, only needed to actually remove files
+        from send2trash import send2trash
+
+    print("🔍 Comparando archivos (tamaño, principio/final y contenido)...")
+    groups = find_duplicates(folders, workers=workers, min_size=min_size)
+
+    if not groups:
+        print("✅ No se encontraron archivos duplicados.")
+        return
+
+    for size, paths in sorted(groups, key=lambda g: g.paths[0]):
+        original, *duplicates = paths
+        stats["groups"] += 1
+        stats["duplicates"] += len(duplicates)
+        stats["bytes"] += size * len(duplicates)
+
+        print(f"\n  ✔ {original}")
+        for duplicate in duplicates:
+            print(f"    ✖ {duplicate}")
+            if dry_run:
+                continue
+            try:
+                send2trash(duplicate)
+                stats["trashed"] += 1
+            except OSError as e:
+                stats["errors"] += 1
+                _logger.error("Error borrando '%s': %s", duplicate, e)
+
+    _print_summary(stats)
+
+
+def main() -> None:
+    # Print banner first
+    _print_banner()
+
+    parser = argparse.ArgumentParser(
+        description="Busca archivos con el mismo contenido y envía las copias a la papelera."
+    )
+    parser.add_argument(
+        "folders",
+        type=Path,
+        nargs="+",
+        help="Carpetas donde buscar duplicados (se incluyen las subcarpetas)",
+    )
+    parser.add_argument(
+        "-n",
+        "--dry-run",
+        action="store_true",
+        help="Modo simulación (solo listar los duplicados)",
+    )
+    parser.add_argument(
+        "-w",
+        "--workers",
+        type=int,
+        default=4,
+        help="Número de hilos leyendo archivos en paralelo (por defecto: %(default)s)",
+    )
+    parser.add_argument(
+        "--min-size",
+        type=int,
+        default=1,
+        help="Ignorar archivos más pequeños que este tamaño en bytes (por defecto: %(default)s)",
+    )
+    parser.add_argument(
+        "-v",
+        "--verbose",
+        action="store_true",
+        help="Mostrar información detallada durante el proceso",
+    )
+    args = parser.parse_args()
+
+    # Set logging level based on verbose flag
+    if args.verbose:
+        logging.getLogger().setLevel(logging.DEBUG)
+
+    for folder in args.folders:
+        if not folder.is_dir():
+            print(f"❌ Error: La carpeta no existe: {folder}")
+            return
+
+    if args.dry_run:
+        print("🔍 Modo simulación activado")
+        print()
+
+    try:
+        remove_duplicates(args.folders, args.dry_run, max(1, args.workers), args.min_size)
+    except KeyboardInterrupt:
+        print("\n⏹️  Proceso interrumpido por el usuario.")
+    except ImportError:
+        print("❌ Error: Instale send2trash para poder borrar duplicados.")
+    except OSError as e:
+        print(f"\n❌ Error inesperado: {e}")
+        if args.verbose:
+            _logger.error("Error detallado: %s", e, exc_info=True)
+
+
+if __name__ == "__main__":
+    main()
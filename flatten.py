@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+# /// script
+# requires-python = ">=3.12"
+# dependencies = []
+# ///
+"""
+This script moves all the files of a folder and its subfolders into a single
+flat folder, e.g. to gather the pictures of an old backup before importing
+them with image_syncer.
+
+Repeated files are only kept once and files that share a name with a
+different one get a " (n)" suffix, so nothing is overwritten.
+"""
+
+import argparse
+import logging
+from pathlib import Path
+
+from papa_toolkit.flatten import apply_flatten, plan_flatten
+from papa_toolkit.metrics import Metrics, format_size
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(levelname)s - %(message)s",
+    datefmt="%H:%M:%S",
+)
+_logger = logging.getLogger(__name__)
+
+# Picasa and Windows folder settings are not worth keeping in a flat folder,
+# nor hidden files and folders such as the thumbnails of an archive
+exclude = {
+    "*.ini",
+    ".*",
+}
+
+
+def _print_banner():
+    """Print a nice banner for the application"""
+    print("=" * 70)
+    print("  🗃️  APLANADOR DE CARPETAS - PAPA TOOLKIT 📁")
+    print("=" * 70)
+    print()
+
+
+def _print_summary(stats, metrics: Metrics | None = None):
+    """Print a summary of the operation"""
+    print("\n" + "=" * 50)
+    print("  📊 RESUMEN DEL PROCESO")
+    print("=" * 50)
+    print(f"  Archivos encontrados: {stats['found']}")
+    print(f"  Archivos movidos: {stats['moved']}")
+    print(f"  Renombrados por coincidir el nombre: {stats['renamed']}")
+    print(f"  Repetidos eliminados: {stats['dropped']}")
+    print(f"  Errores: {stats['errors']}")
+    if stats["dry_run"]:
+        print("  🔍 Modo simulación - No se movieron archivos")
+    if metrics is not None:
+        print("-" * 50)
+        for line in metrics.summary_lines():
+            print(line)
+    print("=" * 50)
+    print()
+
+
+def flatten_folder(
+    source_folder: Path,
+    destination_folder: Path,
+    dry_run: bool,
+    workers: int = 4,
+    exclude_patterns: set[str] | None = None,
+) -> None:
+    """
+    Move the files under ``source_folder`` into ``destination_folder``.
+
+    Args:
+        source_folder: Folder tree to flatten
+        destination_folder: Flat folder, may be inside the source folder
+        dry_run: If True, only show what would be done
+        workers: Number of files moved in parallel
+        exclude_patterns: Globs of files and folders to leave in place,
+            defaults to the module level ``exclude``
+    """
+    stats = {
+        "found": 0,
+        "moved": 0,
+        "renamed": 0,
+        "dropped": 0,
+        "errors": 0,
+        "dry_run": dry_run,
+    }
+    metrics = Metrics()
+
+    print("🔍 Buscando archivos y planificando los nombres...")
+    with metrics.phase("plan"):
+        plan = plan_flatten(
+            source_folder,
+            destination_folder,
+            exclude if exclude_patterns is None else exclude_patterns,
+        )
+    stats["found"] = len(plan.moves) + len(plan.dropped)
+    stats["renamed"] = plan.renamed
+    if not stats["found"]:
+        print("❌ No se encontraron archivos para mover.")
+        return
+    print(
+        f"📋 {len(plan.moves)} archivos a mover ({format_size(plan.size)}), "
+        f"{len(plan.dropped)} repetidos."
+    )
+    print()
+
+    if dry_run:
+        for source, target in plan.moves:
+            _logger.debug("%s -> %s", source, target.name)
+        for path, kept in plan.dropped:
+            _logger.debug("%s repetido de %s", path, kept)
+        stats["moved"] = len(plan.moves)
+        stats["dropped"] = len(plan.dropped)
+    else:
+        with metrics.phase("move"):
+            result = apply_flatten(plan, destination_folder, workers)
+        stats["moved"] = result.moved
+        stats["dropped"] = result.dropped
+        stats["errors"] = len(result.errors)
+        metrics.add_bytes(plan.size)
+
+    metrics.add_items(stats["found"])
+    metrics.stop()
+
+    # Print final summary
+    _print_summary(stats, metrics)
+
+    if stats["moved"] > 0 or stats["dropped"] > 0:
+        print("✅ ¡Proceso completado exitosamente!")
+    else:
+        print("⚠️  No se movieron archivos.")
+    print()
+
+
+def main() -> None:
+    # Print banner first
+    _print_banner()
+
+    parser = argparse.ArgumentParser(
+        description="Mueve todos los archivos de una carpeta y sus subcarpetas "
+        "a una sola carpeta."
+    )
+    parser.add_argument(
+        "source_folder",
+        type=Path,
+        help="Carpeta de origen con subcarpetas",
+    )
+    parser.add_argument(
+        "destination_folder",
+        type=Path,
+        help="Carpeta donde reunir todos los archivos",
+    )
+    parser.add_argument(
+        "-n",
+        "--dry-run",
+        action="store_true",
+        help="Modo simulación (sin mover ni borrar archivos)",
+    )
+    parser.add_argument(
+        "-w",
+        "--workers",
+        type=int,
+        default=4,
+        help="Número de archivos movidos en paralelo (por defecto: %(default)s)",
+    )
+    parser.add_argument(
+        "--exclude",
+        action="append",
+        default=[],
+        metavar="PATRÓN",
+        help="Dejar en su sitio los archivos o carpetas que coincidan "
+        "(se puede repetir, *.ini siempre se excluye)",
+    )
+    parser.add_argument(
+        "-v",
+        "--verbose",
+        action="store_true",
+        help="Mostrar información detallada durante el proceso",
+    )
+    args = parser.parse_args()
+
+    # Set logging level based on verbose flag
+    if args.verbose:
+        logging.getLogger().setLevel(logging.DEBUG)
+
+    source_folder = args.source_folder.absolute()
+    destination_folder = args.destination_folder.absolute()
+    if not source_folder.is_dir():
+        print(f"❌ Error: La carpeta de origen no existe: {source_folder}")
+        return
+
+    print(f"📂 Carpeta de origen: {source_folder}")
+    print(f"📁 Carpeta de destino: {destination_folder}")
+    if args.dry_run:
+        print("🔍 Modo simulación activado")
+    print()
+
+    try:
+        flatten_folder(
+            source_folder,
+            destination_folder,
+            args.dry_run,
+            max(1, args.workers),
+            exclude | set(args.exclude),
+        )
+    except KeyboardInterrupt:
+        print("\n⏹️  Proceso interrumpido por el usuario.")
+    except OSError as e:
+        print(f"\n❌ Error inesperado: {e}")
+        if args.verbose:
+            _logger.error("Error detallado: %s", e, exc_info=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,6 +3,7 @@
 # requires-python = ">=3.12"
 # dependencies = [
 #     "pillow",
+#     "send2trash",
 # ]
 # ///
 """
@@ -13,15 +14,50 @@ should replace that.
 """
 
 import argparse
-import json
+import itertools
 import logging
-import re
-import shutil
-import subprocess
+import time
+from collections import deque
+from collections.abc import Iterable, Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
-
-from PIL import Image
+from typing import NamedTuple
+
+from papa_toolkit.archive_index import ArchiveIndex, ArchiveMatch
+from papa_toolkit.exif_reader import ExifError, read_exif_datetime
+from papa_toolkit.ffprobe import FFprobePool
+from papa_toolkit.file_ops import partial_path
+from papa_toolkit.filename_dates import parse_filename_date
+from papa_toolkit.layout import Layout
+from papa_toolkit.media_types import IMAGE, VIDEO, detect_media_type, media_kind
+from papa_toolkit.metadata_cache import MetadataCache, default_cache_path
+from papa_toolkit.metrics import Metrics, phase
+from papa_toolkit.move_executor import MoveExecutor
+from papa_toolkit.move_journal import (
+    JOURNAL_FILENAME,
+    JournalEntry,
+    MoveJournal,
+    read_journal,
+)
+from papa_toolkit.plan import PlanEntry, is_stale, read_plan, write_plan
+from papa_toolkit.prune import prune_folders
+from papa_toolkit.routing import (
+    DEFAULT_KEY,
+    DEFAULT_LAYOUT,
+    Route,
+    Router,
+    load_routes,
+    parse_route,
+)
+from papa_toolkit.scanner import SourceFile, scan_files
+from papa_toolkit.thumbnails import (
+    DEFAULT_MAX_BYTES as DEFAULT_THUMBNAILS_MAX_BYTES,
+    add_to_cache,
+    apply_thumbnails,
+    plan_thumbnails,
+)
+from papa_toolkit.video_reader import VideoMetadataError, read_video_datetime
 
 # Configure rich logging
 logging.basicConfig(
@@ -32,167 +68,513 @@ logging.basicConfig(
 _logger = logging.getLogger(__name__)
 
 
-def _get_video_creation_date(video_path: Path) -> datetime:
-    """Extract creation date from video metadata using ffprobe."""
-    ffprobe_cmd = _get_ffprobe_command()
-
-    result = subprocess.run(
-        [
-            ffprobe_cmd,
-            "-v",
-            "quiet",
-            "-print_format",
-            "json",
-            "-show_entries",
-            "format_tags=creation_time:stream_tags=creation_time",
-            str(video_path),
-        ],
-        capture_output=True,
-        text=True,
-        check=True,
-        shell=True,
-    )
-    metadata = json.loads(result.stdout)
-
-    # Try format tags first
-    creation_time = metadata.get("format", {}).get("tags", {}).get("creation_time")
-
-    # If not found, try stream tags
-    if not creation_time and "streams" in metadata:
-        for stream in metadata["streams"]:
-            creation_time = stream.get("tags", {}).get("creation_time")
-            if creation_time:
-                break
-
-    if creation_time:
-        # Handle different datetime formats
-        for fmt in ["%Y-%m-%dT%H:%M:%S.%fZ", "%Y-%m-%dT%H:%M:%SZ", "%Y-%m-%d %H:%M:%S"]:
-            try:
-                return datetime.strptime(creation_time, fmt)
-            except ValueError:
-                continue
-
-
-def _get_image_creation_date(image_path: Path) -> datetime:
+def _get_video_creation_date(
+    video_path: Path,
+    media_type: str,
+    ffprobe: FFprobePool | None,
+    metrics: Metrics | None = None,
+) -> datetime:
+    # Fast path: walk the MP4/MOV boxes, ffprobe only for other containers
+    try:
+        return read_video_datetime(video_path, media_type)
+    except VideoMetadataError as e:
+        _logger.debug("Falling back to ffprobe for %s: %s", video_path, e)
+    if ffprobe is None:
+        raise ValueError(f"ffprobe is not available to read {video_path.name}")
+    with phase(metrics, "ffprobe"):
+        return ffprobe.probe_creation_date(video_path)
+
+
+_EXIF_IFD = 0x8769
+
+
+def _get_image_creation_date(image_path: Path, media_type: str) -> datetime:
+    # Fast path: read only the EXIF bytes, without decoding the picture
+    try:
+        return read_exif_datetime(image_path, media_type)
+    except ExifError as e:
+        _logger.debug("Falling back to PIL for %s: %s", image_path, e)
+
+    # Imported here, decoding with PIL is rarely needed and slow to load
+    from PIL import Image
+
     with Image.open(image_path) as img:
         # EXIF (Exchangeable image file format) metadata
         exif_data = img.getexif()
         if exif_data:
-            date_taken = exif_data.get(36867)  # Tag for date and time original
+            # Tag for date and time original, normally inside the Exif IFD
+            date_taken = exif_data.get_ifd(_EXIF_IFD).get(36867) or exif_data.get(
+                36867
+            )
             if date_taken:
                 date_obj = datetime.strptime(date_taken, "%Y:%m:%d %H:%M:%S")
                 return date_obj
 
 
-_DATE_RE = re.compile(r"(\d{4}-\d{2}-\d{2})")
-_WHATSAPP_DATE_RE = re.compile(r"(\d{8})")  # Pattern for YYYYMMDD format
+exclude = {
+    "desktop.ini",
+}
+
+
+def _get_file_creation_date(
+    file_path: Path,
+    media_type: str | None,
+    ffprobe: FFprobePool | None = None,
+    metrics: Metrics | None = None,
+) -> datetime:
+    """Extract the creation date of a file already classified by its media type."""
+    kind = media_kind(media_type)
+    if kind == IMAGE:
+        return _get_image_creation_date(file_path, media_type)
+    elif kind == VIDEO:
+        return _get_video_creation_date(file_path, media_type, ffprobe, metrics)
+    raise ValueError(f"Unsupported file type: {file_path.name}")
+
+
+class _FileInfo(NamedTuple):
+    """Result of inspecting a single source file."""
+
+    path: Path
+    media_type: str | None  # as detected by papa_toolkit.media_types
+    kind: str | None  # IMAGE, VIDEO or None if it must be skipped
+    date_taken: datetime | None
+    size: int
+    mtime_ns: int
+
+
+# Number of files queued per worker ahead of the one being moved
+_PREFETCH_PER_WORKER = 4
 
 
-def _get_date_from_filename(filename: str) -> datetime | None:
-    # Try standard YYYY-MM-DD format first
-    match = _DATE_RE.search(filename)
-    if match:
-        date_str = match.group(0)
-        return datetime.strptime(date_str, "%Y-%m-%d")
-    
-    # Try WhatsApp format (IMG-YYYYMMDD-WAxxxx.jpg)
-    match = _WHATSAPP_DATE_RE.search(filename)
-    if match:
-        date_str = match.group(0)
+def _analyze_file(
+    source: SourceFile,
+    file_types: list | None,
+    cache: MetadataCache | None = None,
+    ffprobe: FFprobePool | None = None,
+    metrics: Metrics | None = None,
+) -> _FileInfo:
+    """Classify a file and find out its date. Safe to run from worker threads."""
+    start = time.perf_counter()
+    file_info = _inspect_file(source, file_types, cache, ffprobe, metrics)
+    if metrics is not None:
+        metrics.add_latency(
+            file_info.media_type or "otros", time.perf_counter() - start
+        )
+    return file_info
+
+
+def _inspect_file(
+    source: SourceFile,
+    file_types: list | None,
+    cache: MetadataCache | None,
+    ffprobe: FFprobePool | None,
+    metrics: Metrics | None,
+) -> _FileInfo:
+    source_path, size, mtime_ns = source
+    cached = None
+    if cache is not None:
+        with phase(metrics, "cache"):
+            cached = cache.get(source_path, size, mtime_ns)
+
+    if cached is not None:
+        media_type, date_taken = cached
+    else:
+        # Classify by signature, reading only the first bytes of the file
         try:
-            return datetime.strptime(date_str, "%Y%m%d")
-        except ValueError:
-            pass
-    
-    return None
+            with phase(metrics, "detect"):
+                media_type = detect_media_type(source_path)
+        except OSError as e:
+            # Maybe locked by the sync client: skipped, but not cached, so it
+            # is tried again in the next run
+            _logger.warning("No se puede leer %s: %s", source_path, e)
+            return _FileInfo(source_path, None, None, None, size, mtime_ns)
+        date_taken = None
+    kind = media_kind(media_type)
 
+    # Skip files that are not supported
+    if kind is None:
+        if cache is not None and cached is None:
+            cache.put(source_path, size, mtime_ns, None, None)
+        return _FileInfo(source_path, None, None, None, size, mtime_ns)
 
-def _is_video(filename: str) -> bool:
-    video_extensions = (".mp4", ".mov", ".avi", ".mkv", ".wmv", ".flv", ".webm", ".m4v")
-    return filename.lower().endswith(video_extensions)
+    # Apply file type filter if specified
+    if file_types and kind not in file_types:
+        return _FileInfo(source_path, media_type, None, None, size, mtime_ns)
 
+    # 1st chance: read from metadata
+    if cached is None:
+        try:
+            with phase(metrics, "metadata"):
+                date_taken = _get_file_creation_date(
+                    source_path, media_type, ffprobe, metrics
+                )
+        except Exception as e:
+            # Not cached: an I/O error, a ffprobe timeout or a missing ffprobe
+            # may be gone in the next run
+            _logger.debug("Failed extracting metadata from %s: %s", source_path, e)
+        else:
+            if cache is not None:
+                cache.put(source_path, size, mtime_ns, media_type, date_taken)
 
-def _is_image(path: Path) -> bool:
-    """Check if file is an image using PIL."""
-    try:
-        with Image.open(path) as img:
-            img.verify()  # This will raise an exception if it's not a valid image
-            return True
-    except (IOError, OSError):
-        _logger.debug("File %s is not a valid image", path)
-        return False
+    # 2nd chance: read from filename
+    if date_taken is None:
+        with phase(metrics, "filename"):
+            date_taken = parse_filename_date(source_path.name)
 
+    return _FileInfo(source_path, media_type, kind, date_taken, size, mtime_ns)
 
-exclude = {
-    "desktop.ini",
-}
 
+def _analyze_files(
+    files: Iterable[SourceFile],
+    file_types: list | None,
+    workers: int,
+    cache: MetadataCache | None = None,
+    ffprobe: FFprobePool | None = None,
+    metrics: Metrics | None = None,
+) -> Iterator[_FileInfo]:
+    """
+    Analyze files yielding results in the same order as ``files``.
 
-def _get_ffprobe_command() -> str:
-    """Get the appropriate ffprobe command for the current platform."""
-    try:
-        # Try ffprobe.exe first (Windows)
-        result = subprocess.run(
-            ["where", "ffprobe.exe"], capture_output=True, shell=True, check=True
-        )
-        if result.returncode == 0:
-            return "ffprobe.exe"
-    except subprocess.CalledProcessError:
-        pass
+    ``files`` is consumed lazily, so analysis starts while it is still being
+    produced (e.g. by a folder scan).
+
+    With more than one worker, metadata extraction (file reads, ffprobe runs) is
+    done by a thread pool while the caller keeps consuming results in order, so
+    moves remain sequential. Only a bounded window of files is in flight, and
+    the ffprobe pool further limits how many ffprobe processes run at once.
+    """
+    if workers <= 1:
+        for source in files:
+            yield _analyze_file(source, file_types, cache, ffprobe, metrics)
+        return
 
+    executor = ThreadPoolExecutor(max_workers=workers)
+    pending = deque()
     try:
-        # Try ffprobe (Unix/Linux/Mac)
-        result = subprocess.run(
-            ["which", "ffprobe"], capture_output=True, shell=True, check=True
-        )
-        if result.returncode == 0:
-            return "ffprobe"
-    except subprocess.CalledProcessError:
-        pass
+        for source in files:
+            future = executor.submit(
+                _analyze_file, source, file_types, cache, ffprobe, metrics
+            )
+            pending.append(future)
+            if len(pending) >= workers * _PREFETCH_PER_WORKER:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+def _planned_files(
+    entries: Iterable[PlanEntry],
+    stats: dict,
+    file_types: list | None,
+    cache: MetadataCache | None = None,
+    ffprobe: FFprobePool | None = None,
+    metrics: Metrics | None = None,
+) -> Iterator[tuple[_FileInfo, Path | None]]:
+    """
+    Yield the files of a plan with the type and date found by its dry run,
+    and the destination it planned for them.
 
-    # Fallback to just "ffprobe" and let it fail if not found
-    return "ffprobe"
+    Files changed since the plan was made are analyzed again and routed as in
+    a normal run, files no longer in the source are skipped.
+    """
+    for entry in entries:
+        if not is_stale(entry):
+            yield _FileInfo(
+                entry.source,
+                entry.media_type,
+                entry.kind,
+                entry.date_taken,
+                entry.size,
+                entry.mtime_ns,
+            ), entry.destination
+            continue
+        stats["stale"] += 1
+        try:
+            stat = entry.source.stat()
+        except FileNotFoundError:
+            _logger.warning("%s ya no está en el origen", entry.source)
+            continue
+        _logger.debug("%s cambió desde el plan, se analiza de nuevo", entry.source)
+        source = SourceFile(entry.source, stat.st_size, stat.st_mtime_ns)
+        yield _analyze_file(source, file_types, cache, ffprobe, metrics), None
 
 
-def _check_ffprobe_available() -> bool:
-    """Check if ffprobe is available on the system."""
-    try:
-        ffprobe_cmd = _get_ffprobe_command()
-        subprocess.run(
-            [ffprobe_cmd, "-version"], capture_output=True, shell=True, check=True
-        )
-        return True
-    except (subprocess.CalledProcessError, FileNotFoundError):
-        return False
+def _archive_of(path: Path, archives: Iterable[Path]) -> Path | None:
+    """The innermost of ``archives`` holding ``path``, if any."""
+    holding = [a for a in archives if path.is_relative_to(a.absolute())]
+    return max(holding, key=lambda a: len(a.absolute().parts), default=None)
 
 
-def _get_file_creation_date(file_path: Path) -> datetime:
-    """Generic function to extract creation date from any supported file type."""
-    if _is_image(file_path):
-        return _get_image_creation_date(file_path)
-    elif _is_video(file_path.name):
-        return _get_video_creation_date(file_path)
-    raise ValueError(f"Unsupported file type: {file_path.name}")
+class _Importer:
+    """
+    Moves analyzed files into the archive, keeping the statistics, metadata
+    cache, archive index and journal in step with the moves.
+
+    Moves are submitted in order and accounted for in the same order as they
+    complete (see collect). Must be used from a single thread.
+    """
+
+    def __init__(
+        self,
+        destination_folder: Path,
+        dry_run: bool,
+        stats: dict,
+        cache: MetadataCache | None = None,
+        index: ArchiveIndex | None = None,
+        duplicates_folder: Path | None = None,
+        trash_duplicates: bool = False,
+        copy_workers: int = 4,
+        metrics: Metrics | None = None,
+    ):
+        self.destination_folder = destination_folder
+        self.dry_run = dry_run
+        self.stats = stats
+        self.cache = cache
+        self.index = index
+        self.journal: MoveJournal | None = None
+        self.metrics = metrics
+        self.duplicates_folder = duplicates_folder
+        self._mover = None if dry_run else MoveExecutor(copy_workers)
+        self._send2trash = None
+        if trash_duplicates and not dry_run:
+            # Optional dependency, only needed to remove duplicates
+            from send2trash import send2trash
+
+            self._send2trash = send2trash
+        # (future, file info, destination, archive match, journal entry id),
+        # in order
+        self._pending = deque()
+        # Date folders that received pictures, for their thumbnails
+        self.image_folders: set[Path] = set()
+        # Entries of the plan written by a dry run with plan_out
+        self.plan: list[PlanEntry] | None = None
+        # Destinations taken by earlier files of a dry run
+        self._planned: set[Path] = set()
+
+    def destination_for(self, date_taken: datetime, layout: Layout) -> Path:
+        # Organize by date
+        return layout.day_folder(self.destination_folder, date_taken)
+
+    def import_file(
+        self, file_info: _FileInfo, layout: Layout | None, target: Path | None = None
+    ) -> None:
+        """
+        Move a file with a known date into its date folder, or to ``target``
+        (e.g. the destination planned by a dry run).
+        """
+        source_path, filename = file_info.path, file_info.path.name
+        if target is None:
+            target = self.destination_for(file_info.date_taken, layout) / filename
+        try:
+            # Files whose content is already archived are not imported again
+            match = None
+            if self.index is not None:
+                with phase(self.metrics, "index"):
+                    match = self.index.lookup(source_path, file_info.size)
+            if match is not None and match.relpath is not None:
+                self.stats["duplicates"] += 1
+                _logger.debug("%s ya archivado en %s", filename, match.relpath)
+                self._add_to_plan(file_info, None)
+                self._handle_duplicate(source_path)
+                return
+
+            if self.dry_run:
+                target_path = _unique_destination(target, self._planned)
+                self._planned.add(target_path)
+                self._add_to_plan(file_info, target_path)
+                if self.index is not None:
+                    # Later files of this dry run must see it as archived
+                    self.index.reserve(target_path, file_info.size, source_path, match)
+                self._count_moved(file_info.kind, file_info.size)
+                return
+
+            with phase(self.metrics, "move"):
+                self._move(file_info, target, match)
+
+        except Exception as e:
+            self.stats["errors"] += 1
+            _logger.error("Error procesando %s: %s", filename, e)
 
+    def collect(self) -> None:
+        """Account for the moves finished so far, without waiting."""
+        while self._pending and self._pending[0][0].done():
+            self._record(*self._pending.popleft())
+
+    def drain(self) -> None:
+        """Wait for all the moves submitted so far and account for them."""
+        with phase(self.metrics, "move"):
+            while self._pending:
+                self._record(*self._pending.popleft())
+            if self._mover is not None:
+                self._mover.flush()
+
+    def close(self) -> None:
+        if self._mover is not None:
+            # Wait for the copies still running before accounting for them
+            with phase(self.metrics, "move"):
+                self._mover.close()
+        self.drain()
+
+    def resume(self, entries: list[JournalEntry]) -> None:
+        """Finish or roll back the moves of an interrupted import."""
+        for entry in entries:
+            # Copies in flight were written under a temporary name: roll back
+            partial_path(entry.destination).unlink(missing_ok=True)
+
+            if entry.destination.exists():
+                if entry.source.exists():
+                    # Copy completed, the original was still to be deleted
+                    if entry.source.stat().st_size != entry.destination.stat().st_size:
+                        _logger.warning(
+                            "No se reanuda %s: %s tiene otro tamaño",
+                            entry.source,
+                            entry.destination,
+                        )
+                        continue
+                    entry.source.unlink()
+                if not entry.completed:
+                    self._record_existing(entry)
+                if entry.kind == IMAGE:
+                    self.image_folders.add(entry.destination.parent)
+                self._count_moved(entry.kind, entry.destination.stat().st_size)
+                self.stats["resumed"] += 1
+            elif entry.source.exists():
+                # Never started or rolled back: move again, dates are known
+                stat = entry.source.stat()
+                file_info = _FileInfo(
+                    entry.source,
+                    None,
+                    entry.kind,
+                    entry.date_taken,
+                    stat.st_size,
+                    stat.st_mtime_ns,
+                )
+                self._move(file_info, entry.destination, None)
+                self.stats["resumed"] += 1
+            else:
+                _logger.warning("No se encontró %s ni su destino", entry.source)
+
+    def _move(
+        self, file_info: _FileInfo, destination: Path, match: ArchiveMatch | None
+    ) -> None:
+        target_path = self._mover.unique_destination(destination)
+        entry_id = None
+        if self.journal is not None:
+            entry_id = self.journal.planned(
+                file_info.path, target_path, file_info.kind, file_info.date_taken
+            )
+        future = self._mover.move(file_info.path, target_path)
+        if self.index is not None:
+            # Copies take a while: later files must already see it as archived
+            self.index.reserve(target_path, file_info.size, file_info.path, match)
+        self._pending.append((future, file_info, target_path, match, entry_id))
+
+    def _add_to_plan(self, file_info: _FileInfo, target_path: Path | None) -> None:
+        if self.plan is None:
+            return
+        self.plan.append(
+            PlanEntry(
+                file_info.path.absolute(),
+                target_path.absolute() if target_path is not None else None,
+                file_info.date_taken,
+                file_info.kind,
+                file_info.media_type,
+                file_info.size,
+                file_info.mtime_ns,
+            )
+        )
 
-def _is_supported_file(file_path: Path) -> bool:
-    """Check if file is a supported image or video format."""
-    return _is_image(file_path) or _is_video(file_path.name)
+    def _handle_duplicate(self, source_path: Path) -> None:
+        if self.dry_run:
+            return
+        if self._send2trash is not None:
+            self._send2trash(source_path)
+        elif self.duplicates_folder is not None:
+            duplicate_path = self._mover.unique_destination(
+                self.duplicates_folder / source_path.name
+            )
+            self._mover.move(source_path, duplicate_path).result()
+
+    def _record(
+        self,
+        future: Future,
+        file_info: _FileInfo,
+        target_path: Path,
+        match: ArchiveMatch | None,
+        entry_id: int | None,
+    ) -> None:
+        try:
+            future.result()
+        except Exception as e:
+            self.stats["errors"] += 1
+            _logger.error("Error procesando %s: %s", file_info.path.name, e)
+            if self.index is not None:
+                self.index.release(target_path)
+            return
+
+        if self.journal is not None and entry_id is not None:
+            self.journal.completed(entry_id)
+        if self.cache is not None:
+            self.cache.rename(file_info.path, target_path)
+        if self.index is not None:
+            stat = target_path.stat()
+            self.index.add(
+                target_path, stat.st_size, stat.st_mtime_ns, file_info.date_taken, match
+            )
+        if file_info.kind == IMAGE:
+            self.image_folders.add(target_path.parent)
+        self._count_moved(file_info.kind, file_info.size)
+
+    def _record_existing(self, entry: JournalEntry) -> None:
+        if self.cache is not None:
+            self.cache.rename(entry.source, entry.destination)
+        if self.index is not None:
+            stat = entry.destination.stat()
+            self.index.add(
+                entry.destination, stat.st_size, stat.st_mtime_ns, entry.date_taken
+            )
+
+    def _count_moved(self, kind: str, size: int) -> None:
+        self.stats["processed"] += 1
+        if self.metrics is not None and not self.dry_run:
+            self.metrics.add_bytes(size)
+        if kind == IMAGE:
+            self.stats["images_moved"] += 1
+        else:
+            self.stats["videos_moved"] += 1
 
 
-def _print_progress_bar(iteration, total, prefix="", suffix="", length=50):
+def _unique_destination(destination: Path, taken: set[Path]) -> Path:
     """
-    Call in a loop to create terminal progress bar
+    Avoid overwriting a different file that has the same name, on disk or
+    in ``taken`` (dry runs, see MoveExecutor.unique_destination).
     """
-    fill = "█"
-    print_end = "\r"
-    percent = ("{0:.1f}").format(100 * (iteration / float(total)))
-    filled_length = int(length * iteration // total)
-    progress_bar = fill * filled_length + "-" * (length - filled_length)
-    print(f"\r{prefix} |{progress_bar}| {percent}% {suffix}", end=print_end)
-    # Print New Line on Complete
-    if iteration == total:
+    counter = 1
+    candidate = destination
+    while candidate in taken or candidate.exists():
+        candidate = destination.with_stem(f"{destination.stem} ({counter})")
+        counter += 1
+    return candidate
+
+
+def _open_archive_index(
+    destination_folder: Path, dry_run: bool, reindex: bool
+) -> ArchiveIndex:
+    # Dry runs must not write in the archive, they work on a copy in memory
+    index = ArchiveIndex(destination_folder, read_only=dry_run)
+    if (reindex or len(index) == 0) and destination_folder.exists():
+        print("📇 Indexando los archivos ya organizados en el destino...")
+        total = index.rebuild()
+        print(f"   {total} archivos en el índice")
         print()
+    return index
+
+
+def _print_progress_counter(iteration, prefix="", suffix="", width=100):
+    """Progress line for loops whose total is not known in advance"""
+    print(f"\r{prefix} {suffix}"[:width].ljust(width), end="\r")
 
 
 def _print_banner():
@@ -203,7 +585,7 @@ def _print_banner():
     print()
 
 
-def _print_summary(stats):
+def _print_summary(stats, metrics: Metrics | None = None):
     """Print a summary of the operation"""
     print("\n" + "=" * 50)
     print("  📊 RESUMEN DEL PROCESO")
@@ -212,29 +594,102 @@ def _print_summary(stats):
     print(f"  Imágenes movidas: {stats['images_moved']}")
     print(f"  Videos movidos: {stats['videos_moved']}")
     print(f"  Archivos omitidos: {stats['skipped']}")
+    print(f"  Ya archivados (duplicados): {stats['duplicates']}")
+    if stats["resumed"]:
+        print(f"  Movimientos reanudados: {stats['resumed']}")
+    if stats["pruned"]:
+        print(f"  Carpetas vacías borradas: {stats['pruned']}")
+    if stats["thumbnails"]:
+        print(f"  Miniaturas creadas: {stats['thumbnails']}")
+    if stats["stale"]:
+        print(f"  Archivos cambiados desde el plan: {stats['stale']}")
     print(f"  Errores: {stats['errors']}")
     if stats["dry_run"]:
         print("  🔍 Modo simulación - No se movieron archivos")
+    if metrics is not None:
+        print("-" * 50)
+        for line in metrics.summary_lines():
+            print(line)
     print("=" * 50)
     print()
 
 
 def organize_files(
     source_folder: Path,
-    destination_folder: Path,
+    destination_folder: Path | None,
     dry_run: bool,
     file_types: list = None,
     use_year_folders: bool = False,
+    *,
+    workers: int = 1,
+    cache: MetadataCache | None = None,
+    ffprobe: FFprobePool | None = None,
+    recursive: bool = False,
+    include: list[str] | None = None,
+    exclude_patterns: set[str] | None = None,
+    use_index: bool = True,
+    reindex: bool = False,
+    duplicates_folder: Path | None = None,
+    trash_duplicates: bool = False,
+    copy_workers: int = 4,
+    resume: bool = False,
+    watch: bool = False,
+    settle: float = 2.0,
+    metrics_out: Path | None = None,
+    routes: Router | None = None,
+    prune_empty: bool = False,
+    thumbnails: bool = False,
+    plan_out: Path | None = None,
+    plan: list[PlanEntry] | None = None,
+    thumbnails_max_bytes: int | None = None,
 ) -> None:
     """
     Organize files by creation date into subdirectories.
 
     Args:
         source_folder: Source directory containing files to organize
-        destination_folder: Target directory for organized files
+        destination_folder: Target directory for organized files, or for
+            the files without a route if ``routes`` are given
         dry_run: If True, only simulate the operation without moving files
         file_types: List of file types to process ('image', 'video'). If None, process all supported types.
         use_year_folders: If True, organize as YYYY/YYYY-MM-DD/, otherwise just YYYY-MM-DD/
+        workers: Number of threads extracting metadata concurrently. Files are
+            still moved one by one, in the original order.
+        cache: Optional metadata cache, entries follow the files they move
+        ffprobe: Pool running ffprobe for videos that cannot be read natively
+        recursive: Also organize the files found in subfolders of the source
+        include: Only process files matching one of these globs
+        exclude_patterns: Globs of files and folders to ignore, defaults to
+            the module level ``exclude``
+        use_index: Keep an index of the destination archive and skip files
+            whose content is already archived
+        reindex: Rescan the destination archive to refresh the index
+        duplicates_folder: Where to move files already archived, by default
+            they are left in the source folder
+        trash_duplicates: Send files already archived to the recycle bin
+        copy_workers: Number of parallel copies when the destination is on
+            another drive (moves within a drive are plain renames)
+        resume: Finish the moves of an interrupted import before starting
+        watch: Keep watching the source folder and organize new files as they
+            arrive, until interrupted
+        settle: In watch mode, seconds a file must stay unchanged before it is
+            considered complete (e.g. Dropbox is done writing it)
+        metrics_out: Write the timings and counters of the run to this JSON file
+        routes: Send each type of file to its own archive and layout (see
+            papa_toolkit.routing), all of them in a single pass. Files
+            without a route (and no destination_folder) are skipped.
+        prune_empty: Delete the subfolders of the source left empty by the
+            run (only those it took files from are looked at)
+        thumbnails: Make the thumbnails of the pictures moved, in the
+            .thumbnails folder of their date folders (see
+            papa_toolkit.thumbnails)
+        plan_out: In a dry run, write what would be done to this file (see
+            papa_toolkit.plan)
+        plan: Entries of a plan written by a dry run: these files are moved
+            where the plan says, without scanning the source nor reading
+            their dates again
+        thumbnails_max_bytes: Space the thumbnails may take in each archive,
+            by default the last limit used for it (see thumbnails.py)
     """
     # Initialize statistics
     stats = {
@@ -242,106 +697,227 @@ def organize_files(
         "images_moved": 0,
         "videos_moved": 0,
         "skipped": 0,
+        "duplicates": 0,
+        "resumed": 0,
+        "pruned": 0,
+        "thumbnails": 0,
+        "stale": 0,
         "errors": 0,
         "dry_run": dry_run,
     }
 
-    # Get all files first for progress tracking
-    all_files = [
-        f for f in source_folder.glob("*") if f.is_file() and f.name not in exclude
-    ]
-    total_files = len(all_files)
-
-    if total_files == 0:
-        print("❌ No se encontraron archivos en la carpeta de origen.")
-        return
-
+    metrics = Metrics()
+
+    routes = Router(routes.routes if routes is not None else None)
+    if destination_folder is not None and DEFAULT_KEY not in routes.routes:
+        # The destination folder takes the files no other route takes
+        layout = Layout("YYYY/YYYY-MM-DD" if use_year_folders else DEFAULT_LAYOUT)
+        routes.add(DEFAULT_KEY, Route(destination_folder, layout))
+    destinations = routes.destinations
+    if not destinations:
+        raise ValueError("No hay carpeta de destino ni rutas")
+
+    scan_options = dict(
+        recursive=recursive,
+        include=include or (),
+        exclude=exclude if exclude_patterns is None else exclude_patterns,
+        skip_dirs=destinations,
+    )
     file_type_str = f" ({file_types[0]}s)" if file_types else ""
-    print(f"🔍 Encontrados {total_files} archivos{file_type_str} para procesar...")
+    print(f"🔍 Buscando archivos{file_type_str} para procesar...")
     print()
 
-    # Create the destination folder if it doesn't exist
-    if not destination_folder.exists() and not dry_run:
-        destination_folder.mkdir(parents=True)
-        print(f"📁 Creada carpeta de destino: {destination_folder}")
-
-    # Process each file with progress bar
-    for i, source_path in enumerate(all_files, 1):
-        filename = source_path.name
-
-        # Update progress bar
-        _print_progress_bar(
-            i,
-            total_files,
-            prefix="Procesando:",
-            suffix=f"({i}/{total_files}) {filename[:30]}..."
-            if len(filename) > 30
-            else f"({i}/{total_files}) {filename}",
-        )
-
-        # Check file type filtering
-        is_image = _is_image(source_path)
-        is_video = _is_video(source_path.name)
-
-        # Skip files that are not supported
-        if not is_image and not is_video:
-            stats["skipped"] += 1
-            continue
-
-        # Apply file type filter if specified
-        if file_types:
-            if "image" not in file_types and is_image:
-                stats["skipped"] += 1
-                continue
-            if "video" not in file_types and is_video:
-                stats["skipped"] += 1
-                continue
-
-        date_taken = None
+    # An interrupted import leaves its journal behind in its destination
+    journal_paths = {}
+    if not dry_run:
+        journal_paths = {d: d / JOURNAL_FILENAME for d in destinations}
+    pending_journals = [d for d, path in journal_paths.items() if path.exists()]
+    if pending_journals and not resume:
+        print("⚠️  Hay una importación interrumpida en la carpeta de destino.")
+        print("   Vuelva a ejecutar con --resume para completarla.")
+        return
 
-        # 1st chance: read from metadata
-        try:
-            date_taken = _get_file_creation_date(source_path)
-        except Exception as e:
-            _logger.debug("Failed extracting metadata from %s: %s", source_path, e)
+    if plan is not None:
+        if not plan and not pending_journals:
+            print("❌ El plan no tiene archivos que mover.")
+            return
+        batches = [plan]
+    elif watch:
+        from papa_toolkit.watcher import watch_files
 
-        # 2nd chance: read from filename
-        if date_taken is None:
-            date_taken = _get_date_from_filename(filename)
+        # New files are processed in batches as soon as they are complete
+        batches = watch_files(source_folder, settle=settle, **scan_options)
+    else:
+        # Files are processed while the source folder is still being scanned
+        files = metrics.timed("scan", scan_files(source_folder, **scan_options))
+        first = next(files, None)
+        if first is None and not pending_journals:
+            # Nothing to do: do not open the archive index nor the journal
+            print("❌ No se encontraron archivos en la carpeta de origen.")
+            return
+        batches = [itertools.chain([first] if first is not None else [], files)]
+
+    # One importer per archive, each file is routed to its importer
+    importers: dict[Path, _Importer] = {}
+    for destination in destinations:
+        # Create the destination folder if it doesn't exist
+        if not destination.exists() and not dry_run:
+            destination.mkdir(parents=True)
+            print(f"📁 Creada carpeta de destino: {destination}")
+
+        index = None
+        if use_index:
+            index = _open_archive_index(destination, dry_run, reindex)
+
+        importers[destination] = _Importer(
+            destination,
+            dry_run,
+            stats,
+            cache,
+            index,
+            duplicates_folder,
+            trash_duplicates,
+            copy_workers,
+            metrics,
+        )
 
-        if date_taken is None:
-            stats["skipped"] += 1
-            continue
+    plan_entries = [] if plan_out is not None and dry_run else None
+    for importer in importers.values():
+        importer.plan = plan_entries
 
-        # Organize by date
-        if use_year_folders:
-            year = date_taken.strftime("%Y")
-            date_folder = date_taken.strftime("%Y-%m-%d")
-            destination_path = destination_folder / year / date_folder
-        else:
-            destination_subfolder = date_taken.strftime("%Y-%m-%d")
-            destination_path = destination_folder / destination_subfolder
+    # Process each file with progress bar
+    total_files = 0
+    touched_folders = set()
+    finished = False
+    try:
+        for destination, journal_path in journal_paths.items():
+            importer = importers[destination]
+            if destination in pending_journals:
+                print("♻️  Reanudando la importación interrumpida...")
+                print(f"   {destination}")
+                print()
+                importer.resume(read_journal(journal_path))
+                importer.drain()
+                journal_path.unlink()
+            importer.journal = MoveJournal(journal_path)
+
+        if watch:
+            print("👀 Vigilando la carpeta de origen (Ctrl+C para terminar)...")
+            print()
 
         try:
-            if not destination_path.exists() and not dry_run:
-                destination_path.mkdir(parents=True)
+            for batch in batches:
+                if plan is not None:
+                    analyzed = _planned_files(
+                        batch, stats, file_types, cache, ffprobe, metrics
+                    )
+                else:
+                    analyzed = (
+                        (file_info, None)
+                        for file_info in _analyze_files(
+                            batch, file_types, workers, cache, ffprobe, metrics
+                        )
+                    )
+                for file_info, planned in analyzed:
+                    filename = file_info.path.name
+                    total_files += 1
+
+                    # Update progress line, the total is unknown while scanning
+                    _print_progress_counter(
+                        total_files,
+                        prefix="Procesando:",
+                        suffix=f"({total_files}) {filename[:30]}..."
+                        if len(filename) > 30
+                        else f"({total_files}) {filename}",
+                    )
+
+                    # Account for the moves finished in the meantime
+                    for importer in importers.values():
+                        importer.collect()
+
+                    if file_info.kind is None or file_info.date_taken is None:
+                        stats["skipped"] += 1
+                        continue
+
+                    # The destination planned by a dry run, if it is still in
+                    # one of the archives of this run
+                    archive = None
+                    if planned is not None:
+                        archive = _archive_of(planned, importers)
+                    if archive is not None:
+                        touched_folders.add(file_info.path.parent)
+                        importers[archive].import_file(file_info, None, planned)
+                        continue
+
+                    route = routes.route_for(
+                        file_info.path, file_info.media_type, file_info.kind
+                    )
+                    if route is None:
+                        stats["skipped"] += 1
+                        continue
+
+                    touched_folders.add(file_info.path.parent)
+                    importers[route.destination].import_file(file_info, route.layout)
+                if watch:
+                    # The batch is done, do not leave it in flight while idle
+                    for importer in importers.values():
+                        importer.drain()
+                        if importer.index is not None:
+                            importer.index.commit()
+                    if cache is not None:
+                        cache.flush()
+        except KeyboardInterrupt:
+            if not watch:
+                raise
+            # Stopping is the normal way to end watching
+            print("\n⏹️  Vigilancia terminada.")
+        finished = True
+    finally:
+        for importer in importers.values():
+            importer.close()
+            if importer.journal is not None:
+                # Kept on disk if interrupted, so the next run can resume it
+                importer.journal.close(finished)
+            if importer.index is not None:
+                importer.index.close()
+
+    if plan_entries is not None:
+        count = write_plan(plan_out, "image_syncer", plan_entries)
+        print()
+        print(f"📝 Plan de {count} archivos guardado en {plan_out}")
+        print("   Revíselo y aplíquelo con --apply-plan.")
+
+    if prune_empty and not dry_run and touched_folders:
+        # After closing the importers: their last sources are deleted by then
+        with metrics.phase("prune"):
+            stats["pruned"] = len(prune_folders(touched_folders, source_folder))
+
+    if thumbnails and not dry_run:
+        with metrics.phase("thumbnails"):
+            for destination, importer in importers.items():
+                if not importer.image_folders:
+                    continue
+                # The new pictures always get their thumbnail, the least
+                # recently used ones make room for them
+                plan = plan_thumbnails(sorted(importer.image_folders), max_bytes=None)
+                result = apply_thumbnails(plan, workers=workers)
+                stats["thumbnails"] += result.created
+                add_to_cache(destination, result.size, thumbnails_max_bytes)
+
+    if total_files == 0 and not stats["resumed"]:
+        print("❌ No se encontraron archivos en la carpeta de origen.")
+        return
+    print()
 
-            if not dry_run:
-                shutil.move(str(source_path), str(destination_path / filename))
+    if cache is not None:
+        cache.evict_missing(source_folder)
 
-            # Update statistics
-            stats["processed"] += 1
-            if is_image:
-                stats["images_moved"] += 1
-            else:
-                stats["videos_moved"] += 1
-
-        except Exception as e:
-            stats["errors"] += 1
-            _logger.error("Error procesando %s: %s", filename, e)
+    metrics.stop()
+    if metrics_out is not None:
+        metrics.write_json(metrics_out, stats)
 
     # Print final summary
-    _print_summary(stats)
+    _print_summary(stats, metrics)
 
     if stats["processed"] > 0:
         print("✅ ¡Proceso completado exitosamente!")
@@ -365,7 +941,22 @@ def main() -> None:
     parser.add_argument(
         "destination_folder",
         type=Path,
-        help="Carpeta de destino para organizar los archivos",
+        nargs="?",
+        help="Carpeta de destino para organizar los archivos (opcional con "
+        "--route o --routes-file: recibe los archivos sin ruta)",
+    )
+    parser.add_argument(
+        "--route",
+        action="append",
+        default=[],
+        metavar="TIPO=CARPETA[:ESTRUCTURA]",
+        help="Enviar un tipo de archivo (image, video, jpeg, mov, .heic...) a "
+        "otra carpeta, p. ej. video=D:\\Videos:YYYY/YYYY-MM-DD (se puede repetir)",
+    )
+    parser.add_argument(
+        "--routes-file",
+        type=Path,
+        help="Archivo TOML con las rutas de cada tipo de archivo",
     )
     parser.add_argument(
         "-t",
@@ -391,6 +982,144 @@ def main() -> None:
         action="store_true",
         help="Organizar en carpetas por año (YYYY/YYYY-MM-DD/) en lugar de solo por fecha (YYYY-MM-DD/)",
     )
+    parser.add_argument(
+        "-w",
+        "--workers",
+        type=int,
+        default=1,
+        help="Número de hilos para leer metadatos en paralelo (por defecto: 1)",
+    )
+    parser.add_argument(
+        "--metrics-out",
+        type=Path,
+        help="Guardar los tiempos y contadores del proceso en este archivo JSON",
+    )
+    parser.add_argument(
+        "--profile",
+        type=Path,
+        help="Guardar un perfil de cProfile del proceso en este archivo",
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="Seguir vigilando la carpeta de origen y organizar los archivos nuevos",
+    )
+    parser.add_argument(
+        "--settle",
+        type=float,
+        default=2.0,
+        help="Segundos sin cambios antes de procesar un archivo nuevo con --watch (por defecto: %(default)s)",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Completar una importación interrumpida antes de continuar",
+    )
+    plan_group = parser.add_mutually_exclusive_group()
+    plan_group.add_argument(
+        "--plan-out",
+        type=Path,
+        metavar="ARCHIVO",
+        help="Guardar en este archivo lo que se haría, para revisarlo y aplicarlo "
+        "después con --apply-plan (implica --dry-run)",
+    )
+    plan_group.add_argument(
+        "--apply-plan",
+        type=Path,
+        metavar="ARCHIVO",
+        help="Mover los archivos como dice un plan guardado con --plan-out, sin "
+        "volver a leer sus fechas (los que cambiaron desde entonces se leen)",
+    )
+    parser.add_argument(
+        "--copy-workers",
+        type=int,
+        default=4,
+        help="Copias simultáneas cuando el destino está en otra unidad (por defecto: %(default)s)",
+    )
+    parser.add_argument(
+        "--ffprobe-jobs",
+        type=int,
+        default=4,
+        help="Máximo de procesos ffprobe simultáneos (por defecto: %(default)s)",
+    )
+    parser.add_argument(
+        "--ffprobe-timeout",
+        type=float,
+        default=30.0,
+        help="Segundos de espera máxima por cada ffprobe (por defecto: %(default)s)",
+    )
+    parser.add_argument(
+        "-r",
+        "--recursive",
+        action="store_true",
+        help="Procesar también los archivos de las subcarpetas del origen",
+    )
+    parser.add_argument(
+        "--prune-empty",
+        action="store_true",
+        help="Borrar las subcarpetas del origen que queden vacías (o con solo "
+        ".picasa.ini o desktop.ini)",
+    )
+    parser.add_argument(
+        "--thumbnails",
+        action="store_true",
+        help="Crear miniaturas de las fotos movidas en la carpeta .thumbnails de "
+        "cada fecha (ver thumbnails.py)",
+    )
+    parser.add_argument(
+        "--thumbnails-max-size",
+        type=int,
+        metavar="MB",
+        help="Espacio máximo de todas las miniaturas de un archivo en MB (por "
+        "defecto: el último usado con thumbnails.py, o "
+        f"{DEFAULT_THUMBNAILS_MAX_BYTES // 1024**2})",
+    )
+    parser.add_argument(
+        "--include",
+        action="append",
+        default=[],
+        metavar="PATRÓN",
+        help="Procesar solo los archivos que coincidan con el patrón (p. ej. '*.jpg'). Se puede repetir",
+    )
+    parser.add_argument(
+        "--exclude",
+        action="append",
+        default=[],
+        metavar="PATRÓN",
+        help="Ignorar archivos y carpetas que coincidan con el patrón. Se puede repetir",
+    )
+    parser.add_argument(
+        "--no-index",
+        action="store_true",
+        help="No comprobar si los archivos ya están en el destino",
+    )
+    parser.add_argument(
+        "--reindex",
+        action="store_true",
+        help="Volver a indexar el destino (si se modificó con otras herramientas)",
+    )
+    duplicates_group = parser.add_mutually_exclusive_group()
+    duplicates_group.add_argument(
+        "--duplicates-folder",
+        type=Path,
+        help="Mover aquí los archivos que ya están en el destino (por defecto se dejan en el origen)",
+    )
+    duplicates_group.add_argument(
+        "--trash-duplicates",
+        action="store_true",
+        help="Enviar a la papelera los archivos que ya están en el destino",
+    )
+    parser.add_argument(
+        "--cache",
+        type=Path,
+        default=default_cache_path(),
+        help="Base de datos donde se guardan los metadatos ya leídos (por defecto: %(default)s)",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="No usar la caché de metadatos",
+    )
     args = parser.parse_args()
 
     # Set logging level based on verbose flag
@@ -399,17 +1128,43 @@ def main() -> None:
 
     source_folder = args.source_folder
     destination_folder = args.destination_folder
-    dry_run = args.dry_run
+    if destination_folder is None and not (args.route or args.routes_file):
+        parser.error("indique la carpeta de destino, --route o --routes-file")
+    if args.watch and (args.plan_out or args.apply_plan):
+        parser.error("--watch no se puede usar con --plan-out ni --apply-plan")
+
+    # Routes of the command line are added to (or override) those of the file
+    routes = None
+    try:
+        if args.routes_file:
+            routes = load_routes(args.routes_file)
+        for spec in args.route:
+            routes = routes or Router()
+            routes.add(*parse_route(spec))
+    except (OSError, ValueError) as e:
+        print(f"❌ Error en las rutas: {e}")
+        return
+
+    plan = None
+    if args.apply_plan:
+        try:
+            plan = read_plan(args.apply_plan, "image_syncer")
+        except (OSError, ValueError) as e:
+            print(f"❌ Error en el plan: {e}")
+            return
+    dry_run = args.dry_run or args.plan_out is not None
     file_types = [args.type] if args.type else None
     use_year_folders = args.year_folders
-
-    # Check if ffprobe is available when processing videos
+    workers = max(1, args.workers)
+    thumbnails_max_bytes = None
+    if args.thumbnails_max_size is not None:
+        thumbnails_max_bytes = max(0, args.thumbnails_max_size) * 1024**2
+
+    # MP4/MOV videos are read natively, ffprobe is only needed for other
+    # formats: it is looked up (and a missing one reported) on the first of them
+    ffprobe = None
     if not file_types or "video" in file_types:
-        if not _check_ffprobe_available():
-            print("❌ Error: ffprobe no está disponible en el sistema.")
-            print("   ffprobe es necesario para procesar videos.")
-            print("   Instale ffmpeg para obtener ffprobe.")
-            return
+        ffprobe = FFprobePool(args.ffprobe_jobs, args.ffprobe_timeout)
 
     # Validate source folder
     if not source_folder.exists():
@@ -422,24 +1177,77 @@ def main() -> None:
 
     # Print configuration
     print(f"📂 Carpeta de origen: {source_folder}")
-    print(f"📁 Carpeta de destino: {destination_folder}")
+    if destination_folder is not None:
+        print(f"📁 Carpeta de destino: {destination_folder}")
+    if routes is not None:
+        for key, route in routes.routes.items():
+            print(f"🧭 Ruta {key}: {route.destination} ({route.layout.pattern})")
     if file_types:
         print(f"🎯 Procesando solo: {file_types[0]}s")
     else:
         print("🎯 Procesando: imágenes y videos")
 
+    if plan is not None:
+        print(f"📝 Aplicando el plan {args.apply_plan} ({len(plan)} archivos)")
     if dry_run:
         print("🔍 Modo simulación activado")
     print()
 
+    cache = None if args.no_cache else MetadataCache(args.cache)
+
+    # Profile of the main thread, where files are scanned and moved
+    profiler = None
+    if args.profile:
+        import cProfile
+
+        profiler = cProfile.Profile()
+
     try:
-        organize_files(source_folder, destination_folder, dry_run, file_types, use_year_folders)
+        if profiler is not None:
+            profiler.enable()
+        organize_files(
+            source_folder,
+            destination_folder,
+            dry_run,
+            file_types,
+            use_year_folders,
+            workers=workers,
+            cache=cache,
+            ffprobe=ffprobe,
+            recursive=args.recursive,
+            include=args.include,
+            exclude_patterns=exclude | set(args.exclude),
+            use_index=not args.no_index,
+            reindex=args.reindex,
+            duplicates_folder=args.duplicates_folder,
+            trash_duplicates=args.trash_duplicates,
+            copy_workers=max(1, args.copy_workers),
+            resume=args.resume,
+            watch=args.watch,
+            settle=args.settle,
+            metrics_out=args.metrics_out,
+            routes=routes,
+            prune_empty=args.prune_empty,
+            thumbnails=args.thumbnails,
+            plan_out=args.plan_out,
+            plan=plan,
+            thumbnails_max_bytes=thumbnails_max_bytes,
+        )
     except KeyboardInterrupt:
         print("\n⏹️  Proceso interrumpido por el usuario.")
     except Exception as e:
         print(f"\n❌ Error inesperado: {e}")
         if args.verbose:
             _logger.error("Error detallado: %s", e, exc_info=True)
+    finally:
+        if profiler is not None:
+            profiler.disable()
+            profiler.dump_stats(args.profile)
+            print(f"📈 Perfil guardado en {args.profile} (python -m pstats)")
+        if cache is not None:
+            cache.close()
+        if ffprobe is not None:
+            ffprobe.close()
 
 
 if __name__ == "__main__":
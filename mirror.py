@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+# /// script
+# requires-python = ">=3.12"
+# dependencies = []
+# ///
+"""
+This script keeps a copy of a folder (e.g. the scanned pictures or the whole
+picture archive) up to date on a backup drive.
+
+Only new and changed files are copied, so it can be run again and again, and
+the copies are checked as they are written. With --verify the backup is read
+back and compared with what was copied, to find damaged files.
+"""
+
+import argparse
+import logging
+from pathlib import Path
+
+from papa_toolkit.metrics import Metrics, format_size
+from papa_toolkit.mirror import apply_mirror, plan_mirror, verify_mirror
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(levelname)s - %(message)s",
+    datefmt="%H:%M:%S",
+)
+_logger = logging.getLogger(__name__)
+
+
+def _print_banner():
+    """Print a nice banner for the application"""
+    print("=" * 70)
+    print("  💾 COPIA DE SEGURIDAD DE FOTOS - PAPA TOOLKIT 📁")
+    print("=" * 70)
+    print()
+
+
+def _print_summary(stats, metrics: Metrics | None = None):
+    """Print a summary of the operation"""
+    print("\n" + "=" * 50)
+    print("  📊 RESUMEN DEL PROCESO")
+    print("=" * 50)
+    print(f"  Archivos en el origen: {stats['found']}")
+    print(f"  Archivos sin cambios: {stats['unchanged']}")
+    print(f"  Archivos copiados: {stats['copied']}")
+    if stats["extraneous"]:
+        print(f"  Archivos que ya no están en el origen: {stats['extraneous']}")
+        print(f"  Archivos borrados de la copia: {stats['deleted']}")
+    print(f"  Errores: {stats['errors']}")
+    if stats["dry_run"]:
+        print("  🔍 Modo simulación - No se copiaron archivos")
+    if metrics is not None:
+        print("-" * 50)
+        for line in metrics.summary_lines():
+            print(line)
+    print("=" * 50)
+    print()
+
+
+def update_mirror(
+    source_folder: Path,
+    mirror_folder: Path,
+    dry_run: bool,
+    workers: int = 4,
+    checksum: bool = True,
+    delete: bool = False,
+    include: list[str] | None = None,
+    exclude: list[str] | None = None,
+) -> None:
+    """
+    Bring ``mirror_folder`` up to date with ``source_folder``.
+
+    Args:
+        source_folder: Folder to back up
+        mirror_folder: Backup folder, created if needed
+        dry_run: If True, only show what would be copied
+        workers: Number of files copied in parallel
+        checksum: Hash the files while copying them, for --verify (slower, the
+            copies are not done by the kernel, see apply_mirror)
+        delete: Delete the files of the backup that are no longer in the source
+        include: Only back up files and folders matching one of these globs
+        exclude: Globs of files and folders not to back up
+    """
+    stats = {
+        "found": 0,
+        "unchanged": 0,
+        "copied": 0,
+        "extraneous": 0,
+        "deleted": 0,
+        "errors": 0,
+        "dry_run": dry_run,
+    }
+    metrics = Metrics()
+
+    print("🔍 Comparando el origen con la copia...")
+    with metrics.phase("compare"):
+        plan = plan_mirror(source_folder, mirror_folder, include or (), exclude or ())
+    stats["found"] = len(plan.copies) + plan.unchanged
+    stats["unchanged"] = plan.unchanged
+    stats["extraneous"] = len(plan.extraneous)
+    print(
+        f"📋 {len(plan.copies)} archivos nuevos o modificados "
+        f"({format_size(plan.size)}), {plan.unchanged} sin cambios."
+    )
+    print()
+
+    if dry_run:
+        for relative, _ in plan.copies:
+            _logger.debug("Copiar %s", relative)
+        for relative in plan.extraneous:
+            _logger.debug("Sobra en la copia: %s", relative)
+        stats["copied"] = len(plan.copies)
+        stats["deleted"] = len(plan.extraneous) if delete else 0
+    elif plan.copies or (delete and plan.extraneous):
+        with metrics.phase("copy"):
+            result = apply_mirror(plan, mirror_folder, workers, checksum, delete)
+        stats["copied"] = result.copied
+        stats["deleted"] = result.deleted
+        stats["errors"] = len(result.errors)
+        metrics.add_bytes(plan.size)
+
+    metrics.add_items(stats["found"])
+    metrics.stop()
+
+    # Print final summary
+    _print_summary(stats, metrics)
+
+    if stats["errors"]:
+        print("⚠️  Algunos archivos no se pudieron copiar, vuelva a ejecutarlo.")
+    else:
+        print("✅ ¡La copia está al día!")
+    print()
+
+
+def verify_folder(mirror_folder: Path, workers: int = 4) -> None:
+    """Check the files of ``mirror_folder`` against the hashes taken when copied."""
+    print("🔍 Comprobando los archivos de la copia...")
+    metrics = Metrics()
+    with metrics.phase("verify"):
+        result = verify_mirror(mirror_folder, workers)
+    metrics.add_items(result.checked)
+    metrics.stop()
+
+    print(f"  Archivos comprobados: {result.checked}")
+    if result.without_hash:
+        print(f"  Archivos copiados con --no-checksum: {result.without_hash}")
+    for line in metrics.summary_lines():
+        print(line)
+    print()
+    if result.damaged:
+        print(f"❌ {len(result.damaged)} archivos dañados o que faltan en la copia:")
+        for path in result.damaged:
+            print(f"   {path}")
+        print("   Se volverán a copiar si se borran y se ejecuta de nuevo la copia.")
+    else:
+        print("✅ ¡Todos los archivos de la copia están bien!")
+    print()
+
+
+def main() -> None:
+    # Print banner first
+    _print_banner()
+
+    parser = argparse.ArgumentParser(
+        description="Copia a otra carpeta o disco solo los archivos nuevos o "
+        "modificados."
+    )
+    parser.add_argument(
+        "source_folder",
+        type=Path,
+        help="Carpeta de origen",
+    )
+    parser.add_argument(
+        "mirror_folder",
+        type=Path,
+        help="Carpeta de la copia de seguridad",
+    )
+    parser.add_argument(
+        "-n",
+        "--dry-run",
+        action="store_true",
+        help="Modo simulación (sin copiar ni borrar archivos)",
+    )
+    parser.add_argument(
+        "-w",
+        "--workers",
+        type=int,
+        default=4,
+        help="Número de archivos copiados en paralelo (por defecto: %(default)s)",
+    )
+    parser.add_argument(
+        "--include",
+        action="append",
+        default=[],
+        metavar="PATRÓN",
+        help="Copiar solo los archivos o carpetas que coincidan, p. ej. '*Ampar*' "
+        "(se puede repetir)",
+    )
+    parser.add_argument(
+        "--exclude",
+        action="append",
+        default=[],
+        metavar="PATRÓN",
+        help="No copiar los archivos o carpetas que coincidan (se puede repetir)",
+    )
+    parser.add_argument(
+        "--delete",
+        action="store_true",
+        help="Borrar de la copia los archivos que ya no están en el origen",
+    )
+    parser.add_argument(
+        "--no-checksum",
+        action="store_true",
+        help="No calcular la suma de cada archivo al copiarlo: el sistema copia "
+        "los archivos sin pasarlos por Python, lo que es más rápido sobre todo "
+        "dentro del mismo disco, pero --verify no podrá comprobar esas copias",
+    )
+    parser.add_argument(
+        "--verify",
+        action="store_true",
+        help="Solo comprobar que los archivos de la copia no están dañados",
+    )
+    parser.add_argument(
+        "-v",
+        "--verbose",
+        action="store_true",
+        help="Mostrar información detallada durante el proceso",
+    )
+    args = parser.parse_args()
+
+    # Set logging level based on verbose flag
+    if args.verbose:
+        logging.getLogger().setLevel(logging.DEBUG)
+
+    source_folder = args.source_folder.absolute()
+    mirror_folder = args.mirror_folder.absolute()
+    if not source_folder.is_dir():
+        print(f"❌ Error: La carpeta de origen no existe: {source_folder}")
+        return
+
+    print(f"📂 Carpeta de origen: {source_folder}")
+    print(f"💾 Copia de seguridad: {mirror_folder}")
+    if args.dry_run:
+        print("🔍 Modo simulación activado")
+    print()
+
+    try:
+        if args.verify:
+            verify_folder(mirror_folder, max(1, args.workers))
+            return
+        update_mirror(
+            source_folder,
+            mirror_folder,
+            args.dry_run,
+            max(1, args.workers),
+            not args.no_checksum,
+            args.delete,
+            args.include,
+            args.exclude,
+        )
+    except KeyboardInterrupt:
+        print("\n⏹️  Proceso interrumpido por el usuario.")
+    except OSError as e:
+        print(f"\n❌ Error inesperado: {e}")
+        if args.verbose:
+            _logger.error("Error detallado: %s", e, exc_info=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,6 @@
+"""
+Shared helpers for the papa-toolkit scripts.
+
+The scripts at the top of the repository are the entry points; this package
+only holds the pieces they have in common.
+"""
@@ -0,0 +1,332 @@
+"""
+Persistent index of the files stored in the picture archive.
+
+The index lives in the archive root and records the relative path, size, mtime
+and date of every archived file. Content hashes are only computed when needed:
+the first time a new file has the same size as an archived one, and they are
+kept for later runs. Checking whether a file is already archived therefore
+costs one indexed query for most files, and a couple of hashes for the rest.
+
+Files on their way into the archive (the destinations of a dry run, copies
+still in progress) are reserved in memory, so later files of the same run
+already find them although they are not on disk yet.
+"""
+
+import logging
+import sqlite3
+from collections.abc import Callable
+from datetime import datetime
+from pathlib import Path
+from typing import NamedTuple
+
+from .duplicates import IGNORED_FILES
+from .hashing import covers_whole_file, full_hash, partial_hash
+from .scanner import scan_files
+
+_logger = logging.getLogger(__name__)
+
+INDEX_FILENAME = ".papa-index.sqlite"
+
+_SCHEMA_VERSION = 1
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    relpath TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    date_taken TEXT,
+    partial_hash TEXT,
+    content_hash TEXT
+);
+CREATE INDEX IF NOT EXISTS files_size ON files (size);
+"""
+
+# Hashes filled in lazily are committed in batches of this size
+_COMMIT_EVERY = 200
+
+
+class ArchiveMatch(NamedTuple):
+    """Result of ArchiveIndex.lookup, the hashes of the file can be reused."""
+
+    relpath: str | None  # archived copy, None if the file is not archived
+    partial_hash: str | None
+    content_hash: str | None
+
+
+class _Reserved(NamedTuple):
+    """A file reserved in the index, see ArchiveIndex.reserve."""
+
+    size: int
+    source: Path
+    partial_hash: str | None
+    content_hash: str | None
+
+
+class ArchiveIndex:
+    """
+    Index of an archive folder, see the module documentation.
+
+    Not thread-safe: meant to be used from the thread moving files.
+    """
+
+    def __init__(self, root: Path, read_only: bool = False):
+        """
+        Args:
+            root: Archive folder
+            read_only: If True the index on disk, if any, is loaded in memory
+                and changes are not saved (e.g. for dry runs, that must not
+                write in the archive)
+        """
+        self.root = root
+        db_path = root / INDEX_FILENAME
+        if read_only:
+            self._conn = sqlite3.connect(":memory:")
+            if db_path.exists():
+                uri = f"{db_path.absolute().as_uri()}?mode=ro"
+                disk = sqlite3.connect(uri, uri=True)
+                try:
+                    disk.backup(self._conn)
+                finally:
+                    disk.close()
+        else:
+            self._conn = sqlite3.connect(db_path)
+        self._uncommitted = 0
+        # relpath -> reserved file, and the relpaths reserved of each size
+        self._reserved: dict[str, _Reserved] = {}
+        self._reserved_sizes: dict[int, set[str]] = {}
+        (version,) = self._conn.execute("PRAGMA user_version").fetchone()
+        if version != _SCHEMA_VERSION:
+            self._conn.execute("DROP TABLE IF EXISTS files")
+            self._conn.execute(f"PRAGMA user_version={_SCHEMA_VERSION}")
+        self._conn.executescript(_SCHEMA)
+        self._conn.commit()
+
+    def __enter__(self) -> "ArchiveIndex":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM files").fetchone()[0]
+
+    def rebuild(self) -> int:
+        """
+        Synchronize the index with the archive contents in a single scan.
+
+        Files whose size and mtime did not change keep their hashes. Returns
+        the number of files in the archive.
+        """
+        known = {
+            relpath: (size, mtime_ns)
+            for relpath, size, mtime_ns in self._conn.execute(
+                "SELECT relpath, size, mtime_ns FROM files"
+            )
+        }
+        seen = set()
+        for source in scan_files(self.root, recursive=True, exclude=IGNORED_FILES):
+            relpath = source.path.relative_to(self.root).as_posix()
+            seen.add(relpath)
+            if known.get(relpath) != (source.size, source.mtime_ns):
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO files (relpath, size, mtime_ns) "
+                    "VALUES (?, ?, ?)",
+                    (relpath, source.size, source.mtime_ns),
+                )
+        self._conn.executemany(
+            "DELETE FROM files WHERE relpath=?",
+            [(relpath,) for relpath in known.keys() - seen],
+        )
+        self._conn.commit()
+        return len(seen)
+
+    def lookup(self, path: Path, size: int) -> ArchiveMatch:
+        """Find an archived or reserved file with the same content as ``path``."""
+        rows = self._conn.execute(
+            "SELECT relpath, mtime_ns, partial_hash, content_hash FROM files "
+            "WHERE size=?",
+            (size,),
+        ).fetchall()
+        reserved = self._reserved_sizes.get(size, ())
+        if not rows and not reserved:
+            return ArchiveMatch(None, None, None)
+
+        source_partial = partial_hash(path, size)
+        source_full = source_partial if covers_whole_file(size) else None
+
+        # Reserved files may not be on disk yet, they are hashed from their source
+        for relpath in reserved:
+            entry = self._reserved[relpath]
+            if entry.partial_hash is None:
+                entry = self._reserved[relpath] = entry._replace(
+                    partial_hash=self._hash_reserved(
+                        relpath, lambda f: partial_hash(f, size)
+                    )
+                )
+            if entry.partial_hash != source_partial:
+                continue
+            if covers_whole_file(size):
+                return ArchiveMatch(relpath, source_partial, source_full)
+
+            if source_full is None:
+                source_full = full_hash(path)
+            if entry.content_hash is None:
+                entry = self._reserved[relpath] = entry._replace(
+                    content_hash=self._hash_reserved(relpath, full_hash)
+                )
+            if entry.content_hash == source_full:
+                return ArchiveMatch(relpath, source_partial, source_full)
+
+        for relpath, mtime_ns, archived_partial, archived_full in rows:
+            if relpath in self._reserved:
+                continue  # e.g. a stale row of a file being copied again
+            archived = self.root / relpath
+            try:
+                stat = archived.stat()
+            except FileNotFoundError:
+                self._execute("DELETE FROM files WHERE relpath=?", (relpath,))
+                continue
+            if stat.st_size != size:
+                self._execute(
+                    "UPDATE files SET size=?, mtime_ns=?, partial_hash=NULL, "
+                    "content_hash=NULL WHERE relpath=?",
+                    (stat.st_size, stat.st_mtime_ns, relpath),
+                )
+                continue
+            if stat.st_mtime_ns != mtime_ns:  # modified in place, hashes are stale
+                archived_partial = archived_full = None
+
+            if archived_partial is None:
+                archived_partial = partial_hash(archived, size)
+                self._execute(
+                    "UPDATE files SET mtime_ns=?, partial_hash=?, content_hash=NULL "
+                    "WHERE relpath=?",
+                    (stat.st_mtime_ns, archived_partial, relpath),
+                )
+            if archived_partial != source_partial:
+                continue
+            if covers_whole_file(size):
+                return ArchiveMatch(relpath, source_partial, source_full)
+
+            if source_full is None:
+                source_full = full_hash(path)
+            if archived_full is None:
+                archived_full = full_hash(archived)
+                self._execute(
+                    "UPDATE files SET content_hash=? WHERE relpath=?",
+                    (archived_full, relpath),
+                )
+            if archived_full == source_full:
+                return ArchiveMatch(relpath, source_partial, source_full)
+
+        return ArchiveMatch(None, source_partial, source_full)
+
+    def add(
+        self,
+        path: Path,
+        size: int,
+        mtime_ns: int,
+        date_taken: datetime | None = None,
+        match: ArchiveMatch | None = None,
+    ) -> None:
+        """Record a file just moved into the archive (``path`` inside ``root``)."""
+        relpath = path.relative_to(self.root).as_posix()
+        reserved = self._release(relpath)
+        if reserved is not None:
+            # Its hashes may have been read since it was reserved
+            match = ArchiveMatch(relpath, reserved.partial_hash, reserved.content_hash)
+        self._execute(
+            "INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?, ?)",
+            (
+                relpath,
+                size,
+                mtime_ns,
+                date_taken.isoformat() if date_taken else None,
+                match.partial_hash if match else None,
+                match.content_hash if match else None,
+            ),
+        )
+
+    def reserve(
+        self,
+        path: Path,
+        size: int,
+        source: Path,
+        match: ArchiveMatch | None = None,
+    ) -> None:
+        """
+        Reserve ``path`` in the archive for the file at ``source``, until it
+        is added (see add) or released.
+
+        Lookups find reserved files as if they were archived, which they are
+        not yet (a copy in progress) or never will be (the destinations of a
+        dry run). Their hashes are taken from ``match`` or read when needed,
+        from ``source`` or from ``path`` once moved. Reservations are not
+        saved in the index.
+        """
+        relpath = path.relative_to(self.root).as_posix()
+        self._reserved[relpath] = _Reserved(
+            size,
+            source,
+            match.partial_hash if match else None,
+            match.content_hash if match else None,
+        )
+        self._reserved_sizes.setdefault(size, set()).add(relpath)
+
+    def release(self, path: Path) -> None:
+        """Forget the reservation of ``path``, e.g. its copy failed."""
+        self._release(path.relative_to(self.root).as_posix())
+
+    def rename(self, old: Path, new: Path) -> None:
+        """Update the entry of a file moved inside the archive."""
+        self._execute(
+            "UPDATE OR REPLACE files SET relpath=? WHERE relpath=?",
+            (
+                new.relative_to(self.root).as_posix(),
+                old.relative_to(self.root).as_posix(),
+            ),
+        )
+
+    def remove(self, path: Path) -> None:
+        """Forget a file deleted from the archive."""
+        self._execute(
+            "DELETE FROM files WHERE relpath=?",
+            (path.relative_to(self.root).as_posix(),),
+        )
+
+    def rename_folder(self, old: Path, new: Path) -> None:
+        """Update the entries of a folder moved inside the archive."""
+        old_prefix = old.relative_to(self.root).as_posix() + "/"
+        new_prefix = new.relative_to(self.root).as_posix() + "/"
+        self._execute(
+            "UPDATE files SET relpath = ? || substr(relpath, ?) "
+            "WHERE relpath >= ? AND relpath < ?",
+            (new_prefix, len(old_prefix) + 1, old_prefix, old_prefix + "\U0010ffff"),
+        )
+
+    def commit(self) -> None:
+        self._conn.commit()
+        self._uncommitted = 0
+
+    def close(self) -> None:
+        self.commit()
+        self._conn.close()
+
+    def _release(self, relpath: str) -> _Reserved | None:
+        reserved = self._reserved.pop(relpath, None)
+        if reserved is not None:
+            self._reserved_sizes[reserved.size].discard(relpath)
+        return reserved
+
+    def _hash_reserved(self, relpath: str, hash_file: Callable[[Path], str]) -> str:
+        try:
+            return hash_file(self._reserved[relpath].source)
+        except FileNotFoundError:
+            # Already moved: sources are only deleted once their file is in place
+            return hash_file(self.root / relpath)
+
+    def _execute(self, sql: str, params: tuple) -> None:
+        self._conn.execute(sql, params)
+        self._uncommitted += 1
+        if self._uncommitted >= _COMMIT_EVERY:
+            self.commit()
@@ -0,0 +1,75 @@
+"""
+Minimal reader for the ISO base media file format (MP4, MOV, HEIC...).
+
+Files in this format are a tree of boxes (a.k.a. atoms), each one starting with
+its size and a four letter type. Only box headers are read while walking the
+tree, so large payloads like the media data are skipped with a seek.
+"""
+
+import struct
+from collections.abc import Iterator
+from typing import BinaryIO
+
+
+class BoxError(ValueError):
+    """The file is truncated or is not a valid ISO-BMFF file."""
+
+
+def iter_boxes(f: BinaryIO, start: int, end: int) -> Iterator[tuple[bytes, int, int]]:
+    """
+    Iterate over the boxes found between ``start`` and ``end``.
+
+    Yields (box type, payload start, payload end) tuples. The file position is
+    undefined after each step, callers can seek and read freely.
+    """
+    pos = start
+    while pos + 8 <= end:
+        f.seek(pos)
+        header = f.read(8)
+        if len(header) < 8:
+            return
+        size, box_type = struct.unpack(">I4s", header)
+        header_size = 8
+        if size == 1:  # 64-bit size follows the type
+            large_size = f.read(8)
+            if len(large_size) < 8:
+                raise BoxError("Truncated box header")
+            (size,) = struct.unpack(">Q", large_size)
+            header_size = 16
+        elif size == 0:  # box extends to the end of its container
+            size = end - pos
+        if size < header_size:
+            raise BoxError(f"Invalid size for box {box_type!r} at {pos}")
+        yield box_type, pos + header_size, min(pos + size, end)
+        pos += size
+
+
+def find_box(
+    f: BinaryIO, path: tuple[bytes, ...], start: int, end: int
+) -> tuple[int, int] | None:
+    """
+    Find the first box matching ``path`` (e.g. ``(b"moov", b"mvhd")``).
+
+    Returns the (payload start, payload end) of the box, or None.
+    """
+    for box_type, payload_start, payload_end in iter_boxes(f, start, end):
+        if box_type != path[0]:
+            continue
+        if len(path) == 1:
+            return payload_start, payload_end
+        found = find_box(f, path[1:], payload_start, payload_end)
+        if found:
+            return found
+    return None
+
+
+def file_size(f: BinaryIO) -> int:
+    return f.seek(0, 2)
+
+
+def read_exact(f: BinaryIO, offset: int, size: int) -> bytes:
+    f.seek(offset)
+    data = f.read(size)
+    if len(data) < size:
+        raise BoxError(f"Truncated data at {offset}")
+    return data
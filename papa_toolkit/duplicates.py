@@ -0,0 +1,120 @@
+"""
+Detection of files with identical content.
+
+Candidates are narrowed down in stages, each one more expensive but run on
+fewer files than the previous one:
+
+1. files are grouped by size (no reads, the size comes from the scan),
+2. same-size files are grouped by a hash of their first and last 64 KiB,
+3. the remaining candidates are grouped by a hash of their whole content.
+
+Hashes are computed by a thread pool, so the archive is read at most about once
+for the files that really are candidates.
+"""
+
+import logging
+import re
+from collections import defaultdict
+from collections.abc import Callable, Iterable
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import NamedTuple
+
+from .hashing import covers_whole_file, full_hash, partial_hash
+from .scanner import scan_files
+
+_logger = logging.getLogger(__name__)
+
+# Files that are not pictures and only hold folder settings or thumbnails
+IGNORED_FILES = {".*", "desktop.ini", "Thumbs.db"}
+
+# Suffixes added by Windows and Dropbox to copies of a file
+_COPY_SUFFIX_RE = re.compile(
+    r"( \(\d+\)|-\d{3}| - copia( \(\d+\))?| - copy( \(\d+\))?)$", re.IGNORECASE
+)
+
+
+class DuplicateGroup(NamedTuple):
+    size: int
+    paths: list[Path]  # the one to keep first, see choose_original
+
+
+def _original_sort_key(path: Path) -> tuple:
+    return (bool(_COPY_SUFFIX_RE.search(path.stem)), len(path.parts), str(path))
+
+
+def choose_original(paths: Iterable[Path]) -> list[Path]:
+    """
+    Sort identical files putting first the one to keep.
+
+    Prefers names without copy suffixes (" (2)", " - copia"...), then the
+    shallowest path and finally the alphabetical order, so the choice is stable
+    between runs.
+    """
+    return sorted(paths, key=_original_sort_key)
+
+
+def _regroup(
+    groups: list[tuple[int, list[Path]]],
+    hash_func: Callable[[Path, int], str],
+    executor: ThreadPoolExecutor,
+) -> list[tuple[int, list[Path]]]:
+    """Split (size, paths) groups by ``hash_func``, keeping only duplicates."""
+    jobs = [(path, size) for size, paths in groups for path in paths]
+
+    def safe_hash(job: tuple[Path, int]) -> str | None:
+        try:
+            return hash_func(*job)
+        except OSError as e:
+            _logger.warning("No se pudo leer %s: %s", job[0], e)
+            return None
+
+    hashes = iter(executor.map(safe_hash, jobs))
+    result = []
+    for size, paths in groups:
+        by_hash = defaultdict(list)
+        for path in paths:
+            digest = next(hashes)
+            if digest is not None:
+                by_hash[digest].append(path)
+        result.extend((size, g) for g in by_hash.values() if len(g) > 1)
+    return result
+
+
+def group_duplicates(
+    files: Iterable[tuple[Path, int]], workers: int = 4
+) -> list[DuplicateGroup]:
+    """
+    Group identical files given as (path, size) pairs.
+
+    Only groups with more than one file are returned.
+    """
+    by_size = defaultdict(list)
+    for path, size in files:
+        by_size[size].append(path)
+    candidates = [(size, paths) for size, paths in by_size.items() if len(paths) > 1]
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        candidates = _regroup(candidates, partial_hash, executor)
+        # The partial hash already covered the whole content of small files
+        done = [group for group in candidates if covers_whole_file(group[0])]
+        pending = [group for group in candidates if not covers_whole_file(group[0])]
+        done += _regroup(pending, lambda path, size: full_hash(path), executor)
+
+    return [DuplicateGroup(size, choose_original(paths)) for size, paths in done]
+
+
+def find_duplicates(
+    folders: Iterable[Path],
+    workers: int = 4,
+    min_size: int = 1,
+    exclude: Iterable[str] = IGNORED_FILES,
+) -> list[DuplicateGroup]:
+    """Find identical files anywhere below ``folders``."""
+    exclude = list(exclude)
+    files = {}  # keyed on the path, in case the folders overlap
+    for folder in folders:
+        for source in scan_files(folder, recursive=True, exclude=exclude):
+            if source.size >= min_size:
+                files[source.path.absolute()] = source.size
+    return group_duplicates(files.items(), workers)
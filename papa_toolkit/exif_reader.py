@@ -0,0 +1,254 @@
+"""
+Header-only reader of the EXIF date a picture was taken.
+
+Instead of decoding the image, the reader jumps straight to the TIFF structure
+holding the EXIF tags (the APP1 segment of a JPEG, the start of a TIFF/RAW
+file, the ``eXIf`` chunk of a PNG or the ``Exif`` item of a HEIC or AVIF file) and
+only reads the few bytes needed for DateTimeOriginal, OffsetTimeOriginal and
+SubSecTimeOriginal.
+"""
+
+import struct
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import BinaryIO
+
+from . import bmff
+
+_EXIF_IFD_POINTER = 0x8769
+_DATE_TIME_ORIGINAL = 0x9003
+_OFFSET_TIME_ORIGINAL = 0x9011
+_SUBSEC_TIME_ORIGINAL = 0x9291
+
+_ASCII = 2
+
+# JPEG markers without a length field, and the start of scan (image data)
+_JPEG_STANDALONE_MARKERS = {0x01, *range(0xD0, 0xD8)}
+_JPEG_START_OF_SCAN = 0xDA
+
+
+class ExifError(ValueError):
+    """The file could not be parsed, callers may try a slower reader."""
+
+
+def _parse_exif_datetime(
+    value: str, offset: str | None, subsec: str | None
+) -> datetime | None:
+    # "YYYY:MM:DD HH:MM:SS", blank or zeroed when the camera had no clock
+    value = value.strip()
+    if len(value) < 19 or not value[:4].isdigit() or value.startswith("0000"):
+        return None
+    try:
+        date = datetime(
+            int(value[0:4]),
+            int(value[5:7]),
+            int(value[8:10]),
+            int(value[11:13]),
+            int(value[14:16]),
+            int(value[17:19]),
+        )
+    except ValueError:
+        return None
+
+    subsec = (subsec or "").strip()
+    if subsec.isdigit():
+        date = date.replace(microsecond=int(subsec[:6].ljust(6, "0")))
+
+    offset = (offset or "").strip()  # "+HH:MM"
+    if len(offset) == 6 and offset[0] in "+-" and offset[3] == ":":
+        try:
+            delta = timedelta(hours=int(offset[1:3]), minutes=int(offset[4:6]))
+        except ValueError:
+            delta = None
+        if delta is not None:
+            tz = timezone(-delta if offset[0] == "-" else delta)
+            date = date.replace(tzinfo=tz)
+    return date
+
+
+def _read_tiff_datetime(f: BinaryIO, tiff_start: int) -> datetime | None:
+    """Read the original date from the TIFF structure starting at ``tiff_start``."""
+    header = bmff.read_exact(f, tiff_start, 8)
+    if header[:2] == b"II":
+        endian = "<"
+    elif header[:2] == b"MM":
+        endian = ">"
+    else:
+        raise ExifError("Invalid TIFF byte order")
+    # The magic number (42) is not checked: some raw formats use their own
+    (ifd0_offset,) = struct.unpack(endian + "I", header[4:8])
+
+    def read_ifd(offset: int) -> dict[int, tuple[int, int, bytes]]:
+        count_data = bmff.read_exact(f, tiff_start + offset, 2)
+        (count,) = struct.unpack(endian + "H", count_data)
+        data = bmff.read_exact(f, tiff_start + offset + 2, count * 12)
+        entries = {}
+        for i in range(0, count * 12, 12):
+            tag, value_type, value_count = struct.unpack_from(endian + "HHI", data, i)
+            entries[tag] = (value_type, value_count, data[i + 8 : i + 12])
+        return entries
+
+    def read_ascii(entry: tuple[int, int, bytes] | None) -> str | None:
+        if entry is None or entry[0] != _ASCII:
+            return None
+        _, count, value = entry
+        if count > 4:
+            (offset,) = struct.unpack(endian + "I", value)
+            value = bmff.read_exact(f, tiff_start + offset, count)
+        return value[:count].split(b"\0", 1)[0].decode("ascii", "replace")
+
+    ifd0 = read_ifd(ifd0_offset)
+    pointer = ifd0.get(_EXIF_IFD_POINTER)
+    if pointer is None:
+        return None
+    (exif_offset,) = struct.unpack(endian + "I", pointer[2])
+    exif_ifd = read_ifd(exif_offset)
+
+    date_time = read_ascii(exif_ifd.get(_DATE_TIME_ORIGINAL))
+    if not date_time:
+        return None
+    return _parse_exif_datetime(
+        date_time,
+        read_ascii(exif_ifd.get(_OFFSET_TIME_ORIGINAL)),
+        read_ascii(exif_ifd.get(_SUBSEC_TIME_ORIGINAL)),
+    )
+
+
+def _find_jpeg_tiff(f: BinaryIO) -> int | None:
+    """Offset of the TIFF header inside the JPEG APP1 Exif segment."""
+    pos = 2  # after SOI
+    while True:
+        marker = bmff.read_exact(f, pos, 4)
+        if marker[0] != 0xFF:
+            raise ExifError(f"Invalid JPEG marker at {pos}")
+        code = marker[1]
+        if code == 0xFF:  # fill byte
+            pos += 1
+            continue
+        if code in _JPEG_STANDALONE_MARKERS:
+            pos += 2
+            continue
+        if code == _JPEG_START_OF_SCAN:
+            return None
+        (length,) = struct.unpack(">H", marker[2:4])
+        if code == 0xE1 and length >= 14:
+            if bmff.read_exact(f, pos + 4, 6) == b"Exif\0\0":
+                return pos + 10
+        pos += 2 + length
+
+
+def _find_png_tiff(f: BinaryIO) -> int | None:
+    """Offset of the TIFF data in the PNG ``eXIf`` chunk."""
+    pos = 8  # after the signature
+    while True:
+        f.seek(pos)
+        header = f.read(8)
+        if len(header) < 8:
+            return None
+        length, chunk_type = struct.unpack(">I4s", header)
+        if chunk_type == b"eXIf":
+            return pos + 8
+        if chunk_type in (b"IDAT", b"IEND"):
+            return None
+        pos += 12 + length  # length + type + data + crc
+
+
+def _find_heic_tiff(f: BinaryIO) -> int | None:
+    """Offset of the TIFF data in the ``Exif`` item of a HEIF file."""
+    meta = bmff.find_box(f, (b"meta",), 0, bmff.file_size(f))
+    if meta is None:
+        return None
+    meta_start, meta_end = meta[0] + 4, meta[1]  # full box: skip version/flags
+
+    iinf = bmff.find_box(f, (b"iinf",), meta_start, meta_end)
+    iloc = bmff.find_box(f, (b"iloc",), meta_start, meta_end)
+    if iinf is None or iloc is None:
+        return None
+
+    # Item information: look for the item of type 'Exif'
+    version = bmff.read_exact(f, iinf[0], 1)[0]
+    entries_start = iinf[0] + (6 if version == 0 else 8)
+    exif_item_id = None
+    for box_type, start, _ in bmff.iter_boxes(f, entries_start, iinf[1]):
+        if box_type != b"infe":
+            continue
+        infe = bmff.read_exact(f, start, 14)
+        if infe[0] == 2:
+            item_id, item_type = int.from_bytes(infe[4:6], "big"), infe[8:12]
+        elif infe[0] == 3:
+            item_id, item_type = int.from_bytes(infe[4:8], "big"), infe[10:14]
+        else:
+            continue
+        if item_type == b"Exif":
+            exif_item_id = item_id
+            break
+    if exif_item_id is None:
+        return None
+
+    # Item location: find where the data of that item is stored
+    data = bmff.read_exact(f, iloc[0], iloc[1] - iloc[0])
+    version = data[0]
+    offset_size, length_size = data[4] >> 4, data[4] & 0x0F
+    base_offset_size, index_size = data[5] >> 4, data[5] & 0x0F
+    if version < 1:
+        index_size = 0
+
+    pos = 6
+
+    def read_uint(size: int) -> int:
+        nonlocal pos
+        value = int.from_bytes(data[pos : pos + size], "big") if size else 0
+        pos += size
+        return value
+
+    item_count = read_uint(2 if version < 2 else 4)
+    for _ in range(item_count):
+        item_id = read_uint(2 if version < 2 else 4)
+        construction_method = read_uint(2) & 0x0F if version in (1, 2) else 0
+        read_uint(2)  # data reference index
+        base_offset = read_uint(base_offset_size)
+        extent_count = read_uint(2)
+        extents = []
+        for _ in range(extent_count):
+            read_uint(index_size)
+            extents.append((read_uint(offset_size), read_uint(length_size)))
+        if item_id != exif_item_id:
+            continue
+        if construction_method != 0 or not extents:
+            raise ExifError("Unsupported Exif item location")
+        item_start = base_offset + extents[0][0]
+        # The item starts with the offset to the TIFF header ("Exif\0\0" prefix)
+        (tiff_offset,) = struct.unpack(">I", bmff.read_exact(f, item_start, 4))
+        return item_start + 4 + tiff_offset
+    return None
+
+
+_TIFF_FINDERS = {
+    "jpeg": _find_jpeg_tiff,
+    "png": _find_png_tiff,
+    "heic": _find_heic_tiff,
+    "avif": _find_heic_tiff,
+    "tiff": lambda f: 0,
+    "raw": lambda f: 0,
+}
+
+
+def read_exif_datetime(path: Path, media_type: str) -> datetime | None:
+    """
+    Read DateTimeOriginal from a picture of the given media type.
+
+    The result is timezone aware when the file records OffsetTimeOriginal.
+    Returns None when the file has no such tag, and raises ExifError when the
+    format is not supported or the file could not be parsed.
+    """
+    find_tiff = _TIFF_FINDERS.get(media_type)
+    if find_tiff is None:
+        raise ExifError(f"Unsupported media type: {media_type}")
+    with open(path, "rb") as f:
+        try:
+            tiff_start = find_tiff(f)
+            if tiff_start is None:
+                return None
+            return _read_tiff_datetime(f, tiff_start)
+        except (struct.error, IndexError, bmff.BoxError) as e:
+            raise ExifError(f"Corrupt metadata in {path.name}: {e}") from e
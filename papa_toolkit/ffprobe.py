@@ -0,0 +1,173 @@
+"""
+Creation dates of videos through ffprobe.
+
+Only used for the containers papa_toolkit.video_reader cannot parse (AVI, MKV,
+WMV...). The executable is looked up once per process and probes run as
+asyncio subprocesses on a background event loop, so several of them can be in
+flight at once with a bounded concurrency and a timeout per probe.
+
+Nothing of this is paid for until the first such video: asyncio is imported,
+the executable looked up and the loop started by the first probe.
+"""
+
+import functools
+import json
+import logging
+import shutil
+import threading
+from concurrent.futures import Future
+from datetime import datetime
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import asyncio
+
+_logger = logging.getLogger(__name__)
+
+_FFPROBE_ARGS = (
+    "-v",
+    "quiet",
+    "-print_format",
+    "json",
+    "-show_entries",
+    "format_tags=creation_time:stream_tags=creation_time",
+)
+
+_DATE_FORMATS = ("%Y-%m-%dT%H:%M:%S.%fZ", "%Y-%m-%dT%H:%M:%SZ", "%Y-%m-%d %H:%M:%S")
+
+
+@functools.cache
+def find_ffprobe() -> str | None:
+    """Path to the ffprobe executable (``ffprobe.exe`` on Windows), or None."""
+    return shutil.which("ffprobe")
+
+
+def parse_creation_time(output: str) -> datetime | None:
+    """Extract the creation time from the JSON printed by ffprobe."""
+    metadata = json.loads(output)
+
+    # Try format tags first
+    creation_time = metadata.get("format", {}).get("tags", {}).get("creation_time")
+
+    # If not found, try stream tags
+    if not creation_time and "streams" in metadata:
+        for stream in metadata["streams"]:
+            creation_time = stream.get("tags", {}).get("creation_time")
+            if creation_time:
+                break
+
+    if creation_time:
+        # Handle different datetime formats
+        for fmt in _DATE_FORMATS:
+            try:
+                return datetime.strptime(creation_time, fmt)
+            except ValueError:
+                continue
+    return None
+
+
+class FFprobePool:
+    """
+    Runs ffprobe processes concurrently, at most ``concurrency`` at a time.
+
+    ``probe`` can be called from any thread and returns a future. The event
+    loop thread is only started with the first probe. If ffprobe is not
+    installed, probes fail with FileNotFoundError and a warning is logged once.
+    """
+
+    def __init__(self, concurrency: int = 4, timeout: float = 30.0):
+        self._timeout = timeout
+        self._concurrency = max(1, concurrency)
+        self._semaphore: asyncio.Semaphore | None = None
+        self._lock = threading.Lock()
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._thread: threading.Thread | None = None
+        self._warned = False
+
+    def __enter__(self) -> "FFprobePool":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def probe(self, video_path: Path) -> Future:
+        """Schedule a probe, the future resolves to the creation date or None."""
+        ffprobe = find_ffprobe()
+        if ffprobe is None:
+            self._warn_missing()
+            future = Future()
+            future.set_exception(
+                FileNotFoundError("ffprobe no está disponible en el sistema")
+            )
+            return future
+
+        import asyncio
+
+        return asyncio.run_coroutine_threadsafe(
+            self._probe(ffprobe, video_path), self._ensure_loop()
+        )
+
+    def probe_creation_date(self, video_path: Path) -> datetime | None:
+        """Blocking version of ``probe``."""
+        return self.probe(video_path).result()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._loop is None:
+                return
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+            self._loop.close()
+            self._loop = self._thread = None
+
+    def _warn_missing(self) -> None:
+        with self._lock:
+            if self._warned:
+                return
+            self._warned = True
+        _logger.warning(
+            "ffprobe no está disponible en el sistema: los videos AVI/MKV/WMV "
+            "se fecharán por el nombre del archivo. Instale ffmpeg para obtenerlo."
+        )
+
+    def _ensure_loop(self) -> "asyncio.AbstractEventLoop":
+        import asyncio
+
+        with self._lock:
+            if self._loop is None:
+                self._semaphore = asyncio.Semaphore(self._concurrency)
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(
+                    target=self._loop.run_forever, name="ffprobe-pool", daemon=True
+                )
+                self._thread.start()
+            return self._loop
+
+    async def _probe(self, ffprobe: str, video_path: Path) -> datetime | None:
+        import asyncio
+
+        async with self._semaphore:
+            process = await asyncio.create_subprocess_exec(
+                ffprobe,
+                *_FFPROBE_ARGS,
+                str(video_path),
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.DEVNULL,
+            )
+            try:
+                stdout, _ = await asyncio.wait_for(
+                    process.communicate(), self._timeout
+                )
+            except TimeoutError:
+                process.kill()
+                await process.wait()
+                raise TimeoutError(
+                    f"ffprobe did not finish in {self._timeout}s for {video_path}"
+                ) from None
+
+        if process.returncode != 0:
+            import subprocess
+
+            raise subprocess.CalledProcessError(process.returncode, ffprobe)
+        return parse_creation_time(stdout.decode("utf-8", "replace"))
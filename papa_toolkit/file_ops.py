@@ -0,0 +1,93 @@
+"""
+Fast file copies.
+
+Copies use ``os.copy_file_range`` where available (Linux), which lets the
+kernel move the data (or share blocks on filesystems supporting reflinks)
+without passing it through Python. Otherwise ``shutil.copyfile`` picks the
+fastest method of the platform. When a hash of the content is wanted, the data
+is hashed while being copied so the source is still read only once.
+"""
+
+import errno
+import os
+import shutil
+from pathlib import Path
+
+_BUFFER_SIZE = 1024 * 1024
+
+# Errors meaning copy_file_range cannot be used between these two files
+_COPY_FILE_RANGE_UNSUPPORTED = {
+    errno.EXDEV,
+    errno.ENOSYS,
+    errno.EINVAL,
+    errno.EOPNOTSUPP,
+    errno.EBADF,
+    errno.EPERM,
+}
+
+PARTIAL_SUFFIX = ".papa-part"
+
+
+def partial_path(destination: Path) -> Path:
+    """Temporary name used while ``destination`` is being written."""
+    return destination.with_name(f".{destination.name}{PARTIAL_SUFFIX}")
+
+
+def _copy_file_range(fsrc, fdst) -> int:
+    total = 0
+    src_fd, dst_fd = fsrc.fileno(), fdst.fileno()
+    while True:
+        copied = os.copy_file_range(src_fd, dst_fd, 1 << 30)
+        if copied == 0:
+            return total
+        total += copied
+
+
+def _copy_hashing(fsrc, fdst, hasher) -> int:
+    total = 0
+    buffer = bytearray(_BUFFER_SIZE)
+    view = memoryview(buffer)
+    while read := fsrc.readinto(buffer):
+        chunk = view[:read]
+        if hasher is not None:
+            hasher.update(chunk)
+        fdst.write(chunk)
+        total += read
+    return total
+
+
+def copy_file(src: Path, dst: Path, hasher=None, fsync: bool = False) -> int:
+    """
+    Copy the content and timestamps of ``src`` to ``dst``.
+
+    Args:
+        src: File to copy
+        dst: Destination file, overwritten if it exists
+        hasher: Optional hashlib object updated with the content while copying
+        fsync: Flush the destination to disk before returning
+
+    Returns the number of bytes copied.
+    """
+    if hasher is None and not hasattr(os, "copy_file_range") and not fsync:
+        shutil.copyfile(src, dst)
+        shutil.copystat(src, dst)
+        return dst.stat().st_size
+
+    with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+        copied = None
+        if hasher is None and hasattr(os, "copy_file_range"):
+            try:
+                copied = _copy_file_range(fsrc, fdst)
+            except OSError as e:
+                if e.errno not in _COPY_FILE_RANGE_UNSUPPORTED:
+                    raise
+                fsrc.seek(0)
+                fdst.seek(0)
+                fdst.truncate()
+        if copied is None:
+            copied = _copy_hashing(fsrc, fdst, hasher)
+        if fsync:
+            fdst.flush()
+            os.fsync(fdst.fileno())
+    shutil.copystat(src, dst)
+    return copied
@@ -0,0 +1,132 @@
+"""
+Dates (and times) written in file names by cameras and apps.
+
+Every known naming scheme is a pattern of the registry below. All of them are
+compiled into a single regex, so a name is searched once whatever the number
+of patterns, and the date is read by slicing the digits of the match instead
+of going through ``strptime``. Matches that are not a plausible date (a random
+number, month 13...) are skipped and the search goes on; an invalid time only
+drops the time, the date is kept.
+
+Whole directory listings can be parsed at once with ``parse_many``.
+"""
+
+import re
+from collections.abc import Iterable
+from datetime import datetime
+from typing import NamedTuple
+
+# str.translate table deleting everything but ASCII digits
+_KEEP_DIGITS = {c: None for c in range(128) if not chr(c).isdigit()}
+
+
+class FilenamePattern(NamedTuple):
+    """
+    A naming scheme. ``regex`` must not have capturing groups, and its match
+    must hold the digits of the date (YYYYMMDD) followed by those of the time
+    (HHMMSS) if ``has_time``, in that order; other digits may follow.
+    """
+
+    name: str
+    regex: str
+    has_time: bool = False
+    min_year: int = 1900
+
+
+# In order of preference when several patterns match at the same position
+PATTERNS = [
+    # Google Pixel: PXL_20240512_101112345.jpg
+    FilenamePattern("pixel", r"PXL_\d{8}_\d{6}", has_time=True),
+    # Android cameras: IMG_20230101_123456.jpg, VID_20230101_123456.mp4
+    FilenamePattern("android", r"(?:IMG|VID)_\d{8}_\d{6}", has_time=True),
+    # Screenshot_2024-01-01-10-00-00.png
+    FilenamePattern(
+        "screenshot",
+        r"Screenshot_\d{4}-\d{2}-\d{2}-\d{2}-\d{2}-\d{2}",
+        has_time=True,
+    ),
+    # signal-2024-01-01-100000.jpg, Signal-2024-01-01-10-00-00-123.jpg
+    FilenamePattern(
+        "signal",
+        r"signal-\d{4}-\d{2}-\d{2}-(?:\d{6}|\d{2}-\d{2}-\d{2})",
+        has_time=True,
+    ),
+    # Dropbox camera uploads: 2024-05-12 10.11.12.jpg
+    FilenamePattern(
+        "dropbox", r"(?<!\d)\d{4}-\d{2}-\d{2} \d{2}\.\d{2}\.\d{2}", has_time=True
+    ),
+    # WhatsApp: IMG-20230101-WA0001.jpg
+    FilenamePattern("whatsapp", r"(?:IMG|VID|AUD|PTT)-\d{8}-WA\d+"),
+    # Any YYYY-MM-DD
+    FilenamePattern("iso_date", r"(?<!\d)\d{4}-\d{2}-\d{2}(?!\d)"),
+    # A bare YYYYMMDD, only if it is not part of a longer number
+    FilenamePattern("compact_date", r"(?<!\d)\d{8}(?!\d)", min_year=1990),
+]
+
+
+class FilenameDateParser:
+    """Parser for a list of patterns, see the module documentation."""
+
+    def __init__(self, patterns: Iterable[FilenamePattern] = PATTERNS):
+        self.patterns = list(patterns)
+        self._by_group = {f"p{i}": p for i, p in enumerate(self.patterns)}
+        self._regex = re.compile(
+            "|".join(f"(?P<p{i}>{p.regex})" for i, p in enumerate(self.patterns)),
+            re.IGNORECASE | re.ASCII,
+        )
+        self._max_year = datetime.now().year + 1
+
+    def register(self, pattern: FilenamePattern) -> "FilenameDateParser":
+        """Return a parser that also knows ``pattern``, with lowest priority."""
+        return FilenameDateParser([*self.patterns, pattern])
+
+    def parse(self, name: str) -> datetime | None:
+        """Date of the first plausible match in ``name``, None if there is none."""
+        for match in self._regex.finditer(name):
+            date = self._to_datetime(match)
+            if date is not None:
+                return date
+        return None
+
+    def parse_many(self, names: Iterable[str]) -> dict[str, datetime | None]:
+        """Parse a listing of names, e.g. ``os.listdir`` of an upload folder."""
+        # Searching each name costs the same as one search over the joined
+        # listing (the regex has no literal prefix to skip ahead with), and
+        # keeps matches from running across names
+        parse = self.parse
+        return {name: parse(name) for name in names}
+
+    def _to_datetime(self, match: re.Match) -> datetime | None:
+        pattern = self._by_group[match.lastgroup]
+        digits = match.group().translate(_KEEP_DIGITS)
+        year, month, day = int(digits[0:4]), int(digits[4:6]), int(digits[6:8])
+        if not pattern.min_year <= year <= self._max_year:
+            return None
+        try:
+            # Also rejects month 13, February 30...
+            date = datetime(year, month, day)
+        except ValueError:
+            return None
+        if pattern.has_time:
+            try:
+                return date.replace(
+                    hour=int(digits[8:10]),
+                    minute=int(digits[10:12]),
+                    second=int(digits[12:14]),
+                )
+            except ValueError:
+                pass  # e.g. IMG_20230101_999999: the date is still good
+        return date
+
+
+_default_parser = FilenameDateParser()
+
+
+def parse_filename_date(name: str) -> datetime | None:
+    """Date written in a file name, using the default patterns."""
+    return _default_parser.parse(name)
+
+
+def parse_filename_dates(names: Iterable[str]) -> dict[str, datetime | None]:
+    """``parse_filename_date`` for a whole listing at once."""
+    return _default_parser.parse_many(names)
@@ -0,0 +1,144 @@
+"""
+Move all the files of a folder tree into a single flat folder.
+
+The tree is scanned once and the name of every file in the flat folder is
+planned before anything is moved. Files with the same content as one already
+in the flat folder (or planned to be) are dropped, files that only share the
+name are kept under ``name (n).ext``. The files are planned in the order of
+their path, so the same tree always gets the same names.
+
+Moves within a drive are renames and run on a thread pool; files on another
+drive are copied in parallel by papa_toolkit.move_executor.
+"""
+
+import errno
+import logging
+import os
+from collections.abc import Iterable
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import NamedTuple
+
+from .folder_merge import FolderListing
+from .move_executor import MoveExecutor
+from .scanner import scan_files
+from .thumbnails import THUMBNAILS_FOLDER
+
+_logger = logging.getLogger(__name__)
+
+
+class FlattenPlan(NamedTuple):
+    moves: list[tuple[Path, Path]]  # (file, path in the flat folder)
+    dropped: list[tuple[Path, Path]]  # (file, identical file that is kept)
+    renamed: int  # moves under a new name, to avoid a collision
+    size: int  # bytes of the files to move
+
+
+class FlattenResult(NamedTuple):
+    moved: int
+    dropped: int
+    errors: list[str]
+
+
+def plan_flatten(
+    source: Path, destination: Path, exclude: Iterable[str] = ()
+) -> FlattenPlan:
+    """
+    Plan moving the files under ``source`` into ``destination``.
+
+    Files and folders matching the ``exclude`` globs are left where they are,
+    as are thumbnails (see papa_toolkit.thumbnails), whose names are those of
+    their pictures, and ``destination`` itself if it is inside ``source``.
+    """
+    exclude = [*exclude, THUMBNAILS_FOLDER]
+    files = sorted(
+        scan_files(source, recursive=True, exclude=exclude, skip_dirs=[destination])
+    )
+    listing = FolderListing(destination)
+    # Files of the plan are hashed at their current place, this maps them back
+    target_of: dict[Path, Path] = {}
+    moves, dropped = [], []
+    renamed = total_size = 0
+    for path, size, _ in files:
+        if path.parent == destination:
+            continue
+        try:
+            identical = listing.find_identical(path, size)
+        except OSError as e:
+            _logger.error("No se pudo leer %s: %s", path, e)
+            continue
+        if identical is not None:
+            dropped.append((path, target_of.get(identical, identical)))
+            continue
+
+        target = destination / listing.unique_name(path.name)
+        listing.add_file(target.name, path, size)
+        target_of[path] = target
+        moves.append((path, target))
+        renamed += target.name != path.name
+        total_size += size
+    return FlattenPlan(moves, dropped, renamed, total_size)
+
+
+def _rename_all(
+    moves: list[tuple[Path, Path]],
+) -> tuple[list[Path], list[tuple[Path, Path]], list[str]]:
+    done, other_drive, errors = [], [], []
+    for source, target in moves:
+        try:
+            os.rename(source, target)
+            done.append(target)
+        except OSError as e:
+            if e.errno == errno.EXDEV:
+                other_drive.append((source, target))
+            else:
+                errors.append(f"{source}: {e}")
+                _logger.error("No se pudo mover %s: %s", source, e)
+    return done, other_drive, errors
+
+
+def apply_flatten(
+    plan: FlattenPlan, destination: Path, workers: int = 4
+) -> FlattenResult:
+    """
+    Carry out ``plan``: move the files, then delete the dropped ones.
+
+    A dropped file is only deleted once the identical file it was dropped for
+    is in the flat folder.
+    """
+    destination.mkdir(parents=True, exist_ok=True)
+    workers = max(1, workers)
+
+    # Interleaved chunks, so that every thread gets files of all the folders
+    chunks = [plan.moves[i::workers] for i in range(workers)]
+    done, other_drive, errors = set(), [], []
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for renamed, chunk_other, chunk_errors in executor.map(_rename_all, chunks):
+            done.update(renamed)
+            other_drive.extend(chunk_other)
+            errors.extend(chunk_errors)
+
+    if other_drive:
+        with MoveExecutor(workers) as mover:
+            futures = [
+                (source, mover.move(source, target)) for source, target in other_drive
+            ]
+            for source, future in futures:
+                try:
+                    done.add(future.result())
+                except OSError as e:
+                    errors.append(f"{source}: {e}")
+                    _logger.error("No se pudo mover %s: %s", source, e)
+
+    dropped = 0
+    for path, kept in plan.dropped:
+        if not kept.exists():
+            _logger.warning("Se conserva %s, no se movió %s", path, kept)
+            continue
+        try:
+            path.unlink()
+            dropped += 1
+        except OSError as e:
+            errors.append(f"{path}: {e}")
+            _logger.error("No se pudo borrar %s: %s", path, e)
+    return FlattenResult(len(done), dropped, errors)
@@ -0,0 +1,179 @@
+"""
+Merge the contents of one folder into another.
+
+Used when two folders of the same day meet (e.g. ``2023-05-01`` is moved into
+``2023/`` where ``2023/2023-05-01`` already exists). Each folder is listed once
+and name collisions are resolved against that listing held in memory. Files
+already present in the destination, compared by size and then by content, are
+dropped instead of being copied a second time; files with the same name but a
+different content are kept under a new ``name (n).ext`` name. The thumbnails
+of the merged folder are deleted rather than merged, and so are its settings
+files (``.picasa.ini``, ``desktop.ini``...) when the destination has its own.
+"""
+
+import logging
+import os
+import shutil
+from pathlib import Path
+from typing import NamedTuple
+
+from .hashing import covers_whole_file, full_hash, partial_hash
+from .prune import SETTINGS_FILES, prune_folders
+from .thumbnails import THUMBNAILS_FOLDER
+
+_logger = logging.getLogger(__name__)
+
+
+class MergeResult(NamedTuple):
+    moved: list[tuple[Path, Path]]  # files, (old path, new path)
+    moved_dirs: list[tuple[Path, Path]]  # whole subfolders moved at once
+    dropped: list[Path]  # files identical to one already in the destination
+    renamed: list[Path]  # files moved under a new name to avoid a collision
+
+
+class FolderListing:
+    """
+    Files and folders of a destination folder, read once (a folder that does
+    not exist yet is empty). Files planned to be added are added with
+    ``add_file`` and ``add_dir`` so later collisions take them into account.
+    """
+
+    def __init__(self, folder: Path):
+        self.folder = folder
+        self.names: set[str] = set()
+        self.dirs: set[str] = set()
+        self.by_size: dict[int, list[Path]] = {}
+        self._hashes: dict[Path, tuple[str, str | None]] = {}
+        try:
+            with os.scandir(folder) as entries:
+                for entry in entries:
+                    self.names.add(os.path.normcase(entry.name))
+                    if entry.is_dir(follow_symlinks=False):
+                        self.dirs.add(os.path.normcase(entry.name))
+                    elif entry.is_file(follow_symlinks=False):
+                        size = entry.stat(follow_symlinks=False).st_size
+                        self.by_size.setdefault(size, []).append(Path(entry.path))
+        except FileNotFoundError:
+            pass
+
+    def taken(self, name: str) -> bool:
+        return os.path.normcase(name) in self.names
+
+    def add_dir(self, name: str) -> None:
+        self.names.add(os.path.normcase(name))
+        self.dirs.add(os.path.normcase(name))
+
+    def add_file(self, name: str, content: Path, size: int) -> None:
+        """Add file ``name``, whose content can be read from ``content``."""
+        self.names.add(os.path.normcase(name))
+        self.by_size.setdefault(size, []).append(content)
+
+    def unique_name(self, name: str) -> str:
+        stem, suffix = os.path.splitext(name)
+        counter = 1
+        candidate = name
+        while self.taken(candidate):
+            candidate = f"{stem} ({counter}){suffix}"
+            counter += 1
+        return candidate
+
+    def find_identical(self, path: Path, size: int) -> Path | None:
+        """A file of the listing with the same content as ``path``, if any."""
+        candidates = self.by_size.get(size)
+        if not candidates:
+            return None
+        source_partial = partial_hash(path, size)
+        source_full = None
+        for candidate in candidates:
+            candidate_partial, candidate_full = self._hash(candidate, size)
+            if candidate_partial != source_partial:
+                continue
+            if covers_whole_file(size):
+                return candidate
+            if source_full is None:
+                source_full = full_hash(path)
+            if candidate_full is None:
+                candidate_full = full_hash(candidate)
+                self._hashes[candidate] = (candidate_partial, candidate_full)
+            if candidate_full == source_full:
+                return candidate
+        return None
+
+    def _hash(self, path: Path, size: int) -> tuple[str, str | None]:
+        hashes = self._hashes.get(path)
+        if hashes is None:
+            hashes = self._hashes[path] = (partial_hash(path, size), None)
+        return hashes
+
+
+def merge_folder(source: Path, destination: Path, dry_run: bool = False) -> MergeResult:
+    """
+    Move the contents of ``source`` into the existing ``destination``.
+
+    Subfolders missing in the destination are moved whole, the others are
+    merged recursively. ``source`` is removed once empty. With ``dry_run``
+    nothing is changed but the result tells what would be done.
+    """
+    result = MergeResult([], [], [], [])
+    _merge(source, destination, dry_run, result)
+    return result
+
+
+def _merge(source: Path, destination: Path, dry_run: bool, result: MergeResult) -> None:
+    listing = FolderListing(destination)
+
+    with os.scandir(source) as entries:
+        entries = sorted(entries, key=lambda e: e.name)
+
+    for entry in entries:
+        path = Path(entry.path)
+        try:
+            if entry.is_dir(follow_symlinks=False):
+                if entry.name == THUMBNAILS_FOLDER:
+                    # Named after their pictures, which may be renamed below:
+                    # deleted, the merged folder gets its thumbnails made again
+                    if not dry_run:
+                        shutil.rmtree(path)
+                    continue
+                if os.path.normcase(entry.name) in listing.dirs:
+                    _merge(path, destination / entry.name, dry_run, result)
+                    continue
+                target = destination / listing.unique_name(entry.name)
+                if not dry_run:
+                    os.rename(path, target)
+                listing.add_dir(target.name)
+                result.moved_dirs.append((path, target))
+                continue
+
+            if entry.name.lower() in SETTINGS_FILES and listing.taken(entry.name):
+                # Never renamed to ".picasa (1).ini": left behind, they go
+                # with the source folder below
+                _logger.debug(
+                    "%s no se fusiona, %s ya tiene el suyo", path, destination
+                )
+                continue
+
+            size = entry.stat(follow_symlinks=False).st_size
+            identical = listing.find_identical(path, size)
+            if identical is not None:
+                _logger.debug("%s ya está en %s", path, identical)
+                if not dry_run:
+                    path.unlink()
+                result.dropped.append(path)
+                continue
+
+            target = destination / listing.unique_name(entry.name)
+            if not dry_run:
+                os.rename(path, target)
+            # In dry runs the file is still at its original place
+            listing.add_file(target.name, path if dry_run else target, size)
+            result.moved.append((path, target))
+            if target.name != entry.name:
+                _logger.info("Renombrado %s a %s", path, target.name)
+                result.renamed.append(target)
+        except OSError as e:
+            _logger.error("No se pudo mover %s: %s", path, e)
+
+    # Removed if only settings files were left behind
+    if not dry_run and not prune_folders([source], source.parent):
+        _logger.warning("No se pudo borrar la carpeta %s", source)
@@ -0,0 +1,49 @@
+"""
+Content hashes of files, read in chunks so memory use does not depend on the
+file size.
+"""
+
+import hashlib
+from pathlib import Path
+
+CHUNK_SIZE = 1024 * 1024
+
+# Bytes hashed from each end of a file by partial_hash
+EDGE_SIZE = 64 * 1024
+
+
+def new_hash():
+    """Hash object of the digests below, e.g. to hash a file while copying it."""
+    return hashlib.blake2b(digest_size=20)
+
+
+def partial_hash(path: Path, size: int) -> str:
+    """
+    Hash of the first and last EDGE_SIZE bytes of a file of ``size`` bytes.
+
+    Cheap first filter for candidates of the same size. For files of up to
+    ``2 * EDGE_SIZE`` bytes it covers the whole content (see covers_whole_file).
+    """
+    digest = new_hash()
+    with open(path, "rb") as f:
+        if covers_whole_file(size):
+            digest.update(f.read())
+        else:
+            digest.update(f.read(EDGE_SIZE))
+            f.seek(size - EDGE_SIZE)
+            digest.update(f.read(EDGE_SIZE))
+    return digest.hexdigest()
+
+
+def covers_whole_file(size: int) -> bool:
+    """Whether the partial hash of a file of ``size`` bytes is a full hash."""
+    return size <= 2 * EDGE_SIZE
+
+
+def full_hash(path: Path) -> str:
+    """Hash of the whole content of a file, streamed in CHUNK_SIZE blocks."""
+    digest = new_hash()
+    with open(path, "rb") as f:
+        while chunk := f.read(CHUNK_SIZE):
+            digest.update(chunk)
+    return digest.hexdigest()
@@ -0,0 +1,225 @@
+"""
+Folder layouts of the picture archive and moves between them.
+
+A layout is a pattern such as ``YYYY-MM-DD`` (what image_syncer writes by
+default), ``YYYY/YYYY-MM-DD`` (after year_organizer) or ``YYYY/MM/YYYY-MM-DD``.
+The last level is always the day folder, which keeps its name (including any
+suffix such as ``_01`` or a description); the levels above group day folders
+by year, month or day.
+
+Re-laying out an archive lists it once, plans where every day folder goes and
+then moves whole day folders with ``os.rename``, never file by file. Moves of
+different years are independent and run in parallel.
+"""
+
+import logging
+import os
+import re
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from pathlib import Path
+from typing import NamedTuple
+
+_logger = logging.getLogger(__name__)
+
+_DAY_TOKEN = "YYYY-MM-DD"
+_TOKENS = {"YYYY": "{0:04d}", "MM": "{1:02d}", "DD": "{2:02d}"}
+_TOKEN_RE = re.compile("|".join(_TOKENS))
+_SEGMENT_RE = re.compile(r"^(?:YYYY|MM|DD|[-_ .])+$")
+
+_DAY_FOLDER_RE = re.compile(r"^(\d{4})-(\d{2})-(\d{2})")
+# Grouping folders of the known layouts: 2023, 05, 2023-05
+_GROUP_FOLDER_RE = re.compile(r"^\d{2,4}(?:-\d{2})?$")
+# Deepest day folder looked for, as in YYYY/MM/YYYY-MM-DD
+_MAX_DEPTH = 3
+
+
+class DayFolder(NamedTuple):
+    path: Path
+    day: date
+
+
+class FolderMove(NamedTuple):
+    source: Path
+    destination: Path
+    day: date
+
+
+class Layout:
+    """A layout pattern, see the module documentation."""
+
+    def __init__(self, pattern: str):
+        segments = pattern.strip("/").split("/")
+        if segments[-1] != _DAY_TOKEN:
+            raise ValueError(f"El patrón debe terminar en {_DAY_TOKEN}: {pattern}")
+        for segment in segments[:-1]:
+            if (
+                not _SEGMENT_RE.match(segment)
+                or not _TOKEN_RE.search(segment)
+                or segment.startswith(_DAY_TOKEN)
+            ):
+                raise ValueError(f"Nivel no válido '{segment}' en el patrón {pattern}")
+        self.pattern = pattern
+        self._groups = [
+            _TOKEN_RE.sub(lambda m: _TOKENS[m.group(0)], segment)
+            for segment in segments[:-1]
+        ]
+
+    def folder_for(self, root: Path, day_folder: DayFolder) -> Path:
+        """Where ``day_folder`` belongs in this layout."""
+        return self._parent(root, day_folder.day) / day_folder.path.name
+
+    def day_folder(self, root: Path, day: date) -> Path:
+        """Folder of the files taken on ``day`` (a date or datetime)."""
+        name = f"{day.year:04d}-{day.month:02d}-{day.day:02d}"
+        return self._parent(root, day) / name
+
+    def _parent(self, root: Path, day: date) -> Path:
+        groups = [g.format(day.year, day.month, day.day) for g in self._groups]
+        return root.joinpath(*groups)
+
+
+def parse_day(name: str) -> date | None:
+    """Date of a day folder name (``YYYY-MM-DD...``), None if it is not one."""
+    match = _DAY_FOLDER_RE.match(name)
+    if not match:
+        return None
+    year, month, day = map(int, match.groups())
+    try:
+        return date(year, month, day)
+    except ValueError:
+        return None
+
+
+def find_day_folders(root: Path) -> list[DayFolder]:
+    """
+    List the day folders of an archive in a single pass.
+
+    Only folders named like the grouping levels of a layout (``2023``, ``05``,
+    ``2023-05``) are entered, so day folders inside unrelated folders are left
+    where they are.
+    """
+    found = []
+    pending = [(root, 0)]
+    while pending:
+        folder, depth = pending.pop()
+        try:
+            with os.scandir(folder) as entries:
+                for entry in entries:
+                    if not entry.is_dir(follow_symlinks=False):
+                        continue
+                    day = parse_day(entry.name)
+                    if day is not None:
+                        found.append(DayFolder(Path(entry.path), day))
+                    elif depth + 1 < _MAX_DEPTH and _GROUP_FOLDER_RE.match(entry.name):
+                        pending.append((Path(entry.path), depth + 1))
+        except OSError as e:
+            _logger.warning("No se pudo leer la carpeta %s: %s", folder, e)
+    return sorted(found)
+
+
+def plan_relayout(
+    root: Path, layout: Layout, day_folders: list[DayFolder]
+) -> list[FolderMove]:
+    """
+    Plan the moves that bring ``day_folders`` into ``layout``.
+
+    Folders already in place are left out. If two day folders would get the
+    same path, or the path is taken by a folder that is not moving, a
+    ``_NN`` suffix is added as year_organizer does.
+    """
+    current = {os.path.normcase(f.path) for f in day_folders}
+    taken = set()
+    moves = []
+    for day_folder in day_folders:
+        destination = layout.folder_for(root, day_folder)
+        if destination == day_folder.path:
+            taken.add(os.path.normcase(destination))
+            continue
+        moves.append(FolderMove(day_folder.path, destination, day_folder.day))
+
+    planned = []
+    for move in moves:
+        destination = move.destination
+        counter = 1
+        while os.path.normcase(destination) in taken or (
+            os.path.normcase(destination) not in current and destination.exists()
+        ):
+            destination = move.destination.with_name(
+                f"{move.destination.name}_{counter:02d}"
+            )
+            counter += 1
+        taken.add(os.path.normcase(destination))
+        planned.append(move._replace(destination=destination))
+    return _order_moves(planned)
+
+
+def _order_moves(moves: list[FolderMove]) -> list[FolderMove]:
+    # A folder may only move into a path freed by another move of the plan
+    # (e.g. swapping layouts): those go after the move that frees the path
+    sources = {os.path.normcase(m.source): m for m in moves}
+    ordered, done = [], set()
+
+    def visit(move: FolderMove, visiting: set) -> None:
+        key = os.path.normcase(move.source)
+        if key in done or key in visiting:
+            return
+        visiting.add(key)
+        blocker = sources.get(os.path.normcase(move.destination))
+        if blocker is not None:
+            visit(blocker, visiting)
+        done.add(key)
+        ordered.append(move)
+
+    for move in moves:
+        visit(move, set())
+    return ordered
+
+
+def _apply_group(moves: list[FolderMove]) -> tuple[list[FolderMove], list[str]]:
+    done, errors = [], []
+    for move in moves:
+        try:
+            move.destination.parent.mkdir(parents=True, exist_ok=True)
+            os.rename(move.source, move.destination)
+            done.append(move)
+        except OSError as e:
+            errors.append(f"{move.source}: {e}")
+            _logger.error("No se pudo mover %s: %s", move.source, e)
+    return done, errors
+
+
+def apply_relayout(
+    root: Path, moves: list[FolderMove], workers: int = 4
+) -> tuple[list[FolderMove], list[str]]:
+    """
+    Move the day folders, the years in parallel.
+
+    Returns the moves done and the errors of the failed ones. Grouping folders
+    left empty by the moves are removed.
+    """
+    by_year: dict[int, list[FolderMove]] = defaultdict(list)
+    for move in moves:
+        by_year[move.day.year].append(move)
+
+    done, errors = [], []
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        for group_done, group_errors in executor.map(_apply_group, by_year.values()):
+            done.extend(group_done)
+            errors.extend(group_errors)
+
+    # Deepest first, so that a year folder goes after its month folders
+    emptied = {
+        parent
+        for move in done
+        for parent in move.source.parents
+        if parent != root and parent.is_relative_to(root)
+    }
+    for folder in sorted(emptied, key=lambda p: len(p.parts), reverse=True):
+        if _GROUP_FOLDER_RE.match(folder.name):
+            try:
+                folder.rmdir()
+            except OSError:
+                pass  # not empty
+    return done, errors
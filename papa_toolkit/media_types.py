@@ -0,0 +1,176 @@
+"""
+File type detection from the first bytes of a file.
+
+Classifying a file by its signature needs a single small read, while opening it
+with PIL parses the whole header and runs on every video and junk file too.
+"""
+
+import os
+from pathlib import Path
+
+IMAGE = "image"
+VIDEO = "video"
+
+# Bytes read from the start of each file, enough for every signature below
+HEADER_SIZE = 64
+
+_KINDS = {
+    "jpeg": IMAGE,
+    "png": IMAGE,
+    "gif": IMAGE,
+    "bmp": IMAGE,
+    "webp": IMAGE,
+    "heic": IMAGE,
+    "avif": IMAGE,
+    "tiff": IMAGE,
+    "raw": IMAGE,
+    "mp4": VIDEO,
+    "mov": VIDEO,
+    "avi": VIDEO,
+    "mkv": VIDEO,
+    "wmv": VIDEO,
+    "flv": VIDEO,
+    "mts": VIDEO,
+}
+
+# Picture types PIL decodes without plugins (not HEIC nor raw)
+DECODABLE_IMAGE_TYPES = {"jpeg", "png", "gif", "bmp", "webp", "tiff"}
+
+# TIFF based raw formats can only be told apart from plain TIFF by extension
+_RAW_EXTENSIONS = {
+    ".cr2",
+    ".nef",
+    ".nrw",
+    ".dng",
+    ".arw",
+    ".sr2",
+    ".srw",
+    ".pef",
+}
+
+# ISO base media file format brands (the ``ftyp`` box)
+_HEIF_BRANDS = {
+    b"heic",
+    b"heix",
+    b"heim",
+    b"heis",
+    b"hevc",
+    b"hevx",
+    b"mif1",
+    b"msf1",
+}
+_AVIF_BRANDS = {b"avif", b"avis"}
+_QUICKTIME_BRANDS = {b"qt  "}
+# Brands of MP4 videos, others are audio (M4A, M4B), pictures or documents
+_MP4_BRANDS = {
+    b"isom",
+    b"iso2",
+    b"iso3",
+    b"iso4",
+    b"iso5",
+    b"iso6",
+    b"mp41",
+    b"mp42",
+    b"mp71",
+    b"avc1",
+    b"M4V ",
+    b"M4VH",
+    b"M4VP",
+    b"dash",
+    b"mmp4",
+    b"MSNV",
+    b"XAVC",
+    b"f4v ",
+}
+# 3GPP and 3GPP2 brands carry the release number: 3gp4, 3gp5, 3g2a...
+_3GP_BRAND_PREFIXES = (b"3gp", b"3g2")
+_CANON_RAW_BRANDS = {b"crx "}
+# Top level boxes found at the start of old QuickTime files without ``ftyp``
+_QUICKTIME_BOXES = {b"moov", b"mdat", b"wide", b"free", b"skip", b"pnot"}
+# Size of the DIB header that follows the BMP file header
+_BMP_DIB_SIZES = {12, 40, 52, 56, 64, 108, 124}
+
+# Videos with an unrecognised signature are still trusted by their extension,
+# as it was done before sniffing existed
+_VIDEO_EXTENSIONS = {
+    ".mp4": "mp4",
+    ".m4v": "mp4",
+    ".3gp": "mp4",
+    ".mov": "mov",
+    ".avi": "avi",
+    ".mkv": "mkv",
+    ".webm": "mkv",
+    ".wmv": "wmv",
+    ".flv": "flv",
+    ".mts": "mts",
+    ".m2ts": "mts",
+}
+
+
+def sniff_media_type(header: bytes, filename: str = "") -> str | None:
+    """
+    Classify a file from its first bytes (see HEADER_SIZE).
+
+    Returns a media type such as 'jpeg', 'heic', 'raw', 'mp4' or 'mkv', or None
+    if the file is neither a picture nor a video. ``filename`` is only used as a
+    hint where the signature is ambiguous.
+    """
+    ext = os.path.splitext(filename)[1].lower()
+
+    if header.startswith(b"\xff\xd8\xff"):
+        return "jpeg"
+    if header.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "png"
+    if header.startswith((b"II*\x00", b"MM\x00*")):
+        if header[8:10] == b"CR" or ext in _RAW_EXTENSIONS:
+            return "raw"
+        return "tiff"
+    if header.startswith((b"IIRO", b"IIRS", b"MMOR", b"IIU\x00")):  # ORF, RW2
+        return "raw"
+
+    box_type = header[4:8]
+    if box_type == b"ftyp":
+        brand = header[8:12]
+        if brand in _HEIF_BRANDS:
+            return "heic"
+        if brand in _CANON_RAW_BRANDS:
+            return "raw"
+        if brand in _AVIF_BRANDS:
+            return "avif"
+        if brand in _QUICKTIME_BRANDS:
+            return "mov"
+        if brand in _MP4_BRANDS or brand.startswith(_3GP_BRAND_PREFIXES):
+            return "mp4"
+        return _VIDEO_EXTENSIONS.get(ext)
+    if box_type in _QUICKTIME_BOXES:
+        return "mov"
+
+    if header.startswith(b"RIFF"):
+        if header[8:12] == b"WEBP":
+            return "webp"
+        if header[8:12] == b"AVI ":
+            return "avi"
+    if header.startswith((b"GIF87a", b"GIF89a")):
+        return "gif"
+    if header.startswith(b"BM") and header[14:15] and header[14] in _BMP_DIB_SIZES:
+        return "bmp"
+    if header.startswith(b"\x1a\x45\xdf\xa3"):
+        return "mkv"
+    if header.startswith(b"\x30\x26\xb2\x75\x8e\x66\xcf\x11"):
+        return "wmv"
+    if header.startswith(b"FLV\x01"):
+        return "flv"
+
+    return _VIDEO_EXTENSIONS.get(ext)
+
+
+def detect_media_type(path: Path) -> str | None:
+    """Read the first bytes of ``path`` and classify it (see sniff_media_type)."""
+    with open(path, "rb") as f:
+        header = f.read(HEADER_SIZE)
+    return sniff_media_type(header, path.name)
+
+
+def media_kind(media_type: str | None) -> str | None:
+    """Map a media type to IMAGE, VIDEO or None."""
+    return _KINDS.get(media_type)
@@ -0,0 +1,253 @@
+"""
+On-disk cache of the metadata extracted from media files.
+
+Opening every picture with PIL and running ffprobe on every video is by far the
+most expensive part of a run. Results are stored in a small SQLite database
+keyed on the file path and validated against its size and modification time,
+so files that did not change are never inspected twice (e.g. files skipped in a
+previous run or a dry run followed by the real one).
+
+The perceptual hashes of pictures (see papa_toolkit.perceptual) are kept in a
+second table validated the same way.
+"""
+
+import logging
+import os
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import NamedTuple
+
+_logger = logging.getLogger(__name__)
+
+# Bump when the meaning of the stored columns changes: the tables are rebuilt
+_SCHEMA_VERSION = 2
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    file_type TEXT,
+    date_taken TEXT
+)
+"""
+
+# Hashes are unsigned 64 bit values, stored as SQLite's signed integers
+_HASHES_SCHEMA = """
+CREATE TABLE IF NOT EXISTS image_hashes (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    dhash INTEGER,
+    phash INTEGER,
+    pixels INTEGER
+)
+"""
+
+_TABLES = ("files", "image_hashes")
+
+# Columns after the path, to copy rows
+_COLUMNS = {
+    "files": "size, mtime_ns, file_type, date_taken",
+    "image_hashes": "size, mtime_ns, dhash, phash, pixels",
+}
+
+# Pending writes are committed in batches of this size
+_FLUSH_EVERY = 500
+
+
+class CacheEntry(NamedTuple):
+    file_type: str | None
+    date_taken: datetime | None
+
+
+class HashEntry(NamedTuple):
+    dhash: int | None
+    phash: int | None
+    pixels: int | None  # width * height of the picture
+
+
+def default_cache_path() -> Path:
+    """Location of the cache in the user's cache directory."""
+    if os.name == "nt":
+        base = os.environ.get("LOCALAPPDATA") or Path.home() / "AppData" / "Local"
+    else:
+        base = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(base) / "papa-toolkit" / "metadata.sqlite"
+
+
+def _key(path: Path) -> str:
+    return os.path.abspath(path)
+
+
+def _to_signed(value: int | None) -> int | None:
+    if value is not None and value >= 1 << 63:
+        return value - (1 << 64)
+    return value
+
+
+def _to_unsigned(value: int | None) -> int | None:
+    return value & ((1 << 64) - 1) if value is not None else None
+
+
+class MetadataCache:
+    """
+    Thread-safe cache of (media type, date taken) per file.
+
+    Entries are keyed on the absolute path and only returned while the file
+    keeps the same size and mtime. A cached ``date_taken`` of None means the
+    metadata was read but had no date, and likewise a ``dhash`` of None means
+    the file is not a picture that could be decoded.
+    """
+
+    def __init__(self, db_path: Path):
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._db_path = db_path
+        self._lock = threading.Lock()
+        self._pending: list[tuple] = []
+        self._pending_hashes: list[tuple] = []
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        (version,) = self._conn.execute("PRAGMA user_version").fetchone()
+        if version != _SCHEMA_VERSION:
+            for table in _TABLES:
+                self._conn.execute(f"DROP TABLE IF EXISTS {table}")
+            self._conn.execute(f"PRAGMA user_version={_SCHEMA_VERSION}")
+        self._conn.execute(_SCHEMA)
+        self._conn.execute(_HASHES_SCHEMA)
+        self._conn.commit()
+
+    def __enter__(self) -> "MetadataCache":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def get(self, path: Path, size: int, mtime_ns: int) -> CacheEntry | None:
+        """Return the cached entry, or None if missing or the file changed."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT size, mtime_ns, file_type, date_taken FROM files WHERE path=?",
+                (_key(path),),
+            ).fetchone()
+        if row is None or row[0] != size or row[1] != mtime_ns:
+            return None
+        date_taken = datetime.fromisoformat(row[3]) if row[3] else None
+        return CacheEntry(row[2], date_taken)
+
+    def put(
+        self,
+        path: Path,
+        size: int,
+        mtime_ns: int,
+        file_type: str | None,
+        date_taken: datetime | None,
+    ) -> None:
+        row = (
+            _key(path),
+            size,
+            mtime_ns,
+            file_type,
+            date_taken.isoformat() if date_taken else None,
+        )
+        with self._lock:
+            self._pending.append(row)
+            if len(self._pending) >= _FLUSH_EVERY:
+                self._flush_locked()
+
+    def get_hashes(self, path: Path, size: int, mtime_ns: int) -> HashEntry | None:
+        """Return the cached perceptual hashes, or None if missing or changed."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT size, mtime_ns, dhash, phash, pixels FROM image_hashes "
+                "WHERE path=?",
+                (_key(path),),
+            ).fetchone()
+        if row is None or row[0] != size or row[1] != mtime_ns:
+            return None
+        return HashEntry(_to_unsigned(row[2]), _to_unsigned(row[3]), row[4])
+
+    def put_hashes(
+        self,
+        path: Path,
+        size: int,
+        mtime_ns: int,
+        dhash: int | None,
+        phash: int | None,
+        pixels: int | None,
+    ) -> None:
+        row = (
+            _key(path),
+            size,
+            mtime_ns,
+            _to_signed(dhash),
+            _to_signed(phash),
+            pixels,
+        )
+        with self._lock:
+            self._pending_hashes.append(row)
+            if len(self._pending_hashes) >= _FLUSH_EVERY:
+                self._flush_locked()
+
+    def rename(self, old_path: Path, new_path: Path) -> None:
+        """Make the entries follow their file after it was moved."""
+        with self._lock:
+            self._flush_locked()
+            for table in _TABLES:
+                self._conn.execute(
+                    f"INSERT OR REPLACE INTO {table} "
+                    f"SELECT ?, {_COLUMNS[table]} FROM {table} WHERE path=?",
+                    (_key(new_path), _key(old_path)),
+                )
+                self._conn.execute(
+                    f"DELETE FROM {table} WHERE path=?", (_key(old_path),)
+                )
+
+    def evict_missing(self, folder: Path) -> int:
+        """Drop entries below ``folder`` whose files no longer exist."""
+        prefix = os.path.join(_key(folder), "")
+        with self._lock:
+            self._flush_locked()
+            # Range scan on the primary key instead of LIKE (no escaping needed)
+            paths = set()
+            for table in _TABLES:
+                paths.update(
+                    path
+                    for (path,) in self._conn.execute(
+                        f"SELECT path FROM {table} WHERE path >= ? AND path < ?",
+                        (prefix, prefix + "\U0010ffff"),
+                    )
+                )
+            missing = [(path,) for path in paths if not os.path.exists(path)]
+            for table in _TABLES:
+                self._conn.executemany(f"DELETE FROM {table} WHERE path=?", missing)
+            self._conn.commit()
+        if missing:
+            _logger.debug("Eliminadas %d entradas obsoletas de la caché", len(missing))
+        return len(missing)
+
+    def flush(self) -> None:
+        with self._lock:
+            self._flush_locked()
+
+    def close(self) -> None:
+        with self._lock:
+            self._flush_locked()
+            self._conn.close()
+
+    def _flush_locked(self) -> None:
+        if self._pending:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?)", self._pending
+            )
+            self._pending.clear()
+        if self._pending_hashes:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO image_hashes VALUES (?, ?, ?, ?, ?, ?)",
+                self._pending_hashes,
+            )
+            self._pending_hashes.clear()
+        self._conn.commit()
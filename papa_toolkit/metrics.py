@@ -0,0 +1,186 @@
+"""
+Timing and throughput measurements of a run.
+
+Scripts record the time spent in each phase (scanning, type detection, date
+extraction, moves...), the latency of every file by type and the bytes moved.
+Phases running on worker threads add up the time of all threads, so their
+total can exceed the wall time of the run, and phases may nest (ffprobe runs
+are part of the metadata phase too). Measuring costs a couple of
+``perf_counter`` calls per phase, so it is always on.
+"""
+
+import json
+import threading
+import time
+from bisect import bisect_left
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+
+# Upper bounds (in ms) of the latency histogram buckets, plus one open bucket
+_BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+
+
+def format_size(num_bytes: int) -> str:
+    size = float(num_bytes)
+    for unit in ("B", "KB", "MB", "GB"):
+        if size < 1024:
+            return f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} TB"
+
+
+class LatencyHistogram:
+    """Histogram of latencies with fixed, roughly logarithmic buckets."""
+
+    def __init__(self):
+        self.counts = [0] * (len(_BUCKETS_MS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, seconds: float) -> None:
+        self.counts[bisect_left(_BUCKETS_MS, seconds * 1000)] += 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def percentile(self, q: float) -> float:
+        """Upper bound (in seconds) of the bucket holding the ``q`` percentile."""
+        rank = q / 100 * self.count
+        seen = 0
+        for bound, count in zip(_BUCKETS_MS, self.counts):
+            seen += count
+            if seen >= rank:
+                return bound / 1000
+        return self.max
+
+    def to_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "total_s": self.total,
+            "mean_s": self.mean,
+            "p50_s": self.percentile(50),
+            "p95_s": self.percentile(95),
+            "max_s": self.max,
+            "buckets_ms": [*_BUCKETS_MS, None],
+            "counts": self.counts,
+        }
+
+
+class Metrics:
+    """Measurements of a run, safe to update from worker threads."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._start = time.perf_counter()
+        self._end = None
+        self.phases: dict[str, float] = {}
+        self.latencies: dict[str, LatencyHistogram] = {}
+        self.items = 0
+        self.bytes_moved = 0
+
+    @property
+    def wall_time(self) -> float:
+        end = self._end if self._end is not None else time.perf_counter()
+        return end - self._start
+
+    def stop(self) -> None:
+        """Freeze the wall time of the run."""
+        self._end = time.perf_counter()
+
+    def add_time(self, phase: str, seconds: float) -> None:
+        with self._lock:
+            self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(name, time.perf_counter() - start)
+
+    def timed(self, phase: str, iterable: Iterable) -> Iterator:
+        """Iterate ``iterable`` adding the time spent producing items to ``phase``."""
+        iterator = iter(iterable)
+        while True:
+            start = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                self.add_time(phase, time.perf_counter() - start)
+                return
+            self.add_time(phase, time.perf_counter() - start)
+            yield item
+
+    def add_latency(self, kind: str, seconds: float) -> None:
+        """Record the time one item (e.g. a file) of type ``kind`` took."""
+        with self._lock:
+            histogram = self.latencies.get(kind)
+            if histogram is None:
+                histogram = self.latencies[kind] = LatencyHistogram()
+            histogram.add(seconds)
+            self.items += 1
+
+    def add_items(self, count: int) -> None:
+        """Count items processed without timing them one by one."""
+        with self._lock:
+            self.items += count
+
+    def add_bytes(self, num_bytes: int) -> None:
+        with self._lock:
+            self.bytes_moved += num_bytes
+
+    def throughput(self) -> float:
+        wall_time = self.wall_time
+        return self.items / wall_time if wall_time else 0.0
+
+    def to_dict(self) -> dict:
+        return {
+            "wall_time_s": self.wall_time,
+            "items": self.items,
+            "items_per_s": self.throughput(),
+            "bytes_moved": self.bytes_moved,
+            "phases_s": dict(self.phases),
+            "latencies": {
+                kind: histogram.to_dict()
+                for kind, histogram in sorted(self.latencies.items())
+            },
+        }
+
+    def write_json(self, path: Path, stats: dict | None = None) -> None:
+        """Write the measurements, and the outcome counters if given."""
+        data = {"stats": stats, **self.to_dict()} if stats else self.to_dict()
+        path.write_text(json.dumps(data, indent=2, default=str), encoding="utf-8")
+
+    def summary_lines(self, unit: str = "archivos") -> list[str]:
+        """Lines for the summary printed at the end of a run."""
+        lines = [
+            f"  Tiempo total: {self.wall_time:.2f} s"
+            f" ({self.throughput():.1f} {unit}/s)",
+        ]
+        if self.bytes_moved:
+            lines.append(f"  Datos movidos: {format_size(self.bytes_moved)}")
+        if self.phases:
+            lines.append("  Tiempo por fase:")
+            for name, seconds in sorted(self.phases.items(), key=lambda p: -p[1]):
+                lines.append(f"    {name}: {seconds:.2f} s")
+        if self.latencies:
+            lines.append("  Latencia por tipo (media / p95 / máx):")
+            for kind, histogram in sorted(self.latencies.items()):
+                lines.append(
+                    f"    {kind}: {histogram.mean * 1000:.1f} /"
+                    f" {histogram.percentile(95) * 1000:.0f} /"
+                    f" {histogram.max * 1000:.1f} ms ({histogram.count})"
+                )
+        return lines
+
+
+def phase(metrics: Metrics | None, name: str):
+    """``metrics.phase(name)``, or a context doing nothing without metrics."""
+    return metrics.phase(name) if metrics is not None else nullcontext()
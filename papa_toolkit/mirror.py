@@ -0,0 +1,235 @@
+"""
+Incremental mirror of a folder tree, e.g. of the picture archive on a backup
+drive.
+
+Both trees are listed once and a file is only copied if it is missing in the
+mirror or its size or modification time differ, so checking a mirror that is
+up to date costs little more than listing it. Copies run in parallel, each
+written under a temporary name and renamed once complete.
+
+By default copies are hashed while they are written, so the source is still
+read only once, and the hashes are kept in a manifest in the mirror. The
+mirror can then be checked for damaged files (``verify_mirror``) without
+reading the source again. Without hashes, copies are done by the kernel with
+``os.copy_file_range`` where available (see papa_toolkit.file_ops).
+"""
+
+import json
+import logging
+import os
+from collections.abc import Iterable
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import NamedTuple
+
+from .file_ops import PARTIAL_SUFFIX, copy_file, partial_path
+from .hashing import full_hash, new_hash
+from .scanner import SourceFile, scan_files
+from .thumbnails import THUMBNAILS_FOLDER
+
+_logger = logging.getLogger(__name__)
+
+MANIFEST_FILENAME = ".papa-mirror.json"
+_MANIFEST_VERSION = 1
+
+# Modification times closer than this are taken as equal: FAT drives store
+# them with a resolution of 2 seconds
+MTIME_WINDOW_NS = 2_000_000_000
+
+# Copies between two saves of the manifest, so an interrupted run keeps the
+# hashes of what it copied
+_SAVE_EVERY = 1000
+
+
+class MirrorPlan(NamedTuple):
+    copies: list[tuple[str, SourceFile]]  # (relative path, file) new or changed
+    unchanged: int
+    extraneous: list[str]  # relative paths of mirror files not in the source
+    size: int  # bytes to copy
+
+
+class MirrorResult(NamedTuple):
+    copied: int
+    deleted: int
+    errors: list[str]
+
+
+class VerifyResult(NamedTuple):
+    checked: int
+    damaged: list[Path]  # missing or with a different content
+    without_hash: int  # copied without hashing, cannot be checked
+
+
+def read_manifest(mirror: Path) -> dict[str, list]:
+    """Relative path -> [size, mtime_ns, hash or None] of the mirror's files."""
+    try:
+        with open(mirror / MANIFEST_FILENAME, encoding="utf-8") as f:
+            manifest = json.load(f)
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError) as e:
+        _logger.warning("Se ignora el manifiesto dañado de %s: %s", mirror, e)
+        return {}
+    if manifest.get("version") != _MANIFEST_VERSION:
+        return {}
+    return manifest["files"]
+
+
+def write_manifest(mirror: Path, files: dict[str, list]) -> None:
+    path = mirror / MANIFEST_FILENAME
+    temporary = partial_path(path)
+    with open(temporary, "w", encoding="utf-8") as f:
+        json.dump({"version": _MANIFEST_VERSION, "files": files}, f)
+    os.replace(temporary, path)
+
+
+def _list_tree(
+    root: Path, include: Iterable[str], exclude: Iterable[str], skip_dirs=()
+) -> dict[str, tuple[str, SourceFile]]:
+    # Keyed by the case-folded path on Windows, where names differing only in
+    # case are the same file
+    # Thumbnails are made again from the pictures, and reading them for the
+    # backup would make them all look recently used
+    exclude = [*exclude, MANIFEST_FILENAME, f"*{PARTIAL_SUFFIX}", THUMBNAILS_FOLDER]
+    files = {}
+    files_found = scan_files(
+        root, recursive=True, include=include, exclude=exclude, skip_dirs=skip_dirs
+    )
+    for file in files_found:
+        relative = file.path.relative_to(root).as_posix()
+        files[os.path.normcase(relative)] = (relative, file)
+    return files
+
+
+def plan_mirror(
+    source: Path,
+    mirror: Path,
+    include: Iterable[str] = (),
+    exclude: Iterable[str] = (),
+) -> MirrorPlan:
+    """
+    Compare the two trees and list what has to be copied.
+
+    Files are unchanged if they have the same size and modification time (see
+    MTIME_WINDOW_NS). The ``include`` and ``exclude`` globs apply to both.
+    """
+    source_files = _list_tree(source, include, exclude, skip_dirs=[mirror])
+    mirror_files = _list_tree(mirror, include, exclude) if mirror.exists() else {}
+
+    copies, unchanged, size = [], 0, 0
+    for key, (relative, file) in sorted(source_files.items()):
+        copy = mirror_files.get(key)
+        if (
+            copy is not None
+            and copy[1].size == file.size
+            and abs(copy[1].mtime_ns - file.mtime_ns) <= MTIME_WINDOW_NS
+        ):
+            unchanged += 1
+            continue
+        copies.append((relative, file))
+        size += file.size
+
+    extraneous = [
+        relative
+        for key, (relative, _) in sorted(mirror_files.items())
+        if key not in source_files
+    ]
+    return MirrorPlan(copies, unchanged, extraneous, size)
+
+
+def _copy(source: SourceFile, target: Path, checksum: bool) -> str | None:
+    hasher = new_hash() if checksum else None
+    temporary = partial_path(target)
+    try:
+        copied = copy_file(source.path, temporary, hasher)
+        if copied != source.size:
+            raise OSError(f"{source.path} cambió durante la copia ({copied} bytes)")
+        os.replace(temporary, target)
+    except BaseException:
+        temporary.unlink(missing_ok=True)
+        raise
+    return hasher.hexdigest() if hasher is not None else None
+
+
+def apply_mirror(
+    plan: MirrorPlan,
+    mirror: Path,
+    workers: int = 4,
+    checksum: bool = True,
+    delete: bool = False,
+) -> MirrorResult:
+    """
+    Copy the new and changed files into ``mirror``, updating its manifest.
+
+    With ``checksum`` the files are hashed while they are copied, which reads
+    them through Python: the kernel copy (``os.copy_file_range``) is only used
+    without it. With ``delete`` the files of the mirror that are not in the
+    source are deleted too.
+    """
+    mirror.mkdir(parents=True, exist_ok=True)
+    manifest = read_manifest(mirror)
+    copied, deleted, errors = 0, 0, []
+
+    # Folders are created up front, not by each copy
+    folders = {(mirror / relative).parent for relative, _ in plan.copies}
+    for folder in sorted(folders):
+        folder.mkdir(parents=True, exist_ok=True)
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        futures = {
+            executor.submit(_copy, file, mirror / relative, checksum): (relative, file)
+            for relative, file in plan.copies
+        }
+        try:
+            for future in as_completed(futures):
+                relative, file = futures[future]
+                try:
+                    digest = future.result()
+                except OSError as e:
+                    manifest.pop(relative, None)
+                    errors.append(f"{file.path}: {e}")
+                    _logger.error("No se pudo copiar %s: %s", file.path, e)
+                    continue
+                manifest[relative] = [file.size, file.mtime_ns, digest]
+                copied += 1
+                if copied % _SAVE_EVERY == 0:
+                    write_manifest(mirror, manifest)
+        finally:
+            # Also when interrupted: the hashes of the copies done are kept
+            for future in futures:
+                future.cancel()
+            write_manifest(mirror, manifest)
+
+    if delete:
+        for relative in plan.extraneous:
+            try:
+                (mirror / relative).unlink()
+                manifest.pop(relative, None)
+                deleted += 1
+            except OSError as e:
+                errors.append(f"{relative}: {e}")
+                _logger.error("No se pudo borrar %s: %s", relative, e)
+        write_manifest(mirror, manifest)
+
+    return MirrorResult(copied, deleted, errors)
+
+
+def _check(path: Path, digest: str) -> bool:
+    try:
+        return full_hash(path) == digest
+    except FileNotFoundError:
+        return False
+
+
+def verify_mirror(mirror: Path, workers: int = 4) -> VerifyResult:
+    """Hash the files of the mirror and compare them with its manifest."""
+    manifest = read_manifest(mirror)
+    to_check = [
+        (mirror / relative, digest)
+        for relative, (_, _, digest) in manifest.items()
+        if digest is not None
+    ]
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        results = executor.map(lambda item: _check(*item), to_check)
+        damaged = [path for (path, _), ok in zip(to_check, results) if not ok]
+    return VerifyResult(len(to_check), damaged, len(manifest) - len(to_check))
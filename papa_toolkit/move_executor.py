@@ -0,0 +1,141 @@
+"""
+Executor for the file moves of an import.
+
+Moves between folders of the same filesystem are a single ``os.rename``. Moves
+to another device (e.g. from the Dropbox folder to an archive drive) are
+copies: those run in parallel on a thread pool, are written under a temporary
+name and renamed once complete, and the source files are deleted in batches
+after their copies were verified.
+"""
+
+import logging
+import os
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from threading import Lock
+
+from .file_ops import copy_file, partial_path
+
+_logger = logging.getLogger(__name__)
+
+
+class MoveExecutor:
+    """
+    Moves files, see the module documentation.
+
+    ``move`` must be called from a single thread. It returns a future that
+    resolves to the destination once the file is in place; the source may be
+    deleted later, at the latest when ``close`` returns.
+    """
+
+    def __init__(self, workers: int = 4, delete_batch: int = 64):
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(1, workers), thread_name_prefix="copy"
+        )
+        self._delete_batch = delete_batch
+        self._pending_deletes: list[Path] = []
+        self._deletes_lock = Lock()
+        self._known_dirs: set[Path] = set()
+        self._devices: dict[Path, int] = {}
+        self._in_flight: set[Path] = set()
+        self.bytes_copied = 0
+        self.renamed = 0
+        self.copied = 0
+
+    def __enter__(self) -> "MoveExecutor":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def ensure_dir(self, folder: Path) -> None:
+        """Create ``folder`` (and parents) unless it is already known to exist."""
+        if folder in self._known_dirs:
+            return
+        folder.mkdir(parents=True, exist_ok=True)
+        self._known_dirs.add(folder)
+        self._known_dirs.update(folder.parents)
+
+    def unique_destination(self, destination: Path) -> Path:
+        """
+        Return ``destination`` or, if that name is taken on disk or by a copy
+        still in progress, the first free ``name (n).ext``.
+        """
+        counter = 1
+        candidate = destination
+        while candidate in self._in_flight or candidate.exists():
+            candidate = destination.with_stem(f"{destination.stem} ({counter})")
+            counter += 1
+        return candidate
+
+    def move(self, source: Path, destination: Path) -> Future:
+        """
+        Move ``source`` to ``destination``, creating its folder if needed.
+
+        ``destination`` must not exist, see unique_destination.
+        """
+        self.ensure_dir(destination.parent)
+
+        if self._same_device(source.parent, destination.parent):
+            future = Future()
+            try:
+                os.rename(source, destination)
+            except OSError as e:
+                # e.g. EXDEV across bind mounts: fall back to a copy
+                _logger.debug("Rename failed for %s, copying: %s", source, e)
+            else:
+                self.renamed += 1
+                future.set_result(destination)
+                return future
+
+        self._in_flight.add(destination)
+        future = self._executor.submit(self._copy, source, destination)
+        future.add_done_callback(lambda _: self._in_flight.discard(destination))
+        return future
+
+    def flush(self) -> None:
+        """Delete the sources of the copies verified so far."""
+        with self._deletes_lock:
+            pending, self._pending_deletes = self._pending_deletes, []
+        for source in pending:
+            try:
+                source.unlink()
+            except OSError as e:
+                _logger.error("No se pudo borrar el original %s: %s", source, e)
+
+    def close(self) -> None:
+        """Wait for all the copies and delete their sources."""
+        self._executor.shutdown(wait=True)
+        self.flush()
+
+    def _same_device(self, source_dir: Path, destination_dir: Path) -> bool:
+        try:
+            return self._device(source_dir) == self._device(destination_dir)
+        except OSError:
+            return False
+
+    def _device(self, folder: Path) -> int:
+        device = self._devices.get(folder)
+        if device is None:
+            device = self._devices[folder] = os.stat(folder).st_dev
+        return device
+
+    def _copy(self, source: Path, destination: Path) -> Path:
+        temporary = partial_path(destination)
+        try:
+            copied = copy_file(source, temporary)
+            if copied != source.stat().st_size:
+                raise OSError(f"Copia incompleta de {source} ({copied} bytes)")
+            os.replace(temporary, destination)
+        except BaseException:
+            temporary.unlink(missing_ok=True)
+            raise
+
+        with self._deletes_lock:
+            self.copied += 1
+            self.bytes_copied += copied
+            self._pending_deletes.append(source)
+            batch_full = len(self._pending_deletes) >= self._delete_batch
+        if batch_full:
+            self.flush()
+        return destination
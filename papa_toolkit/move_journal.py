@@ -0,0 +1,125 @@
+"""
+Append-only journal of the moves of an import.
+
+Every move is written to the journal before it starts and marked as completed
+once the file is in place. Records are JSON lines flushed to disk in batches
+(fsync every few records or fractions of a second), so journaling costs
+almost nothing. If an import is interrupted the journal is left behind and the
+next run can finish, or roll back, whatever was in flight (see replay).
+"""
+
+import json
+import logging
+import os
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import NamedTuple
+
+_logger = logging.getLogger(__name__)
+
+JOURNAL_FILENAME = ".papa-journal.jsonl"
+
+
+class JournalEntry(NamedTuple):
+    entry_id: int
+    source: Path
+    destination: Path
+    kind: str | None
+    date_taken: datetime | None
+    completed: bool
+
+
+class MoveJournal:
+    """Writer of a journal file, see the module documentation."""
+
+    def __init__(self, path: Path, fsync_every: int = 32, fsync_interval: float = 1.0):
+        self.path = path
+        self._file = open(path, "a", encoding="utf-8")
+        self._fsync_every = fsync_every
+        self._fsync_interval = fsync_interval
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+        self._next_id = 0
+
+    def planned(
+        self,
+        source: Path,
+        destination: Path,
+        kind: str | None = None,
+        date_taken: datetime | None = None,
+    ) -> int:
+        """Record a move about to start, returns its id for ``completed``."""
+        self._next_id += 1
+        self._write(
+            {
+                "op": "move",
+                "id": self._next_id,
+                "src": str(source),
+                "dst": str(destination),
+                "kind": kind,
+                "date": date_taken.isoformat() if date_taken else None,
+            }
+        )
+        return self._next_id
+
+    def completed(self, entry_id: int) -> None:
+        self._write({"op": "done", "id": entry_id})
+
+    def sync(self) -> None:
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def close(self, finished: bool) -> None:
+        """
+        Close the journal. If the import ``finished``, nothing is left to
+        resume and the file is removed.
+        """
+        self.sync()
+        self._file.close()
+        if finished:
+            self.path.unlink(missing_ok=True)
+
+    def _write(self, record: dict) -> None:
+        self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._unsynced += 1
+        if (
+            self._unsynced >= self._fsync_every
+            or time.monotonic() - self._last_sync >= self._fsync_interval
+        ):
+            self.sync()
+
+
+def read_journal(path: Path) -> list[JournalEntry]:
+    """
+    Read the moves recorded in a journal, in order.
+
+    A truncated last line (the process died while writing it) is ignored.
+    """
+    moves: dict[int, dict] = {}
+    done: set[int] = set()
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                _logger.debug("Ignoring damaged journal line: %r", line)
+                continue
+            if record.get("op") == "move":
+                moves[record["id"]] = record
+            elif record.get("op") == "done":
+                done.add(record["id"])
+
+    return [
+        JournalEntry(
+            entry_id,
+            Path(record["src"]),
+            Path(record["dst"]),
+            record.get("kind"),
+            datetime.fromisoformat(record["date"]) if record.get("date") else None,
+            entry_id in done,
+        )
+        for entry_id, record in moves.items()
+    ]
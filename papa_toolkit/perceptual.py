@@ -0,0 +1,309 @@
+"""
+Detection of pictures that look the same although their bytes differ, e.g.
+copies recompressed by WhatsApp or resized by Dropbox.
+
+Each picture gets two 64 bit perceptual hashes from a small grayscale
+thumbnail:
+
+- dHash: whether each pixel of a 9x8 thumbnail is brighter than the next one,
+- pHash: whether each of the 8x8 lowest frequencies of the DCT of a 32x32
+  thumbnail is above their median.
+
+JPEG files are decoded with PIL's ``draft`` mode, which has the decoder scale
+the picture down by up to 8 while decoding, so a photo costs a fraction of a
+full decode. Pictures are decoded in chunks by a process pool and the hashes of
+a chunk are computed at once with NumPy. Hashes are kept in the metadata cache,
+so only new or changed pictures are decoded again.
+
+Two pictures are near-duplicates when both their hashes differ in a few bits
+at most (the Hamming distance). Candidates are looked up in a multi-index hash
+of the pHashes (see HashIndex), so each picture is only compared with a small
+part of the archive instead of with every other picture.
+"""
+
+import functools
+import itertools
+import logging
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import NamedTuple
+
+import numpy as np
+from PIL import Image, ImageOps
+
+from .duplicates import IGNORED_FILES, choose_original
+from .media_types import DECODABLE_IMAGE_TYPES, detect_media_type
+from .metadata_cache import MetadataCache
+from .metrics import Metrics, phase
+from .scanner import SourceFile, scan_files
+
+_logger = logging.getLogger(__name__)
+
+# Bits that may differ between two pictures taken as the same one; recompressed
+# and resized copies are usually within 4
+DEFAULT_MAX_DISTANCE = 8
+
+_HASH_SIZE = 8
+_DCT_SIZE = 32
+# Size requested to the JPEG decoder, large enough for a good 32x32 thumbnail
+_DRAFT_SIZE = (4 * _DCT_SIZE, 4 * _DCT_SIZE)
+
+# Pictures hashed per task sent to a worker process
+_CHUNK_SIZE = 64
+
+# Parts of a hash indexed separately by HashIndex
+_CHUNKS = 4
+_CHUNK_BITS = 64 // _CHUNKS
+
+
+class ImageHashes(NamedTuple):
+    dhash: int
+    phash: int
+    pixels: int  # width * height of the picture, to keep the largest copy
+
+
+class SimilarGroup(NamedTuple):
+    paths: list[Path]  # the one to keep first, see find_similar
+
+
+def hamming(a: int, b: int) -> int:
+    """Number of bits that differ between two hashes."""
+    return (a ^ b).bit_count()
+
+
+def _dct_matrix(n: int) -> np.ndarray:
+    """Orthonormal DCT-II matrix: the DCT of ``x`` is ``m @ x @ m.T``."""
+    k = np.arange(n)[:, None]
+    i = np.arange(n)[None, :]
+    m = np.cos(np.pi * (2 * i + 1) * k / (2 * n)) * np.sqrt(2 / n)
+    m[0] /= np.sqrt(2)
+    return m
+
+
+_DCT = _dct_matrix(_DCT_SIZE)
+
+
+def _chunks(value: int) -> list[int]:
+    mask = (1 << _CHUNK_BITS) - 1
+    return [(value >> (i * _CHUNK_BITS)) & mask for i in range(_CHUNKS)]
+
+
+@functools.cache
+def _flips(max_distance: int) -> list[int]:
+    """Masks of up to ``max_distance`` bits set, to find the nearby chunks."""
+    flips = [0]
+    for count in range(1, max_distance + 1):
+        for bits in itertools.combinations(range(_CHUNK_BITS), count):
+            flips.append(sum(1 << bit for bit in bits))
+    return flips
+
+
+def _thumbnails(path: str) -> tuple[np.ndarray, np.ndarray, int] | None:
+    """Decode ``path`` into the dHash and pHash thumbnails."""
+    if detect_media_type(Path(path)) not in DECODABLE_IMAGE_TYPES:
+        return None
+    with Image.open(path) as image:
+        pixels = image.width * image.height
+        image.draft("L", _DRAFT_SIZE)
+        image = ImageOps.exif_transpose(image).convert("L")
+    # Pictures not decoded in draft mode are first reduced by whole factors
+    large = image.resize(
+        (_DCT_SIZE, _DCT_SIZE), Image.Resampling.LANCZOS, reducing_gap=2.0
+    )
+    small = large.resize((_HASH_SIZE + 1, _HASH_SIZE), Image.Resampling.LANCZOS)
+    return (
+        np.asarray(small, dtype=np.float32),
+        np.asarray(large, dtype=np.float32),
+        pixels,
+    )
+
+
+def _pack_bits(bits: np.ndarray) -> list[int]:
+    """Turn an (n, 8, 8) array of booleans into n 64 bit integers."""
+    packed = np.packbits(bits.reshape(len(bits), -1), axis=1)
+    return [int(value) for value in packed.view(">u8").ravel()]
+
+
+def _hash_chunk(paths: list[str]) -> list[ImageHashes | None]:
+    """Hash the pictures of a chunk, None for files that are not pictures."""
+    thumbnails = {}
+    for index, path in enumerate(paths):
+        try:
+            result = _thumbnails(path)
+        except (OSError, ValueError, SyntaxError, Image.DecompressionBombError) as e:
+            _logger.warning("No se pudo leer la imagen %s: %s", path, e)
+            continue
+        if result is not None:
+            thumbnails[index] = result
+
+    hashes: list[ImageHashes | None] = [None] * len(paths)
+    if not thumbnails:
+        return hashes
+    small = np.stack([t[0] for t in thumbnails.values()])
+    large = np.stack([t[1] for t in thumbnails.values()])
+
+    dhashes = _pack_bits(small[:, :, 1:] > small[:, :, :-1])
+    # DCT of every thumbnail at once, then its lowest frequencies
+    low = (_DCT @ large @ _DCT.T)[:, :_HASH_SIZE, :_HASH_SIZE]
+    # The median leaves out the DC term, the mean brightness
+    flat = low.reshape(len(low), -1)
+    median = np.median(flat[:, 1:], axis=1)
+    phashes = _pack_bits(low > median[:, None, None])
+
+    for (index, thumbnail), dhash, phash in zip(thumbnails.items(), dhashes, phashes):
+        hashes[index] = ImageHashes(dhash, phash, thumbnail[2])
+    return hashes
+
+
+def compute_hashes(
+    paths: Iterable[Path], workers: int = 4
+) -> Iterator[tuple[Path, ImageHashes | None]]:
+    """
+    Hash pictures in a process pool, yielding (path, hashes) in order.
+
+    Hashes are None for files that are not pictures or could not be read.
+    """
+    paths = list(paths)
+    chunks = [
+        [str(path) for path in paths[i : i + _CHUNK_SIZE]]
+        for i in range(0, len(paths), _CHUNK_SIZE)
+    ]
+    if not chunks:
+        return
+    with ProcessPoolExecutor(max_workers=max(1, workers)) as executor:
+        results = executor.map(_hash_chunk, chunks)
+        for chunk, hashes in zip(chunks, results):
+            for path, image_hashes in zip(chunk, hashes):
+                yield Path(path), image_hashes
+
+
+class HashIndex:
+    """
+    Multi-index hashing of 64 bit hashes, for Hamming distance queries.
+
+    Hashes are split into 4 chunks of 16 bits, each indexed in its own table.
+    Two hashes within ``max_distance`` bits have at least one chunk within
+    ``max_distance // 4`` bits, so only the buckets of those chunk values are
+    looked at. A BK-tree, the usual alternative, visits most of its nodes for
+    distances around 8 and was about 80 times slower on 100k hashes.
+    """
+
+    def __init__(self):
+        self._hashes: list[int] = []
+        self._items: list = []
+        self._tables: list[dict[int, list[int]]] = [{} for _ in range(_CHUNKS)]
+
+    def add(self, value: int, item) -> None:
+        position = len(self._hashes)
+        self._hashes.append(value)
+        self._items.append(item)
+        for table, chunk in zip(self._tables, _chunks(value)):
+            table.setdefault(chunk, []).append(position)
+
+    def search(self, value: int, max_distance: int) -> list[tuple[int, object]]:
+        """Return (distance, item) of the items within ``max_distance``."""
+        candidates = set()
+        flips = _flips(max_distance // _CHUNKS)
+        for table, chunk in zip(self._tables, _chunks(value)):
+            for flip in flips:
+                bucket = table.get(chunk ^ flip)
+                if bucket:
+                    candidates.update(bucket)
+        found = []
+        for position in candidates:
+            distance = hamming(value, self._hashes[position])
+            if distance <= max_distance:
+                found.append((distance, self._items[position]))
+        return found
+
+
+def group_similar(
+    pictures: dict[Path, tuple[int, ImageHashes]],
+    max_distance: int = DEFAULT_MAX_DISTANCE,
+) -> list[SimilarGroup]:
+    """
+    Group pictures given as path -> (file size, hashes) that look the same.
+
+    The picture to keep in each group is the one with most pixels, then the
+    largest file (the least compressed), then as for identical files (see
+    choose_original). The others in the group are all near-duplicates of that
+    one, not only of each other. Only groups with more than one picture are
+    returned.
+    """
+    order = sorted(
+        choose_original(pictures),
+        key=lambda path: (-pictures[path][1].pixels, -pictures[path][0]),
+    )
+    hash_index = HashIndex()
+    for position, path in enumerate(order):
+        hash_index.add(pictures[path][1].phash, position)
+
+    grouped = [False] * len(order)
+    groups = []
+    for position, path in enumerate(order):
+        if grouped[position]:
+            continue
+        hashes = pictures[path][1]
+        members = sorted(
+            other
+            for _, other in hash_index.search(hashes.phash, max_distance)
+            if not grouped[other]
+            and hamming(hashes.dhash, pictures[order[other]][1].dhash) <= max_distance
+        )
+        if len(members) < 2:
+            continue
+        for other in members:
+            grouped[other] = True
+        groups.append(SimilarGroup([order[other] for other in members]))
+    return groups
+
+
+def find_similar(
+    folders: Iterable[Path],
+    workers: int = 4,
+    max_distance: int = DEFAULT_MAX_DISTANCE,
+    cache: MetadataCache | None = None,
+    exclude: Iterable[str] = IGNORED_FILES,
+    metrics: Metrics | None = None,
+) -> list[SimilarGroup]:
+    """
+    Find pictures that look the same anywhere below ``folders``.
+
+    With ``metrics``, the pictures compared are counted as its items.
+    """
+    exclude = list(exclude)
+    files: dict[Path, SourceFile] = {}  # keyed on the path, folders may overlap
+    with phase(metrics, "scan"):
+        for folder in folders:
+            for source in scan_files(folder, recursive=True, exclude=exclude):
+                files[source.path.absolute()] = source
+
+    pictures = {}
+    pending = []
+    for path, source in files.items():
+        cached = None
+        if cache is not None:
+            cached = cache.get_hashes(path, source.size, source.mtime_ns)
+        if cached is None:
+            pending.append(path)
+        elif cached.dhash is not None:
+            pictures[path] = (source.size, ImageHashes(*cached))
+
+    if pending:
+        _logger.info("Calculando el hash de %d archivos...", len(pending))
+    with phase(metrics, "hash"):
+        for path, hashes in compute_hashes(pending, workers):
+            source = files[path]
+            if hashes is not None:
+                pictures[path] = (source.size, hashes)
+            if cache is not None:
+                dhash, phash, pixels = hashes or (None, None, None)
+                cache.put_hashes(
+                    path, source.size, source.mtime_ns, dhash, phash, pixels
+                )
+
+    if metrics is not None:
+        metrics.add_items(len(pictures))
+    with phase(metrics, "compare"):
+        return group_similar(pictures, max_distance)
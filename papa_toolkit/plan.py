@@ -0,0 +1,102 @@
+"""
+Plans of the moves of a run, to review a dry run and carry it out later.
+
+A dry run does all the expensive work (detecting types, reading dates with PIL
+or ffprobe) and then throws it away, so the real run repeats it. Written with
+``write_plan``, a dry run keeps what it would do instead: one JSON line per
+file or folder with its source, destination, date, type and size. Applying
+the plan moves the files without inspecting them again.
+
+Each entry keeps the size and modification time of its source as seen by the
+dry run. A source that changed since then is stale (see ``is_stale``) and is
+looked at again when the plan is applied.
+"""
+
+import json
+import os
+from collections.abc import Iterable
+from datetime import datetime
+from pathlib import Path
+from typing import NamedTuple
+
+from .file_ops import partial_path
+
+_PLAN_VERSION = 1
+
+# Type of the entries of whole folders (year_organizer)
+FOLDER = "folder"
+
+
+class PlanEntry(NamedTuple):
+    source: Path
+    destination: Path | None  # None if the file is already archived
+    date_taken: datetime | None
+    kind: str | None  # IMAGE, VIDEO or FOLDER
+    media_type: str | None
+    size: int
+    mtime_ns: int
+
+
+def write_plan(path: Path, command: str, entries: Iterable[PlanEntry]) -> int:
+    """Write a plan of ``command`` to ``path``, returns the number of entries."""
+    count = 0
+    temporary = partial_path(path)
+    with open(temporary, "w", encoding="utf-8") as f:
+        header = {"version": _PLAN_VERSION, "command": command}
+        f.write(json.dumps(header) + "\n")
+        for entry in entries:
+            record = {
+                "src": str(entry.source),
+                "dst": str(entry.destination) if entry.destination else None,
+                "date": entry.date_taken.isoformat() if entry.date_taken else None,
+                "type": entry.kind,
+                "media": entry.media_type,
+                "size": entry.size,
+                "mtime_ns": entry.mtime_ns,
+            }
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            count += 1
+    os.replace(temporary, path)
+    return count
+
+
+def read_plan(path: Path, command: str) -> list[PlanEntry]:
+    """
+    Read a plan written by ``command``.
+
+    Raises ValueError if the file is not a plan of that command.
+    """
+    with open(path, encoding="utf-8") as f:
+        try:
+            header = json.loads(f.readline())
+            records = [json.loads(line) for line in f if line.strip()]
+        except json.JSONDecodeError as e:
+            raise ValueError(f"{path} no es un plan válido: {e}") from e
+    if not isinstance(header, dict) or header.get("version") != _PLAN_VERSION:
+        raise ValueError(f"{path} no es un plan válido")
+    if header.get("command") != command:
+        raise ValueError(
+            f"{path} es un plan de {header.get('command')}, no de {command}"
+        )
+
+    return [
+        PlanEntry(
+            Path(record["src"]),
+            Path(record["dst"]) if record.get("dst") else None,
+            datetime.fromisoformat(record["date"]) if record.get("date") else None,
+            record.get("type"),
+            record.get("media"),
+            record["size"],
+            record["mtime_ns"],
+        )
+        for record in records
+    ]
+
+
+def is_stale(entry: PlanEntry) -> bool:
+    """Whether the source of ``entry`` is gone or changed since it was planned."""
+    try:
+        stat = os.stat(entry.source)
+    except FileNotFoundError:
+        return True
+    return stat.st_size != entry.size or stat.st_mtime_ns != entry.mtime_ns
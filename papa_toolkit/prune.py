@@ -0,0 +1,113 @@
+"""
+Removal of folders left empty, e.g. once their pictures were organized.
+
+Folders holding only the settings files that Picasa and Windows leave behind
+(``.picasa.ini``, ``desktop.ini``, ``Thumbs.db``) count as empty, and those
+files go with the folder. Folders are looked at deepest first, so a folder
+whose subfolders were all empty is removed in the same pass. After an import
+only the folders it touched, and their parents, need to be looked at.
+"""
+
+import heapq
+import logging
+import os
+import stat
+from collections.abc import Iterable
+from pathlib import Path
+
+_logger = logging.getLogger(__name__)
+
+# Lower case names
+SETTINGS_FILES = {".picasa.ini", "picasa.ini", "desktop.ini", "thumbs.db"}
+
+
+def _is_settings_file(name: str) -> bool:
+    return name.lower() in SETTINGS_FILES
+
+
+def _remove_folder(folder: str, files: Iterable[str]) -> bool:
+    try:
+        for name in files:
+            path = os.path.join(folder, name)
+            try:
+                os.remove(path)
+            except PermissionError:
+                # desktop.ini is usually read-only, which blocks deleting it
+                # on Windows
+                os.chmod(path, stat.S_IWRITE)
+                os.remove(path)
+        os.rmdir(folder)
+    except OSError as e:
+        _logger.warning("No se pudo borrar la carpeta vacía %s: %s", folder, e)
+        return False
+    return True
+
+
+def prune_tree(root: Path, dry_run: bool = False) -> list[Path]:
+    """
+    Remove the empty folders under ``root`` (not ``root`` itself) in a single
+    bottom-up walk. Returns the folders removed, or to remove with ``dry_run``.
+    """
+    top = os.fspath(root)
+    removed: set[str] = set()
+    for folder, dirs, files in os.walk(top, topdown=False):
+        if folder == top:
+            continue
+        if not all(_is_settings_file(name) for name in files):
+            continue
+        if not all(os.path.join(folder, name) in removed for name in dirs):
+            continue
+        if dry_run or _remove_folder(folder, files):
+            removed.add(folder)
+    return sorted(map(Path, removed))
+
+
+def prune_folders(
+    folders: Iterable[Path], stop_at: Path, dry_run: bool = False
+) -> list[Path]:
+    """
+    Remove those of ``folders`` that are empty, then the parents they leave
+    empty, up to ``stop_at`` (not included). Folders outside ``stop_at`` are
+    left alone.
+    """
+    # Deepest first: a parent is only looked at after all its touched children
+    heap = []
+    queued: set[Path] = set()
+
+    def push(folder: Path) -> None:
+        if folder in queued or folder == stop_at or not folder.is_relative_to(stop_at):
+            return
+        queued.add(folder)
+        heapq.heappush(heap, (-len(folder.parts), folder))
+
+    for folder in folders:
+        push(folder)
+
+    removed: set[Path] = set()
+    while heap:
+        _, folder = heapq.heappop(heap)
+        try:
+            with os.scandir(folder) as entries:
+                entries = list(entries)
+        except FileNotFoundError:
+            continue
+        except OSError as e:
+            _logger.warning("No se pudo leer la carpeta %s: %s", folder, e)
+            continue
+
+        files = []
+        empty = True
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                empty = Path(entry.path) in removed
+            else:
+                empty = _is_settings_file(entry.name)
+                files.append(entry.name)
+            if not empty:
+                break
+        if not empty:
+            continue
+        if dry_run or _remove_folder(os.fspath(folder), files):
+            removed.add(folder)
+            push(folder.parent)
+    return sorted(removed)
@@ -0,0 +1,112 @@
+"""
+Where each kind of file is archived.
+
+A route sends files to a destination folder, in a folder layout (see
+papa_toolkit.layout). The route of a file is looked up by, from the most to
+the least specific: its extension (``.heic``), its media type as detected by
+papa_toolkit.media_types (``jpeg``, ``mov``...), its kind (``image`` or
+``video``) and finally ``*``. A single pass over an upload folder can so
+fill several archives, classifying each file only once.
+
+Routes are given on the command line as ``TYPE=FOLDER[:LAYOUT]``, e.g.
+``video=D:\\Videos:YYYY/YYYY-MM-DD``, or in a TOML file::
+
+    [routes.image]
+    destination = "C:/Users/papa/Pictures/Organized"
+
+    [routes.video]
+    destination = "C:/Users/papa/Videos/Organized"
+    layout = "YYYY/YYYY-MM-DD"
+
+Relative destinations in the file are relative to the folder of the file.
+"""
+
+import tomllib
+from pathlib import Path
+from typing import NamedTuple
+
+from .layout import Layout
+from .media_types import IMAGE, VIDEO, media_kind
+
+DEFAULT_KEY = "*"
+DEFAULT_LAYOUT = "YYYY-MM-DD"
+
+
+class Route(NamedTuple):
+    destination: Path
+    layout: Layout
+
+
+def _check_key(key: str) -> str:
+    key = key.strip().lower()
+    if (
+        key in (DEFAULT_KEY, IMAGE, VIDEO)
+        or (key.startswith(".") and len(key) > 1)
+        or media_kind(key) is not None
+    ):
+        return key
+    raise ValueError(
+        f"Tipo de ruta desconocido '{key}': use image, video, un formato "
+        "(jpeg, mov...), una extensión (.heic) o *"
+    )
+
+
+class Router:
+    """Picks the route of each file, see the module documentation."""
+
+    def __init__(self, routes: dict[str, Route] | None = None):
+        self.routes: dict[str, Route] = {}
+        for key, route in (routes or {}).items():
+            self.add(key, route)
+
+    def add(self, key: str, route: Route) -> None:
+        self.routes[_check_key(key)] = route
+
+    def route_for(
+        self, path: Path, media_type: str | None, kind: str | None
+    ) -> Route | None:
+        """Route of a file, None if no route takes it."""
+        routes = self.routes
+        route = routes.get(path.suffix.lower())
+        if route is None and media_type is not None:
+            route = routes.get(media_type)
+        if route is None and kind is not None:
+            route = routes.get(kind)
+        if route is None:
+            route = routes.get(DEFAULT_KEY)
+        return route
+
+    @property
+    def destinations(self) -> list[Path]:
+        """Destination folders of all the routes, each listed once."""
+        return list(dict.fromkeys(route.destination for route in self.routes.values()))
+
+
+def parse_route(spec: str) -> tuple[str, Route]:
+    """Parse a ``TYPE=FOLDER[:LAYOUT]`` route given on the command line."""
+    key, sep, target = spec.partition("=")
+    if not sep or not key.strip() or not target:
+        raise ValueError(f"Ruta no válida '{spec}', use TIPO=CARPETA[:ESTRUCTURA]")
+    layout = DEFAULT_LAYOUT
+    # Only a layout can follow the last colon: in "C:\..." it is the drive's
+    folder, sep, tail = target.rpartition(":")
+    if sep and folder and tail.endswith(DEFAULT_LAYOUT):
+        target, layout = folder, tail
+    return _check_key(key), Route(Path(target), Layout(layout))
+
+
+def load_routes(path: Path) -> Router:
+    """Read the routes of a TOML file, see the module documentation."""
+    with open(path, "rb") as f:
+        config = tomllib.load(f)
+
+    router = Router()
+    for key, table in config.get("routes", {}).items():
+        if not isinstance(table, dict) or "destination" not in table:
+            raise ValueError(f"La ruta '{key}' de {path} no tiene destination")
+        destination = path.parent / Path(table["destination"]).expanduser()
+        layout = Layout(table.get("layout", DEFAULT_LAYOUT))
+        router.add(key, Route(destination, layout))
+    if not router.routes:
+        raise ValueError(f"No hay rutas en {path}, añada tablas [routes.TIPO]")
+    return router
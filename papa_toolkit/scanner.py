@@ -0,0 +1,90 @@
+"""
+Streaming scan of the files in a folder.
+
+Files are yielded while the folder is still being listed, using the data that
+``os.scandir`` already returns, so work can start on the first file of a large
+or network mounted folder and memory use does not depend on its size.
+"""
+
+import fnmatch
+import logging
+import os
+import re
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+from typing import NamedTuple
+
+_logger = logging.getLogger(__name__)
+
+
+class SourceFile(NamedTuple):
+    path: Path
+    size: int
+    mtime_ns: int
+
+
+def compile_globs(patterns: Iterable[str]) -> re.Pattern | None:
+    """Compile glob patterns into a single regex, None if there are none."""
+    patterns = list(patterns)
+    if not patterns:
+        return None
+    flags = re.IGNORECASE if os.name == "nt" else 0
+    return re.compile("|".join(fnmatch.translate(p) for p in patterns), flags)
+
+
+def scan_files(
+    folder: Path,
+    recursive: bool = False,
+    include: Iterable[str] = (),
+    exclude: Iterable[str] = (),
+    skip_dirs: Iterable[Path] = (),
+) -> Iterator[SourceFile]:
+    """
+    Yield the files of ``folder``, optionally descending into subfolders.
+
+    Args:
+        folder: Folder to scan
+        recursive: Also scan subfolders
+        include: If given, only files matching one of these globs are yielded
+        exclude: Files and folders matching any of these globs are ignored
+        skip_dirs: Folders never to descend into (e.g. a destination inside
+            the source folder)
+
+    Globs are matched against the name and against the path relative to
+    ``folder`` (with forward slashes).
+    """
+    include_re = compile_globs(include)
+    exclude_re = compile_globs(exclude)
+    skip = {os.path.normcase(os.path.abspath(d)) for d in skip_dirs}
+
+    def matches(pattern: re.Pattern, name: str, relative: str) -> bool:
+        return bool(pattern.match(name) or pattern.match(relative))
+
+    pending = [(os.fspath(folder), "")]
+    while pending:
+        current, prefix = pending.pop()
+        try:
+            with os.scandir(current) as entries:
+                for entry in entries:
+                    relative = prefix + entry.name
+                    if exclude_re and matches(exclude_re, entry.name, relative):
+                        continue
+                    try:
+                        if entry.is_dir():
+                            if recursive and (
+                                os.path.normcase(os.path.abspath(entry.path))
+                                not in skip
+                            ):
+                                pending.append((entry.path, relative + "/"))
+                            continue
+                        if not entry.is_file():
+                            continue
+                        if include_re and not matches(include_re, entry.name, relative):
+                            continue
+                        stat = entry.stat()
+                    except OSError as e:
+                        _logger.debug("Cannot access %s: %s", entry.path, e)
+                        continue
+                    yield SourceFile(Path(entry.path), stat.st_size, stat.st_mtime_ns)
+        except OSError as e:
+            _logger.warning("No se pudo leer la carpeta %s: %s", current, e)
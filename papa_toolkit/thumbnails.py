@@ -0,0 +1,320 @@
+"""
+Thumbnail cache of the organized archive, so browsing it does not mean
+decoding full resolution photos every time.
+
+Each date folder gets a ``.thumbnails`` subfolder with a small JPEG per
+picture. Thumbnails are stamped with the modification time of their picture,
+so a thumbnail is only made again when the picture is new or changed, and
+thumbnails of pictures no longer in the folder are deleted. JPEG files are
+decoded with PIL's ``draft`` mode, which has the decoder scale the picture down
+while decoding, and thumbnails are made by a process pool.
+
+The cache is bounded in size: new thumbnails are planned newest folder first
+only while they fit, and once over the limit the least recently used
+thumbnails (by access time, where the file system records it) are evicted.
+The limit and the size of the cache are kept in the archive root (see
+add_to_cache), so imports only walk the archive when the cache may be full.
+"""
+
+import json
+import logging
+import os
+import time
+from collections.abc import Iterable
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import NamedTuple
+
+from .file_ops import partial_path
+from .media_types import DECODABLE_IMAGE_TYPES, detect_media_type
+
+_logger = logging.getLogger(__name__)
+
+# Left out of flattening, merging and mirroring: this module imports PIL only
+# to make thumbnails, so the others can import the name without it
+THUMBNAILS_FOLDER = ".thumbnails"
+
+# Longest side of the thumbnails, in pixels
+DEFAULT_SIZE = 320
+DEFAULT_MAX_BYTES = 2 * 1024**3
+
+# Limit and size of the cache of an archive, in its root
+STATE_FILENAME = ".papa-thumbnails.json"
+
+# Size assumed for a thumbnail not made yet, when planning what fits
+_ESTIMATED_SIZE = 24 * 1024
+
+_JPEG_QUALITY = 85
+
+# Pictures per task sent to a worker process
+_CHUNK_SIZE = 16
+
+
+class ThumbnailPlan(NamedTuple):
+    tasks: list[tuple[Path, Path, int]]  # (picture, thumbnail, picture mtime_ns)
+    up_to_date: int
+    orphans: list[Path]  # thumbnails whose picture is gone
+    skipped: int  # pictures left without a thumbnail, over the size limit
+
+
+class ThumbnailResult(NamedTuple):
+    created: int
+    size: int  # bytes of the thumbnails created
+    errors: list[str]
+
+
+class Eviction(NamedTuple):
+    evicted: int
+    size: int  # bytes the thumbnails take afterwards
+
+
+class CacheState(NamedTuple):
+    max_bytes: int
+    size: int  # bytes the thumbnails take, as of the last update
+
+
+def thumbnail_path(picture: Path) -> Path:
+    """Where the thumbnail of ``picture`` is stored."""
+    name = picture.name
+    if picture.suffix.lower() not in (".jpg", ".jpeg"):
+        name += ".jpg"
+    return picture.parent / THUMBNAILS_FOLDER / name
+
+
+def archive_folders(root: Path) -> list[Path]:
+    """
+    Folders of ``root`` holding files or thumbnails, newest first.
+
+    Date folders (YYYY-MM-DD, also below YYYY) sort by date, so they are
+    returned in reverse order of their path. Folders left with thumbnails
+    only are included, so that those are deleted.
+    """
+    folders = []
+    for folder, dirs, files in os.walk(root):
+        has_thumbnails = THUMBNAILS_FOLDER in dirs
+        # Thumbnail and other hidden folders are not part of the archive
+        dirs[:] = [name for name in dirs if not name.startswith(".")]
+        if has_thumbnails or any(not name.startswith(".") for name in files):
+            folders.append(Path(folder))
+    return sorted(folders, reverse=True)
+
+
+def _list_files(folder: Path) -> dict[str, os.stat_result]:
+    try:
+        with os.scandir(folder) as entries:
+            return {
+                entry.name: entry.stat()
+                for entry in entries
+                if entry.is_file() and not entry.name.startswith(".")
+            }
+    except FileNotFoundError:
+        return {}
+
+
+def _is_picture(path: Path) -> bool:
+    try:
+        return detect_media_type(path) in DECODABLE_IMAGE_TYPES
+    except OSError as e:
+        _logger.warning("No se pudo leer %s: %s", path, e)
+        return False
+
+
+def plan_thumbnails(
+    folders: Iterable[Path], max_bytes: int | None = DEFAULT_MAX_BYTES
+) -> ThumbnailPlan:
+    """
+    List the thumbnails to make in ``folders``, in the order given.
+
+    A thumbnail is up to date when its modification time is that of its
+    picture. Only pictures PIL can decode get one (not videos, HEIC nor raw
+    files). Missing thumbnails are only planned while the thumbnails of the
+    folders seen so far fit in ``max_bytes``, so with the newest folders first
+    the cache keeps the most recent pictures.
+    """
+    tasks, orphans = [], []
+    up_to_date = skipped = total = 0
+    for folder in folders:
+        thumbnails = _list_files(folder / THUMBNAILS_FOLDER)
+        for name, stat in sorted(_list_files(folder).items()):
+            thumbnail = thumbnail_path(folder / name)
+            existing = thumbnails.pop(thumbnail.name, None)
+            if existing is not None and existing.st_mtime_ns == stat.st_mtime_ns:
+                up_to_date += 1
+                total += existing.st_size
+            elif not _is_picture(folder / name):
+                if existing is not None:
+                    # E.g. a picture replaced by a video of the same name
+                    orphans.append(thumbnail)
+            elif max_bytes is not None and total >= max_bytes:
+                skipped += 1
+            else:
+                tasks.append((folder / name, thumbnail, stat.st_mtime_ns))
+                total += _ESTIMATED_SIZE
+        orphans.extend(folder / THUMBNAILS_FOLDER / name for name in thumbnails)
+    return ThumbnailPlan(tasks, up_to_date, orphans, skipped)
+
+
+def _make_thumbnail(task: tuple[Path, Path, int], size: int) -> None:
+    """Write the thumbnail of a picture."""
+    from PIL import Image, ImageOps
+
+    picture, thumbnail, mtime_ns = task
+    with Image.open(picture) as image:
+        image.draft("RGB", (size, size))
+        image = ImageOps.exif_transpose(image).convert("RGB")
+    image.thumbnail((size, size), Image.Resampling.LANCZOS)
+
+    thumbnail.parent.mkdir(exist_ok=True)
+    temporary = partial_path(thumbnail)
+    try:
+        image.save(temporary, "JPEG", quality=_JPEG_QUALITY, optimize=True)
+        os.replace(temporary, thumbnail)
+    except BaseException:
+        temporary.unlink(missing_ok=True)
+        raise
+    # Accessed now, and as old as its picture: it is up to date until the
+    # picture changes
+    os.utime(thumbnail, ns=(time.time_ns(), mtime_ns))
+
+
+def _make_thumbnails(
+    tasks: list[tuple[Path, Path, int]], size: int
+) -> list[str | None]:
+    """Make the thumbnails of a chunk, an error message for those that failed."""
+    from PIL import Image
+
+    errors = []
+    for task in tasks:
+        try:
+            _make_thumbnail(task, size)
+            errors.append(None)
+        except (OSError, ValueError, SyntaxError, Image.DecompressionBombError) as e:
+            errors.append(f"{task[0]}: {e}")
+    return errors
+
+
+def apply_thumbnails(
+    plan: ThumbnailPlan, size: int = DEFAULT_SIZE, workers: int = 4
+) -> ThumbnailResult:
+    """Make the planned thumbnails in a process pool and delete the orphans."""
+    for thumbnail in plan.orphans:
+        thumbnail.unlink(missing_ok=True)
+        _remove_if_empty(thumbnail.parent)
+
+    created = total = 0
+    errors = []
+    chunks = [
+        plan.tasks[i : i + _CHUNK_SIZE]
+        for i in range(0, len(plan.tasks), _CHUNK_SIZE)
+    ]
+    if chunks:
+        with ProcessPoolExecutor(max_workers=max(1, workers)) as executor:
+            results = executor.map(_make_thumbnails, chunks, [size] * len(chunks))
+            for chunk, chunk_results in zip(chunks, results):
+                for (_, thumbnail, _), error in zip(chunk, chunk_results):
+                    if error is None:
+                        created += 1
+                        total += _file_size(thumbnail)
+                        continue
+                    errors.append(error)
+                    _logger.warning("No se pudo hacer la miniatura de %s", error)
+                    # Not left out of date, e.g. of a picture being rewritten
+                    thumbnail.unlink(missing_ok=True)
+                    _remove_if_empty(thumbnail.parent)
+    return ThumbnailResult(created, total, errors)
+
+
+def _file_size(path: Path) -> int:
+    try:
+        return path.stat().st_size
+    except FileNotFoundError:
+        return 0
+
+
+def _remove_if_empty(folder: Path) -> None:
+    try:
+        folder.rmdir()
+    except OSError:
+        pass  # not empty or already gone
+
+
+def evict_thumbnails(root: Path, max_bytes: int = DEFAULT_MAX_BYTES) -> Eviction:
+    """
+    Delete the least recently used thumbnails below ``root`` until they take
+    at most ``max_bytes``.
+    """
+    thumbnails = []
+    total = 0
+    for folder, dirs, files in os.walk(root):
+        if os.path.basename(folder) == THUMBNAILS_FOLDER:
+            dirs.clear()
+            for name in files:
+                path = os.path.join(folder, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                thumbnails.append((stat.st_atime_ns, stat.st_size, path))
+                total += stat.st_size
+        else:
+            dirs[:] = [
+                name
+                for name in dirs
+                if name == THUMBNAILS_FOLDER or not name.startswith(".")
+            ]
+    if total <= max_bytes:
+        return Eviction(0, total)
+
+    evicted = 0
+    for _, size, path in sorted(thumbnails):
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+        except OSError as e:
+            _logger.warning("No se pudo borrar la miniatura %s: %s", path, e)
+            continue
+        total -= size
+        evicted += 1
+        _remove_if_empty(Path(path).parent)
+    return Eviction(evicted, total)
+
+
+def read_cache_state(root: Path) -> CacheState | None:
+    """Limit and size of the thumbnails of ``root``, None if not known."""
+    try:
+        with open(root / STATE_FILENAME, encoding="utf-8") as f:
+            state = json.load(f)
+        return CacheState(int(state["max_bytes"]), int(state["size"]))
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError, TypeError, KeyError) as e:
+        _logger.warning("Se ignora el estado dañado de las miniaturas: %s", e)
+        return None
+
+
+def write_cache_state(root: Path, state: CacheState) -> None:
+    path = root / STATE_FILENAME
+    temporary = partial_path(path)
+    with open(temporary, "w", encoding="utf-8") as f:
+        json.dump(state._asdict(), f)
+    os.replace(temporary, path)
+
+
+def add_to_cache(root: Path, added: int, max_bytes: int | None = None) -> Eviction:
+    """
+    Account for ``added`` bytes of thumbnails just made below ``root``.
+
+    The least recently used thumbnails are only evicted, walking the whole
+    archive, if the cache may now take more than ``max_bytes`` (by default
+    the limit last used for ``root``).
+    """
+    state = read_cache_state(root)
+    if max_bytes is None:
+        max_bytes = state.max_bytes if state is not None else DEFAULT_MAX_BYTES
+    if state is not None and state.size + added <= max_bytes:
+        eviction = Eviction(0, state.size + added)
+    else:
+        eviction = evict_thumbnails(root, max_bytes)
+    write_cache_state(root, CacheState(max_bytes, eviction.size))
+    return eviction
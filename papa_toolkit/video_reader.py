@@ -0,0 +1,153 @@
+"""
+Reader of the creation date of MP4/MOV videos without external tools.
+
+Walks the box tree of the file (see papa_toolkit.bmff) down to the ``moov``
+box, which is small compared to the media data and is read selectively. The
+date is taken from, in order of preference:
+
+- the QuickTime ``com.apple.quicktime.creationdate`` key (local time with
+  offset, written by iPhones),
+- the ``©day`` user data entry (QuickTime text or iTunes style),
+- the ``mvhd`` (or first track ``tkhd``) creation time, in UTC.
+"""
+
+import struct
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import BinaryIO
+
+from . import bmff
+
+_APPLE_CREATION_DATE_KEY = b"com.apple.quicktime.creationdate"
+_DAY = b"\xa9day"
+_MAC_EPOCH = datetime(1904, 1, 1, tzinfo=timezone.utc)
+
+_SUPPORTED_MEDIA_TYPES = {"mp4", "mov"}
+
+
+class VideoMetadataError(ValueError):
+    """The container is not supported or could not be parsed."""
+
+
+def _parse_date_string(text: str) -> datetime | None:
+    text = text.strip().rstrip("\0")
+    if len(text) < 10:  # at least a full date, some files only carry a year
+        return None
+    try:
+        return datetime.fromisoformat(text)
+    except ValueError:
+        return None
+
+
+def _meta_children_start(f: BinaryIO, start: int) -> int:
+    # QuickTime 'meta' boxes are plain boxes, iTunes/ISO ones are full boxes
+    # starting with version and flags
+    return start if bmff.read_exact(f, start + 4, 4) == b"hdlr" else start + 4
+
+
+def _read_data_box_text(f: BinaryIO, start: int, end: int) -> str | None:
+    """Read the value of an ``ilst`` entry holding a ``data`` box."""
+    data = bmff.find_box(f, (b"data",), start, end)
+    if data is None:
+        return None
+    value = bmff.read_exact(f, data[0], data[1] - data[0])
+    return value[8:].decode("utf-8", "replace")  # after type and locale
+
+
+def _read_apple_creation_date(f: BinaryIO, meta: tuple[int, int]) -> datetime | None:
+    children_start = _meta_children_start(f, meta[0])
+    keys = bmff.find_box(f, (b"keys",), children_start, meta[1])
+    ilst = bmff.find_box(f, (b"ilst",), children_start, meta[1])
+    if keys is None or ilst is None:
+        return None
+
+    data = bmff.read_exact(f, keys[0], keys[1] - keys[0])
+    (entry_count,) = struct.unpack_from(">I", data, 4)
+    pos, key_index = 8, None
+    for index in range(1, entry_count + 1):
+        (key_size,) = struct.unpack_from(">I", data, pos)
+        if key_size < 8:
+            raise VideoMetadataError("Invalid QuickTime metadata key")
+        if data[pos + 8 : pos + key_size] == _APPLE_CREATION_DATE_KEY:
+            key_index = index
+            break
+        pos += key_size
+    if key_index is None:
+        return None
+
+    # Entries of 'ilst' are boxes whose type is the 1-based key index
+    for box_type, start, end in bmff.iter_boxes(f, ilst[0], ilst[1]):
+        if struct.unpack(">I", box_type)[0] == key_index:
+            text = _read_data_box_text(f, start, end)
+            return _parse_date_string(text) if text else None
+    return None
+
+
+def _read_user_data_date(f: BinaryIO, udta: tuple[int, int]) -> datetime | None:
+    day = bmff.find_box(f, (_DAY,), udta[0], udta[1])
+    if day is not None:
+        # QuickTime text: 16-bit length and language code before the text
+        value = bmff.read_exact(f, day[0], day[1] - day[0])
+        (length,) = struct.unpack_from(">H", value)
+        return _parse_date_string(value[4 : 4 + length].decode("utf-8", "replace"))
+
+    meta = bmff.find_box(f, (b"meta",), udta[0], udta[1])
+    if meta is None:
+        return None
+    day = bmff.find_box(
+        f, (b"ilst", _DAY), _meta_children_start(f, meta[0]), meta[1]
+    )
+    if day is None:
+        return None
+    text = _read_data_box_text(f, *day)
+    return _parse_date_string(text) if text else None
+
+
+def _read_header_creation_time(f: BinaryIO, box: tuple[int, int]) -> datetime | None:
+    """Creation time of a ``mvhd``/``tkhd`` box, seconds since 1904 in UTC."""
+    version = bmff.read_exact(f, box[0], 1)[0]
+    if version == 1:
+        (seconds,) = struct.unpack(">Q", bmff.read_exact(f, box[0] + 4, 8))
+    else:
+        (seconds,) = struct.unpack(">I", bmff.read_exact(f, box[0] + 4, 4))
+    if seconds == 0:  # not set by the recorder
+        return None
+    return _MAC_EPOCH + timedelta(seconds=seconds)
+
+
+def read_video_datetime(path: Path, media_type: str) -> datetime | None:
+    """
+    Read the creation date of an MP4/MOV video.
+
+    Returns None if the file records no date, and raises VideoMetadataError
+    for other containers or files that could not be parsed.
+    """
+    if media_type not in _SUPPORTED_MEDIA_TYPES:
+        raise VideoMetadataError(f"Unsupported media type: {media_type}")
+
+    with open(path, "rb") as f:
+        try:
+            moov = bmff.find_box(f, (b"moov",), 0, bmff.file_size(f))
+            if moov is None:
+                raise VideoMetadataError(f"No 'moov' box in {path.name}")
+
+            meta = bmff.find_box(f, (b"meta",), *moov)
+            if meta is not None:
+                date = _read_apple_creation_date(f, meta)
+                if date is not None:
+                    return date
+
+            udta = bmff.find_box(f, (b"udta",), *moov)
+            if udta is not None:
+                date = _read_user_data_date(f, udta)
+                if date is not None:
+                    return date
+
+            mvhd = bmff.find_box(f, (b"mvhd",), *moov)
+            date = _read_header_creation_time(f, mvhd) if mvhd else None
+            if date is None:
+                tkhd = bmff.find_box(f, (b"trak", b"tkhd"), *moov)
+                date = _read_header_creation_time(f, tkhd) if tkhd else None
+            return date
+        except (struct.error, IndexError, OverflowError, bmff.BoxError) as e:
+            raise VideoMetadataError(f"Corrupt metadata in {path.name}: {e}") from e
@@ -0,0 +1,281 @@
+"""
+Watch a folder for new files.
+
+On Linux the folder is watched with inotify (through ctypes, no extra
+dependencies), elsewhere or if inotify is not available it is rescanned every
+few seconds. Either way a file is only reported once its size and mtime have
+not changed for a while, so files still being written (e.g. by Dropbox) are
+left alone until they are complete.
+"""
+
+import ctypes
+import ctypes.util
+import logging
+import os
+import select
+import struct
+import sys
+import time
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+from stat import S_ISREG
+
+from .scanner import SourceFile, compile_globs, scan_files
+
+_logger = logging.getLogger(__name__)
+
+# inotify(7) constants
+_IN_MODIFY = 0x00000002
+_IN_ATTRIB = 0x00000004
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_FROM = 0x00000040
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_DELETE = 0x00000200
+_IN_Q_OVERFLOW = 0x00004000
+_IN_ISDIR = 0x40000000
+_IN_NONBLOCK = os.O_NONBLOCK
+_IN_CLOEXEC = 0o2000000
+
+_WATCH_MASK = (
+    _IN_MODIFY
+    | _IN_ATTRIB
+    | _IN_CLOSE_WRITE
+    | _IN_MOVED_FROM
+    | _IN_MOVED_TO
+    | _IN_CREATE
+    | _IN_DELETE
+)
+_EVENT_HEADER = struct.Struct("iIII")
+
+
+class _Inotify:
+    """Minimal inotify wrapper reporting the paths that changed."""
+
+    def __init__(self):
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self._fd = self._libc.inotify_init1(_IN_NONBLOCK | _IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._folders: dict[int, Path] = {}
+
+    def add_watch(self, folder: Path) -> None:
+        wd = self._libc.inotify_add_watch(
+            self._fd, os.fsencode(folder), ctypes.c_uint32(_WATCH_MASK)
+        )
+        if wd < 0:
+            raise OSError(ctypes.get_errno(), f"inotify_add_watch failed: {folder}")
+        self._folders[wd] = folder
+
+    def read(self, timeout: float | None) -> tuple[set[Path], set[Path]] | None:
+        """
+        Wait up to ``timeout`` seconds for events.
+
+        Returns the changed paths and the folders created, or None if events
+        were lost (queue overflow) and the caller must rescan.
+        """
+        changed, created = set(), set()
+        readable, _, _ = select.select([self._fd], [], [], timeout)
+        if not readable:
+            return changed, created
+
+        while True:
+            try:
+                data = os.read(self._fd, 64 * 1024)
+            except BlockingIOError:
+                return changed, created
+            offset = 0
+            while offset < len(data):
+                wd, mask, _cookie, length = _EVENT_HEADER.unpack_from(data, offset)
+                offset += _EVENT_HEADER.size
+                name = data[offset : offset + length].rstrip(b"\0")
+                offset += length
+                if mask & _IN_Q_OVERFLOW:
+                    return None
+                folder = self._folders.get(wd)
+                if folder is None or not name:
+                    continue
+                path = folder / os.fsdecode(name)
+                if mask & _IN_ISDIR:
+                    if mask & (_IN_CREATE | _IN_MOVED_TO):
+                        created.add(path)
+                else:
+                    changed.add(path)
+
+    def close(self) -> None:
+        os.close(self._fd)
+
+
+def _open_inotify() -> _Inotify | None:
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        return _Inotify()
+    except (OSError, AttributeError) as e:
+        _logger.debug("inotify not available, polling: %s", e)
+        return None
+
+
+def watch_files(
+    folder: Path,
+    recursive: bool = False,
+    include: Iterable[str] = (),
+    exclude: Iterable[str] = (),
+    skip_dirs: Iterable[Path] = (),
+    settle: float = 2.0,
+    poll_interval: float = 5.0,
+) -> Iterator[list[SourceFile]]:
+    """
+    Yield batches of files of ``folder`` as they become ready, forever.
+
+    The first batch holds the files already in the folder. A file is yielded
+    again only if it changes later (e.g. it was skipped and then replaced).
+
+    Args:
+        folder, recursive, include, exclude, skip_dirs: As in scan_files
+        settle: Seconds a file's size and mtime must stay the same before it
+            is considered complete
+        poll_interval: Seconds between rescans when inotify is not available
+    """
+    include, exclude, skip_dirs = list(include), list(exclude), list(skip_dirs)
+    include_re = compile_globs(include)
+    exclude_re = compile_globs(exclude)
+    skip = {os.path.normcase(os.path.abspath(d)) for d in skip_dirs}
+
+    def scan(start: Path) -> Iterator[SourceFile]:
+        return scan_files(start, recursive, include, exclude, skip_dirs)
+
+    def excluded(relative: str) -> bool:
+        # Like scan_files: the name of the entry or of any folder above it
+        return bool(
+            exclude_re
+            and (
+                exclude_re.match(relative)
+                or any(map(exclude_re.match, relative.split("/")))
+            )
+        )
+
+    def accepted(path: Path) -> bool:
+        relative = path.relative_to(folder).as_posix()
+        if excluded(relative):
+            return False
+        if include_re and not (
+            include_re.match(path.name) or include_re.match(relative)
+        ):
+            return False
+        return True
+
+    def watched_dir(path: Path) -> bool:
+        return (
+            recursive
+            and os.path.normcase(os.path.abspath(path)) not in skip
+            and not excluded(path.relative_to(folder).as_posix())
+        )
+
+    # Files waiting to settle: last size/mtime seen and when they changed
+    pending: dict[Path, tuple[SourceFile, float]] = {}
+    # Files already yielded, with the size/mtime they had
+    reported: dict[Path, tuple[int, int]] = {}
+
+    def observe(source: SourceFile, since: float) -> None:
+        key = (source.size, source.mtime_ns)
+        if reported.get(source.path) == key:
+            return
+        previous = pending.get(source.path)
+        if previous is None or (previous[0].size, previous[0].mtime_ns) != key:
+            pending[source.path] = (source, since)
+
+    def observe_path(path: Path) -> None:
+        try:
+            stat = path.stat()
+        except OSError:
+            stat = None
+        if stat is None or not S_ISREG(stat.st_mode):
+            # Gone, most likely moved by the caller
+            pending.pop(path, None)
+            reported.pop(path, None)
+            return
+        observe(SourceFile(path, stat.st_size, stat.st_mtime_ns), time.monotonic())
+
+    def watch_tree(notifier: _Inotify, start: Path) -> None:
+        notifier.add_watch(start)
+        if not recursive:
+            return
+        for root, dirs, _files in os.walk(start):
+            dirs[:] = [d for d in dirs if watched_dir(Path(root) / d)]
+            for d in dirs:
+                notifier.add_watch(Path(root) / d)
+
+    def rescan() -> None:
+        now = time.monotonic()
+        seen = set()
+        for source in scan(folder):
+            seen.add(source.path)
+            observe(source, now)
+        for path in list(pending.keys() - seen):
+            del pending[path]
+        for path in list(reported.keys() - seen):
+            del reported[path]
+
+    notifier = _open_inotify()
+    try:
+        if notifier is not None:
+            watch_tree(notifier, folder)
+    except OSError as e:
+        # e.g. the limit of inotify watches was reached
+        _logger.warning("No se puede vigilar con inotify, se usará sondeo: %s", e)
+        notifier.close()
+        notifier = None
+
+    try:
+        # Files older than the settling time were complete before we started
+        now, wall_now = time.monotonic(), time.time()
+        for source in scan(folder):
+            age = wall_now - source.mtime_ns / 1e9
+            observe(source, now - settle if age >= settle else now)
+
+        while True:
+            now = time.monotonic()
+            ready = []
+            for path, (source, since) in list(pending.items()):
+                if now - since < settle:
+                    continue
+                observe_path(path)  # last check: unchanged since?
+                current = pending.get(path)
+                if current is not None and current[1] == since:
+                    del pending[path]
+                    reported[path] = (source.size, source.mtime_ns)
+                    ready.append(source)
+            if ready:
+                yield ready
+                continue
+
+            waits = [since + settle - now for _, since in pending.values()]
+            timeout = max(0.05, min(waits)) if waits else None
+
+            if notifier is None:
+                time.sleep(min(timeout or poll_interval, poll_interval))
+                rescan()
+                continue
+
+            events = notifier.read(timeout)
+            if events is None:
+                _logger.debug("inotify queue overflow, rescanning %s", folder)
+                rescan()
+                continue
+            changed, created = events
+            for path in changed:
+                if accepted(path):
+                    observe_path(path)
+            for path in created:
+                if watched_dir(path):
+                    try:
+                        watch_tree(notifier, path)
+                    except OSError as e:
+                        _logger.warning("No se puede vigilar %s: %s", path, e)
+                    # Files may have been written before the watch existed
+                    for source in scan(path):
+                        observe(source, time.monotonic())
+    finally:
+        if notifier is not None:
+            notifier.close()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+# /// script
+# requires-python = ">=3.12"
+# dependencies = []
+# ///
+"""
+This script deletes the empty folders of the picture archive (or any other
+folder), e.g. those left behind after moving or organizing pictures.
+
+Folders holding only the settings files of Picasa or Windows (.picasa.ini,
+desktop.ini, Thumbs.db) are empty too. A folder whose subfolders are all empty
+is deleted in the same run.
+"""
+
+import argparse
+import logging
+from pathlib import Path
+
+from papa_toolkit.metrics import Metrics
+from papa_toolkit.prune import prune_tree
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(levelname)s - %(message)s",
+    datefmt="%H:%M:%S",
+)
+_logger = logging.getLogger(__name__)
+
+
+def _print_banner():
+    """Print a nice banner for the application"""
+    print("=" * 70)
+    print("  🧹 BORRADO DE CARPETAS VACÍAS - PAPA TOOLKIT 📁")
+    print("=" * 70)
+    print()
+
+
+def main() -> None:
+    # Print banner first
+    _print_banner()
+
+    parser = argparse.ArgumentParser(
+        description="Borra las carpetas vacías (o con solo .picasa.ini o "
+        "desktop.ini) de una carpeta."
+    )
+    parser.add_argument(
+        "folder",
+        type=Path,
+        help="Carpeta en la que buscar carpetas vacías (ella misma no se borra)",
+    )
+    parser.add_argument(
+        "-n",
+        "--dry-run",
+        action="store_true",
+        help="Modo simulación (solo mostrar las carpetas que se borrarían)",
+    )
+    parser.add_argument(
+        "-v",
+        "--verbose",
+        action="store_true",
+        help="Mostrar información detallada durante el proceso",
+    )
+    args = parser.parse_args()
+
+    # Set logging level based on verbose flag
+    if args.verbose:
+        logging.getLogger().setLevel(logging.DEBUG)
+
+    folder = args.folder
+    if not folder.is_dir():
+        print(f"❌ Error: La carpeta no existe: {folder}")
+        return
+
+    print(f"📂 Carpeta: {folder}")
+    if args.dry_run:
+        print("🔍 Modo simulación activado")
+    print()
+
+    metrics = Metrics()
+    try:
+        with metrics.phase("prune"):
+            removed = prune_tree(folder, args.dry_run)
+    except KeyboardInterrupt:
+        print("\n⏹️  Proceso interrumpido por el usuario.")
+        return
+    metrics.add_items(len(removed))
+    metrics.stop()
+
+    for path in removed:
+        _logger.debug("Carpeta vacía: %s", path)
+    if args.dry_run:
+        print(f"🔍 Se borrarían {len(removed)} carpetas vacías.")
+    else:
+        print(f"🧹 Carpetas vacías borradas: {len(removed)}")
+    for line in metrics.summary_lines("carpetas"):
+        print(line)
+    print()
+    print("✅ ¡Proceso completado exitosamente!")
+    print()
+
+
+if __name__ == "__main__":
+    main()
@@ -9,12 +9,8 @@ set SOURCE_FOLDER=C:\Users\%USERNAME%\Dropbox\Camera Uploads
 set IMAGE_DEST=C:\Users\%USERNAME%\Pictures\Organized
 set VIDEO_DEST=C:\Users\%USERNAME%\Videos\Organized
 
-echo Procesando imagenes...
-python image_syncer.py "%SOURCE_FOLDER%" "%IMAGE_DEST%" -t image
-
-echo.
-echo Procesando videos...
-python image_syncer.py "%SOURCE_FOLDER%" "%VIDEO_DEST%" -t video --year-folders
+rem A single pass sends images and videos to their own folders
+python image_syncer.py "%SOURCE_FOLDER%" --route "image=%IMAGE_DEST%" --route "video=%VIDEO_DEST%:YYYY/YYYY-MM-DD" --resume
 
 echo.
 echo Proceso completado!
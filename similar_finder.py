@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+# /// script
+# requires-python = ">=3.12"
+# dependencies = [
+#     "numpy",
+#     "pillow",
+#     "send2trash",
+# ]
+# ///
+"""
+This script finds pictures that look the same although they are not identical
+files, e.g. the copies of a photo recompressed by WhatsApp or resized by
+Dropbox. Each group keeps the picture with the highest resolution and the
+others are listed, or sent to the recycle bin with --trash. As pictures are
+compared by how they look, the copies found should be reviewed before that.
+
+Identical files are found faster by duplicate_finder.py.
+"""
+
+import argparse
+import logging
+from pathlib import Path
+
+from papa_toolkit.metadata_cache import MetadataCache, default_cache_path
+from papa_toolkit.metrics import Metrics, format_size
+from papa_toolkit.perceptual import DEFAULT_MAX_DISTANCE, find_similar
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(levelname)s - %(message)s",
+    datefmt="%H:%M:%S",
+)
+_logger = logging.getLogger(__name__)
+
+
+def _print_banner():
+    """Print a nice banner for the application"""
+    print("=" * 70)
+    print("  🖼️  BUSCADOR DE FOTOS REPETIDAS - PAPA TOOLKIT 🗑️")
+    print("=" * 70)
+    print()
+
+
+def _print_summary(stats, metrics: Metrics | None = None):
+    """Print a summary of the operation"""
+    print("\n" + "=" * 50)
+    print("  📊 RESUMEN DEL PROCESO")
+    print("=" * 50)
+    print(f"  Grupos de fotos repetidas: {stats['groups']}")
+    print(f"  Fotos repetidas: {stats['similar']}")
+    print(f"  Espacio recuperable: {format_size(stats['bytes'])}")
+    print(f"  Enviadas a la papelera: {stats['trashed']}")
+    print(f"  Errores: {stats['errors']}")
+    if stats["dry_run"]:
+        print("  🔍 Solo listado - Use --trash para enviarlas a la papelera")
+    if metrics is not None:
+        print("-" * 50)
+        for line in metrics.summary_lines("fotos"):
+            print(line)
+    print("=" * 50)
+    print()
+
+
+def remove_similar(
+    folders: list[Path],
+    dry_run: bool = True,
+    workers: int = 4,
+    max_distance: int = DEFAULT_MAX_DISTANCE,
+    cache: MetadataCache | None = None,
+) -> None:
+    """
+    Find pictures that look the same below ``folders`` and list the extra
+    copies, or send them to the trash.
+
+    Args:
+        folders: Folders to search, copies are also found across them
+        dry_run: If True (the default), only list the copies
+        workers: Number of processes decoding pictures
+        max_distance: Bits that may differ between the hashes of two copies
+        cache: Optional metadata cache where the hashes are kept
+    """
+    stats = {
+        "groups": 0,
+        "similar": 0,
+        "bytes": 0,
+        "trashed": 0,
+        "errors": 0,
+        "dry_run": dry_run,
+    }
+    metrics = Metrics()
+
+    if not dry_run:
+        # Optional dependency, only needed to actually remove files
+        from send2trash import send2trash
+
+    print("🔍 Calculando el hash de las fotos y comparándolas...")
+    groups = find_similar(folders, workers, max_distance, cache, metrics=metrics)
+
+    if not groups:
+        print("✅ No se encontraron fotos repetidas.")
+        return
+
+    for group in sorted(groups, key=lambda g: g.paths[0]):
+        original, *copies = group.paths
+        stats["groups"] += 1
+        stats["similar"] += len(copies)
+
+        print(f"\n  ✔ {original}")
+        for copy in copies:
+            print(f"    ✖ {copy}")
+            try:
+                stats["bytes"] += copy.stat().st_size
+                if not dry_run:
+                    send2trash(copy)
+                    stats["trashed"] += 1
+            except OSError as e:
+                stats["errors"] += 1
+                _logger.error("Error borrando '%s': %s", copy, e)
+
+    metrics.stop()
+    _print_summary(stats, metrics)
+
+
+def main() -> None:
+    # Print banner first
+    _print_banner()
+
+    parser = argparse.ArgumentParser(
+        description="Busca fotos que se ven iguales aunque no sean el mismo archivo "
+        "y lista las copias (o las envía a la papelera con --trash)."
+    )
+    parser.add_argument(
+        "folders",
+        type=Path,
+        nargs="+",
+        help="Carpetas donde buscar fotos repetidas (se incluyen las subcarpetas)",
+    )
+    parser.add_argument(
+        "--trash",
+        action="store_true",
+        help="Enviar las copias a la papelera en lugar de solo listarlas "
+        "(revise antes la lista: las fotos se comparan por su aspecto)",
+    )
+    parser.add_argument(
+        "-w",
+        "--workers",
+        type=int,
+        default=4,
+        help="Número de procesos leyendo fotos en paralelo (por defecto: %(default)s)",
+    )
+    parser.add_argument(
+        "--max-distance",
+        type=int,
+        default=DEFAULT_MAX_DISTANCE,
+        help="Bits (de 64) en que pueden diferir dos fotos para darlas por iguales; "
+        "más bits encuentran más copias pero también fotos solo parecidas "
+        "(por defecto: %(default)s)",
+    )
+    parser.add_argument(
+        "--cache",
+        type=Path,
+        default=default_cache_path(),
+        help="Base de datos donde se guardan los hashes ya calculados (por defecto: %(default)s)",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="No usar la caché de metadatos",
+    )
+    parser.add_argument(
+        "-v",
+        "--verbose",
+        action="store_true",
+        help="Mostrar información detallada durante el proceso",
+    )
+    args = parser.parse_args()
+
+    # Set logging level based on verbose flag
+    if args.verbose:
+        logging.getLogger().setLevel(logging.DEBUG)
+
+    for folder in args.folders:
+        if not folder.is_dir():
+            print(f"❌ Error: La carpeta no existe: {folder}")
+            return
+
+    if args.trash:
+        print("🗑️  Las copias encontradas se enviarán a la papelera")
+        print()
+
+    cache = None if args.no_cache else MetadataCache(args.cache)
+    try:
+        remove_similar(
+            args.folders,
+            not args.trash,
+            max(1, args.workers),
+            max(0, args.max_distance),
+            cache,
+        )
+    except KeyboardInterrupt:
+        print("\n⏹️  Proceso interrumpido por el usuario.")
+    except ImportError:
+        print("❌ Error: Instale send2trash para poder borrar las fotos repetidas.")
+    except OSError as e:
+        print(f"\n❌ Error inesperado: {e}")
+        if args.verbose:
+            _logger.error("Error detallado: %s", e, exc_info=True)
+    finally:
+        if cache is not None:
+            cache.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+import os
+
+from papa_toolkit.archive_index import INDEX_FILENAME, ArchiveIndex
+from papa_toolkit.hashing import EDGE_SIZE
+
+# Larger than the two edges of a partial hash: the full hash is needed
+_LARGE = 3 * EDGE_SIZE
+
+
+def _archive(tmp_path, files: dict[str, bytes]):
+    root = tmp_path / "archive"
+    root.mkdir()
+    for relpath, content in files.items():
+        path = root / relpath
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(content)
+    return root
+
+
+def _file(tmp_path, name: str, content: bytes):
+    path = tmp_path / name
+    path.write_bytes(content)
+    return path
+
+
+def test_lookup(tmp_path):
+    large = b"a" * _LARGE
+    # Same size and edges, different middle
+    other = large[:EDGE_SIZE] + b"b" * EDGE_SIZE + large[2 * EDGE_SIZE :]
+    root = _archive(tmp_path, {"2023/a.jpg": large, "2023/s.jpg": b"small"})
+    with ArchiveIndex(root) as index:
+        assert index.rebuild() == 2
+
+        assert index.lookup(_file(tmp_path, "1.jpg", large), _LARGE).relpath == (
+            "2023/a.jpg"
+        )
+        assert index.lookup(_file(tmp_path, "2.jpg", other), _LARGE).relpath is None
+        assert index.lookup(_file(tmp_path, "3.jpg", b"small"), 5).relpath == (
+            "2023/s.jpg"
+        )
+        assert index.lookup(_file(tmp_path, "4.jpg", b"other"), 5).relpath is None
+
+
+def test_index_is_kept_between_runs(tmp_path):
+    root = _archive(tmp_path, {"a.jpg": b"a"})
+    with ArchiveIndex(root) as index:
+        index.rebuild()
+        path = root / "b.jpg"
+        path.write_bytes(b"b")
+        stat = path.stat()
+        index.add(path, stat.st_size, stat.st_mtime_ns)
+
+    assert (root / INDEX_FILENAME).exists()
+    with ArchiveIndex(root) as index:
+        assert len(index) == 2
+        assert index.lookup(_file(tmp_path, "b.jpg", b"b"), 1).relpath == "b.jpg"
+
+
+def test_missing_and_modified_files(tmp_path):
+    root = _archive(tmp_path, {"a.jpg": b"a", "b.jpg": b"b"})
+    with ArchiveIndex(root) as index:
+        index.rebuild()
+        (root / "a.jpg").unlink()
+        (root / "b.jpg").write_bytes(b"c")
+        os.utime(root / "b.jpg", ns=(0, 10**18))
+
+        assert index.lookup(_file(tmp_path, "a.jpg", b"a"), 1).relpath is None
+        assert index.lookup(_file(tmp_path, "b.jpg", b"b"), 1).relpath is None
+        assert index.lookup(_file(tmp_path, "c.jpg", b"c"), 1).relpath == "b.jpg"
+        assert len(index) == 1
+
+
+def test_reserved_files(tmp_path):
+    root = _archive(tmp_path, {})
+    source = _file(tmp_path, "a.jpg", b"a" * _LARGE)
+    with ArchiveIndex(root) as index:
+        index.reserve(root / "2023" / "a.jpg", _LARGE, source)
+
+        copy = _file(tmp_path, "copy.jpg", b"a" * _LARGE)
+        assert index.lookup(copy, _LARGE).relpath == "2023/a.jpg"
+
+        index.release(root / "2023" / "a.jpg")
+        assert index.lookup(copy, _LARGE).relpath is None
+        assert len(index) == 0
+
+
+def test_read_only_index_is_not_saved(tmp_path):
+    root = _archive(tmp_path, {"a.jpg": b"a"})
+    with ArchiveIndex(root) as index:
+        index.rebuild()
+
+    with ArchiveIndex(root, read_only=True) as index:
+        assert len(index) == 1
+        index.remove(root / "a.jpg")
+        assert len(index) == 0
+
+    with ArchiveIndex(root) as index:
+        assert len(index) == 1
@@ -0,0 +1,196 @@
+import struct
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from papa_toolkit.exif_reader import ExifError, read_exif_datetime
+from papa_toolkit.media_types import detect_media_type
+
+_ASCII = 2
+_LONG = 4
+
+
+def _tiff(date: str | None, endian: str = "<", offset=None, subsec=None) -> bytes:
+    """TIFF structure with an IFD0 pointing to an Exif IFD holding the dates."""
+    tags = []
+    if date is not None:
+        tags.append((0x9003, date))
+    if offset is not None:
+        tags.append((0x9011, offset))
+    if subsec is not None:
+        tags.append((0x9291, subsec))
+
+    exif_ifd_offset = 8 + 2 + 12 + 4
+    data_offset = exif_ifd_offset + 2 + 12 * len(tags) + 4
+    entries, data = b"", b""
+    for tag, text in tags:
+        value = text.encode("ascii") + b"\0"
+        if len(value) <= 4:
+            inline = value.ljust(4, b"\0")
+        else:
+            # Values longer than 4 bytes are stored after the IFD
+            inline = struct.pack(endian + "I", data_offset + len(data))
+            data += value
+        entries += struct.pack(endian + "HHI", tag, _ASCII, len(value)) + inline
+
+    byte_order = b"II" if endian == "<" else b"MM"
+    return (
+        byte_order
+        + struct.pack(endian + "HI", 42, 8)
+        + struct.pack(endian + "H", 1)
+        + struct.pack(endian + "HHII", 0x8769, _LONG, 1, exif_ifd_offset)
+        + struct.pack(endian + "I", 0)
+        + struct.pack(endian + "H", len(tags))
+        + entries
+        + struct.pack(endian + "I", 0)
+        + data
+    )
+
+
+def _jpeg(tiff: bytes) -> bytes:
+    app0 = b"JFIF\0" + b"\x01\x01\0\0\x01\0\x01\0\0"
+    app1 = b"Exif\0\0" + tiff
+    return (
+        b"\xff\xd8"
+        + b"\xff\xe0"
+        + struct.pack(">H", len(app0) + 2)
+        + app0
+        + b"\xff"  # fill byte before the next marker
+        + b"\xff\xe1"
+        + struct.pack(">H", len(app1) + 2)
+        + app1
+        + b"\xff\xda\x00\x02"
+        + b"\0" * 16
+        + b"\xff\xd9"
+    )
+
+
+def _png(tiff: bytes) -> bytes:
+    def chunk(chunk_type: bytes, data: bytes) -> bytes:
+        return struct.pack(">I", len(data)) + chunk_type + data + b"\0\0\0\0"
+
+    return (
+        b"\x89PNG\r\n\x1a\n"
+        + chunk(b"IHDR", struct.pack(">IIBBBBB", 1, 1, 8, 2, 0, 0, 0))
+        + chunk(b"eXIf", tiff)
+        + chunk(b"IDAT", b"\0" * 8)
+        + chunk(b"IEND", b"")
+    )
+
+
+def _box(box_type: bytes, payload: bytes) -> bytes:
+    return struct.pack(">I", 8 + len(payload)) + box_type + payload
+
+
+def _full_box(box_type: bytes, payload: bytes, version: int = 0) -> bytes:
+    return _box(box_type, bytes([version, 0, 0, 0]) + payload)
+
+
+def _heic(tiff: bytes, brand: bytes = b"heic") -> bytes:
+    """HEIF file whose Exif item is found through its iinf and iloc boxes."""
+    ftyp = _box(b"ftyp", brand + b"\0\0\0\0" + b"mif1" + brand)
+    exif_item = struct.pack(">I", 6) + b"Exif\0\0" + tiff
+
+    def infe(item_id: int, item_type: bytes) -> bytes:
+        return _full_box(
+            b"infe", struct.pack(">HH", item_id, 0) + item_type + b"\0", version=2
+        )
+
+    iinf = _full_box(
+        b"iinf", struct.pack(">H", 2) + infe(1, b"hvc1") + infe(2, b"Exif")
+    )
+
+    def iloc(exif_offset: int) -> bytes:
+        # Version 1: 4 byte offsets and lengths, no base offset nor index
+        items = [
+            (1, exif_offset + len(exif_item), 10),
+            (2, exif_offset, len(exif_item)),
+        ]
+        payload = bytes([0x44, 0x00]) + struct.pack(">H", len(items))
+        for item_id, offset, length in items:
+            payload += struct.pack(">HHHH", item_id, 0, 0, 1)
+            payload += struct.pack(">II", offset, length)
+        return _full_box(b"iloc", payload, version=1)
+
+    hdlr = _full_box(b"hdlr", b"\0\0\0\0pict" + b"\0" * 13)
+
+    def meta(exif_offset: int) -> bytes:
+        return _full_box(b"meta", hdlr + iinf + iloc(exif_offset))
+
+    # The mdat payload follows ftyp, meta and the mdat header
+    exif_offset = len(ftyp) + len(meta(0)) + 8
+    return ftyp + meta(exif_offset) + _box(b"mdat", exif_item + b"\0" * 10)
+
+
+@pytest.mark.parametrize("endian", ["<", ">"])
+def test_jpeg_date_stored_at_offset(tmp_path, endian):
+    path = tmp_path / "a.jpg"
+    path.write_bytes(_jpeg(_tiff("2023:05:01 10:20:30", endian)))
+
+    assert detect_media_type(path) == "jpeg"
+    assert read_exif_datetime(path, "jpeg") == datetime(2023, 5, 1, 10, 20, 30)
+
+
+def test_offset_and_subsec(tmp_path):
+    path = tmp_path / "a.jpg"
+    path.write_bytes(_jpeg(_tiff("2023:05:01 10:20:30", offset="-03:30", subsec="25")))
+
+    tz = timezone(-timedelta(hours=3, minutes=30))
+    assert read_exif_datetime(path, "jpeg") == datetime(
+        2023, 5, 1, 10, 20, 30, 250000, tzinfo=tz
+    )
+
+
+@pytest.mark.parametrize("date", [None, "0000:00:00 00:00:00", "    "])
+def test_missing_date(tmp_path, date):
+    path = tmp_path / "a.jpg"
+    path.write_bytes(_jpeg(_tiff(date)))
+
+    assert read_exif_datetime(path, "jpeg") is None
+
+
+def test_jpeg_without_exif(tmp_path):
+    path = tmp_path / "a.jpg"
+    path.write_bytes(b"\xff\xd8\xff\xda\x00\x02" + b"\0" * 16 + b"\xff\xd9")
+
+    assert read_exif_datetime(path, "jpeg") is None
+
+
+def test_truncated_jpeg(tmp_path):
+    path = tmp_path / "a.jpg"
+    path.write_bytes(_jpeg(_tiff("2023:05:01 10:20:30"))[:40])
+
+    with pytest.raises(ExifError):
+        read_exif_datetime(path, "jpeg")
+
+
+def test_png(tmp_path):
+    path = tmp_path / "a.png"
+    path.write_bytes(_png(_tiff("2023:05:01 10:20:30", ">")))
+
+    assert detect_media_type(path) == "png"
+    assert read_exif_datetime(path, "png") == datetime(2023, 5, 1, 10, 20, 30)
+
+
+@pytest.mark.parametrize("media_type, brand", [("heic", b"heic"), ("avif", b"avif")])
+def test_heif_item_location(tmp_path, media_type, brand):
+    path = tmp_path / "a.heic"
+    path.write_bytes(_heic(_tiff("2023:05:01 10:20:30", ">"), brand))
+
+    assert detect_media_type(path) == media_type
+    assert read_exif_datetime(path, media_type) == datetime(2023, 5, 1, 10, 20, 30)
+
+
+def test_tiff(tmp_path):
+    path = tmp_path / "a.tif"
+    path.write_bytes(_tiff("2023:05:01 10:20:30"))
+
+    assert read_exif_datetime(path, "tiff") == datetime(2023, 5, 1, 10, 20, 30)
+
+
+def test_unsupported_media_type(tmp_path):
+    path = tmp_path / "a.gif"
+    path.write_bytes(b"GIF89a")
+
+    with pytest.raises(ExifError):
+        read_exif_datetime(path, "gif")
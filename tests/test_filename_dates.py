@@ -0,0 +1,64 @@
+from datetime import datetime
+
+import pytest
+
+from papa_toolkit.filename_dates import (
+    FilenameDateParser,
+    FilenamePattern,
+    parse_filename_date,
+    parse_filename_dates,
+)
+
+
+@pytest.mark.parametrize(
+    "name, expected",
+    [
+        ("IMG_20230101_101112.jpg", datetime(2023, 1, 1, 10, 11, 12)),
+        ("PXL_20240512_101112345.jpg", datetime(2024, 5, 12, 10, 11, 12)),
+        ("Screenshot_2024-01-01-10-00-00.png", datetime(2024, 1, 1, 10, 0, 0)),
+        ("signal-2024-01-01-100000.jpg", datetime(2024, 1, 1, 10, 0, 0)),
+        ("2024-05-12 10.11.12.jpg", datetime(2024, 5, 12, 10, 11, 12)),
+        ("IMG-20230101-WA0001.jpg", datetime(2023, 1, 1)),
+        ("cumple 2023-05-01.jpg", datetime(2023, 5, 1)),
+        ("scan_20230501.jpg", datetime(2023, 5, 1)),
+        # An invalid time keeps the date
+        ("IMG_20230101_999999.jpg", datetime(2023, 1, 1)),
+        ("VID_20230101_256000.mp4", datetime(2023, 1, 1)),
+    ],
+)
+def test_parse(name, expected):
+    assert parse_filename_date(name) == expected
+
+
+@pytest.mark.parametrize(
+    "name",
+    [
+        "IMG_0001.jpg",
+        "IMG_20231301_101112.jpg",  # month 13
+        "2023-02-30.jpg",
+        "scan_19800101.jpg",  # before min_year of compact dates
+        "123456789.jpg",  # part of a longer number
+    ],
+)
+def test_no_date(name):
+    assert parse_filename_date(name) is None
+
+
+def test_implausible_match_is_skipped():
+    assert parse_filename_date("20231301_2023-05-01.jpg") == datetime(2023, 5, 1)
+
+
+def test_parse_many():
+    assert parse_filename_dates(["IMG_0001.jpg", "2023-05-01.jpg"]) == {
+        "IMG_0001.jpg": None,
+        "2023-05-01.jpg": datetime(2023, 5, 1),
+    }
+
+
+def test_register():
+    parser = FilenameDateParser([]).register(
+        FilenamePattern("custom", r"foto\d{8}_\d{6}", has_time=True)
+    )
+
+    assert parser.parse("foto20230501_102030.jpg") == datetime(2023, 5, 1, 10, 20, 30)
+    assert parser.parse("IMG_20230501_102030.jpg") is None
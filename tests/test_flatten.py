@@ -0,0 +1,69 @@
+from pathlib import Path
+
+from papa_toolkit.flatten import apply_flatten, plan_flatten
+
+
+def _write(folder: Path, files: dict[str, str]) -> None:
+    for name, content in files.items():
+        path = folder / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content)
+
+
+def _contents(folder: Path) -> dict[str, str]:
+    return {
+        path.relative_to(folder).as_posix(): path.read_text()
+        for path in folder.rglob("*")
+        if path.is_file()
+    }
+
+
+def test_flatten(tmp_path):
+    source = tmp_path / "source"
+    _write(
+        source,
+        {
+            "a/IMG_0001.jpg": "1",
+            "b/IMG_0001.jpg": "2",
+            "b/c/IMG_0002.jpg": "3",
+            "c/copy.jpg": "3",
+            "desktop.ini": "x",
+        },
+    )
+    destination = source / "flat"
+
+    plan = plan_flatten(source, destination, exclude={"*.ini"})
+    assert plan.renamed == 1
+    assert plan.dropped == [(source / "c" / "copy.jpg", destination / "IMG_0002.jpg")]
+
+    result = apply_flatten(plan, destination)
+
+    assert (result.moved, result.dropped, result.errors) == (3, 1, [])
+    assert _contents(destination) == {
+        "IMG_0001.jpg": "1",
+        "IMG_0001 (1).jpg": "2",
+        "IMG_0002.jpg": "3",
+    }
+    # Excluded files stay where they are
+    assert (source / "desktop.ini").exists()
+
+
+def test_files_already_flat_are_kept(tmp_path):
+    source = tmp_path / "source"
+    _write(source, {"flat/a.jpg": "a", "sub/a.jpg": "a", "sub/b.jpg": "b"})
+    destination = source / "flat"
+
+    apply_flatten(plan_flatten(source, destination), destination)
+
+    assert _contents(destination) == {"a.jpg": "a", "b.jpg": "b"}
+    assert not (source / "sub" / "a.jpg").exists()
+
+
+def test_thumbnails_are_not_flattened(tmp_path):
+    source = tmp_path / "source"
+    _write(source, {"day/a.jpg": "a", "day/.thumbnails/a.jpg": "t"})
+    destination = tmp_path / "flat"
+
+    plan = plan_flatten(source, destination)
+
+    assert plan.moves == [(source / "day" / "a.jpg", destination / "a.jpg")]
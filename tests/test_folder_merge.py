@@ -0,0 +1,78 @@
+from pathlib import Path
+
+from papa_toolkit.folder_merge import merge_folder
+
+
+def _write(folder: Path, files: dict[str, str]) -> None:
+    for name, content in files.items():
+        path = folder / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content)
+
+
+def _contents(folder: Path) -> dict[str, str]:
+    return {
+        path.relative_to(folder).as_posix(): path.read_text()
+        for path in folder.rglob("*")
+        if path.is_file()
+    }
+
+
+def test_merge(tmp_path):
+    source, destination = tmp_path / "a" / "2023-05-01", tmp_path / "2023-05-01"
+    _write(source, {"same.jpg": "x", "other.jpg": "new", "new.jpg": "n"})
+    _write(source / "sub", {"s.jpg": "s"})
+    _write(destination, {"same.jpg": "x", "other.jpg": "old"})
+
+    result = merge_folder(source, destination)
+
+    assert _contents(destination) == {
+        "same.jpg": "x",
+        "other.jpg": "old",
+        "other (1).jpg": "new",
+        "new.jpg": "n",
+        "sub/s.jpg": "s",
+    }
+    assert not source.exists()
+    assert result.dropped == [source / "same.jpg"]
+    assert result.renamed == [destination / "other (1).jpg"]
+    assert result.moved_dirs == [(source / "sub", destination / "sub")]
+
+
+def test_dry_run_changes_nothing(tmp_path):
+    source, destination = tmp_path / "a" / "2023-05-01", tmp_path / "2023-05-01"
+    _write(source, {"same.jpg": "x", "other.jpg": "new"})
+    _write(destination, {"same.jpg": "x", "other.jpg": "old"})
+
+    result = merge_folder(source, destination, dry_run=True)
+
+    assert _contents(source) == {"same.jpg": "x", "other.jpg": "new"}
+    assert _contents(destination) == {"same.jpg": "x", "other.jpg": "old"}
+    assert result.renamed == [destination / "other (1).jpg"]
+
+
+def test_settings_files_are_not_renamed(tmp_path):
+    source, destination = tmp_path / "a" / "2023-05-01", tmp_path / "2023-05-01"
+    _write(source, {".picasa.ini": "[a.jpg]", "Thumbs.db": "1", "desktop.ini": "d"})
+    _write(destination, {".picasa.ini": "[b.jpg]", "Thumbs.db": "2"})
+
+    merge_folder(source, destination)
+
+    # Only desktop.ini, missing in the destination, is moved
+    assert _contents(destination) == {
+        ".picasa.ini": "[b.jpg]",
+        "Thumbs.db": "2",
+        "desktop.ini": "d",
+    }
+    assert not source.exists()
+
+
+def test_thumbnails_are_not_merged(tmp_path):
+    source, destination = tmp_path / "a" / "2023-05-01", tmp_path / "2023-05-01"
+    _write(source, {"a.jpg": "a", ".thumbnails/a.jpg": "t"})
+    _write(destination, {"b.jpg": "b"})
+
+    merge_folder(source, destination)
+
+    assert _contents(destination) == {"a.jpg": "a", "b.jpg": "b"}
+    assert not source.exists()
@@ -0,0 +1,155 @@
+from datetime import datetime
+
+import pytest
+
+import image_syncer
+from papa_toolkit.metadata_cache import MetadataCache
+from papa_toolkit.plan import read_plan
+from papa_toolkit.scanner import SourceFile
+
+# A JPEG without EXIF: read fine, the date comes from the name
+_JPEG = b"\xff\xd8\xff\xda\x00\x02" + b"\0" * 16 + b"\xff\xd9"
+
+
+@pytest.fixture
+def cache(tmp_path):
+    with MetadataCache(tmp_path / "cache.sqlite") as cache:
+        yield cache
+
+
+def _source(path) -> SourceFile:
+    stat = path.stat()
+    return SourceFile(path, stat.st_size, stat.st_mtime_ns)
+
+
+def _inspect(path, cache):
+    info = image_syncer._inspect_file(_source(path), None, cache, None, None)
+    cache.flush()
+    return info
+
+
+def test_inspect_file(tmp_path, cache):
+    path = tmp_path / "IMG_20230101_101112.jpg"
+    path.write_bytes(_JPEG)
+
+    info = _inspect(path, cache)
+
+    assert (info.media_type, info.kind) == ("jpeg", "image")
+    assert info.date_taken == datetime(2023, 1, 1, 10, 11, 12)
+    # No EXIF date is a result too: cached
+    assert cache.get(path, info.size, info.mtime_ns) == ("jpeg", None)
+
+
+def test_unreadable_file_is_not_cached(tmp_path, cache, monkeypatch):
+    path = tmp_path / "IMG_20230101_101112.jpg"
+    path.write_bytes(_JPEG)
+
+    def locked(path):
+        raise PermissionError("locked by the sync client")
+
+    monkeypatch.setattr(image_syncer, "detect_media_type", locked)
+    assert _inspect(path, cache).kind is None
+    monkeypatch.undo()
+
+    assert cache.get(path, len(_JPEG), path.stat().st_mtime_ns) is None
+    assert _inspect(path, cache).kind == "image"
+
+
+class _FakeFFprobe:
+    def __init__(self, result):
+        self.result = result
+
+    def probe_creation_date(self, path):
+        if isinstance(self.result, Exception):
+            raise self.result
+        return self.result
+
+
+@pytest.mark.parametrize(
+    "ffprobe", [None, _FakeFFprobe(TimeoutError("ffprobe did not finish"))]
+)
+def test_failed_date_read_is_retried(tmp_path, cache, ffprobe):
+    path = tmp_path / "clip.avi"
+    path.write_bytes(b"RIFF\0\0\0\0AVI " + b"\0" * 16)
+    source = _source(path)
+
+    info = image_syncer._inspect_file(source, None, cache, ffprobe, None)
+    cache.flush()
+
+    assert (info.kind, info.date_taken) == ("video", None)
+    assert cache.get(path, source.size, source.mtime_ns) is None
+
+    # Once ffprobe works, e.g. ffmpeg was installed, the video gets its date
+    date = datetime(2023, 5, 1, 10, 20, 30)
+    info = image_syncer._inspect_file(source, None, cache, _FakeFFprobe(date), None)
+    cache.flush()
+
+    assert info.date_taken == date
+    assert cache.get(path, source.size, source.mtime_ns) == ("avi", date)
+
+
+def _organize(source, destination, **options):
+    image_syncer.organize_files(source, destination, False, cache=None, **options)
+
+
+def test_dry_run_plans_what_the_real_run_does(tmp_path):
+    source, destination = tmp_path / "source", tmp_path / "archive"
+    (destination / "2023-01-01").mkdir(parents=True)
+    (destination / "2023-01-01" / "IMG_20230101_101112.jpg").write_bytes(_JPEG)
+    source.mkdir()
+    # Already archived, new and a copy of the new one
+    (source / "IMG_20230101_101112.jpg").write_bytes(_JPEG)
+    (source / "IMG_20230102_101112.jpg").write_bytes(_JPEG + b"new")
+    (source / "IMG_20230102_101112 (copia).jpg").write_bytes(_JPEG + b"new")
+    plan_path = tmp_path / "plan.jsonl"
+
+    image_syncer.organize_files(
+        source, destination, True, cache=None, plan_out=plan_path
+    )
+    planned = {
+        entry.source.name: entry.destination
+        for entry in read_plan(plan_path, "image_syncer")
+    }
+    _organize(source, destination)
+
+    assert planned == {
+        "IMG_20230101_101112.jpg": None,
+        "IMG_20230102_101112 (copia).jpg": None,
+        "IMG_20230102_101112.jpg": (
+            destination / "2023-01-02" / "IMG_20230102_101112.jpg"
+        ).absolute(),
+    }
+    # Duplicates are left in the source
+    assert sorted(p.name for p in source.iterdir()) == [
+        "IMG_20230101_101112.jpg",
+        "IMG_20230102_101112 (copia).jpg",
+    ]
+    assert (destination / "2023-01-02" / "IMG_20230102_101112.jpg").exists()
+
+
+def test_apply_plan(tmp_path):
+    source, destination = tmp_path / "source", tmp_path / "archive"
+    (source / "a").mkdir(parents=True)
+    (source / "b").mkdir()
+    # Same name and date, different content
+    (source / "a" / "IMG_20230101_101112.jpg").write_bytes(_JPEG)
+    (source / "b" / "IMG_20230101_101112.jpg").write_bytes(_JPEG + b"b")
+    (source / "IMG_20230102_101112.jpg").write_bytes(_JPEG + b"c")
+    plan_path = tmp_path / "plan.jsonl"
+    image_syncer.organize_files(
+        source, destination, True, cache=None, recursive=True, plan_out=plan_path
+    )
+    plan = read_plan(plan_path, "image_syncer")
+    # Changed since the dry run: analyzed again
+    (source / "IMG_20230102_101112.jpg").write_bytes(_JPEG + b"changed")
+
+    _organize(source, destination, plan=plan)
+
+    assert sorted(p.name for p in (destination / "2023-01-01").iterdir()) == [
+        "IMG_20230101_101112 (1).jpg",
+        "IMG_20230101_101112.jpg",
+    ]
+    assert (destination / "2023-01-02" / "IMG_20230102_101112.jpg").read_bytes() == (
+        _JPEG + b"changed"
+    )
+    assert not any(path.is_file() for path in source.rglob("*"))
@@ -0,0 +1,131 @@
+from datetime import date
+from pathlib import Path
+
+import pytest
+
+from papa_toolkit.layout import (
+    FolderMove,
+    Layout,
+    _order_moves,
+    apply_relayout,
+    find_day_folders,
+    parse_day,
+    plan_relayout,
+)
+
+
+def _make_archive(root: Path, folders: list[str]) -> None:
+    for folder in folders:
+        (root / folder).mkdir(parents=True)
+        (root / folder / "photo.jpg").write_text(folder)
+
+
+def _archive_contents(root: Path) -> dict[str, str]:
+    """Relative path of every file -> its content (the folder it was made in)."""
+    return {
+        path.relative_to(root).as_posix(): path.read_text()
+        for path in root.rglob("*")
+        if path.is_file()
+    }
+
+
+def _relayout(root: Path, pattern: str) -> list[FolderMove]:
+    moves = plan_relayout(root, Layout(pattern), find_day_folders(root))
+    done, errors = apply_relayout(root, moves)
+    assert errors == []
+    assert len(done) == len(moves)
+    return moves
+
+
+def test_layout_paths():
+    layout = Layout("YYYY/MM/YYYY-MM-DD")
+
+    assert layout.day_folder(Path("/a"), date(2023, 5, 1)) == Path(
+        "/a/2023/05/2023-05-01"
+    )
+
+
+@pytest.mark.parametrize("pattern", ["YYYY", "YYYY-MM-DD/YYYY", "YYYY/foo/YYYY-MM-DD"])
+def test_invalid_layout(pattern):
+    with pytest.raises(ValueError):
+        Layout(pattern)
+
+
+def test_parse_day():
+    assert parse_day("2023-05-01 Boda") == date(2023, 5, 1)
+    assert parse_day("2023-02-30") is None
+    assert parse_day("fotos") is None
+
+
+def test_relayout_round_trip(tmp_path):
+    _make_archive(tmp_path, ["2023-05-01", "2023-05-02 Boda", "2024-01-01_01"])
+    (tmp_path / "otros" / "2020-01-01").mkdir(parents=True)
+    original = _archive_contents(tmp_path)
+
+    _relayout(tmp_path, "YYYY/MM/YYYY-MM-DD")
+    assert _archive_contents(tmp_path) == {
+        "2023/05/2023-05-01/photo.jpg": "2023-05-01",
+        "2023/05/2023-05-02 Boda/photo.jpg": "2023-05-02 Boda",
+        "2024/01/2024-01-01_01/photo.jpg": "2024-01-01_01",
+    }
+
+    _relayout(tmp_path, "YYYY-MM-DD")
+    assert _archive_contents(tmp_path) == original
+    # Grouping folders left empty are removed, unrelated folders are not entered
+    assert sorted(p.name for p in tmp_path.iterdir()) == [
+        "2023-05-01",
+        "2023-05-02 Boda",
+        "2024-01-01_01",
+        "otros",
+    ]
+
+
+def test_folders_in_place_are_not_moved(tmp_path):
+    _make_archive(tmp_path, ["2023/2023-05-01", "2023-05-02"])
+
+    moves = plan_relayout(
+        tmp_path, Layout("YYYY/YYYY-MM-DD"), find_day_folders(tmp_path)
+    )
+
+    assert moves == [
+        FolderMove(
+            tmp_path / "2023-05-02", tmp_path / "2023/2023-05-02", date(2023, 5, 2)
+        )
+    ]
+
+
+def test_collisions_get_a_suffix(tmp_path):
+    # The same day in two years (misfiled) and a folder in place
+    _make_archive(tmp_path, ["2023-05-01", "2022/2023-05-01", "2023/2023-05-01"])
+
+    _relayout(tmp_path, "YYYY-MM-DD")
+
+    assert _archive_contents(tmp_path) == {
+        "2023-05-01/photo.jpg": "2023-05-01",
+        "2023-05-01_01/photo.jpg": "2022/2023-05-01",
+        "2023-05-01_02/photo.jpg": "2023/2023-05-01",
+    }
+
+
+def test_moves_into_freed_paths_go_last():
+    a, b, c = Path("/a"), Path("/b"), Path("/c")
+    day = date(2023, 5, 1)
+    # a goes where b is, b goes where c is: c, then b, then a
+    moves = [
+        FolderMove(a, b, day),
+        FolderMove(b, c, day),
+        FolderMove(c, Path("/d"), day),
+    ]
+
+    assert [m.source for m in _order_moves(moves)] == [c, b, a]
+
+
+def test_swap_cycle_is_ordered_once():
+    a, b = Path("/a"), Path("/b")
+    day = date(2023, 5, 1)
+    moves = [FolderMove(a, b, day), FolderMove(b, a, day)]
+
+    ordered = _order_moves(moves)
+
+    # A cycle cannot be ordered, but it must not loop nor drop a move
+    assert sorted(ordered) == sorted(moves)
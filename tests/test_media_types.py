@@ -0,0 +1,77 @@
+import struct
+
+import pytest
+
+from papa_toolkit.media_types import (
+    IMAGE,
+    VIDEO,
+    detect_media_type,
+    media_kind,
+    sniff_media_type,
+)
+
+
+def _ftyp(brand: bytes, *compatible: bytes) -> bytes:
+    payload = brand + b"\0\0\0\0" + b"".join(compatible)
+    return struct.pack(">I", 8 + len(payload)) + b"ftyp" + payload
+
+
+@pytest.mark.parametrize(
+    "header, expected",
+    [
+        (b"\xff\xd8\xff\xe0\0\x10JFIF", "jpeg"),
+        (b"\x89PNG\r\n\x1a\n", "png"),
+        (b"II*\0\x08\0\0\0", "tiff"),
+        (b"II*\0\x10\0\0\0CR\x02\0", "raw"),
+        (b"GIF89a", "gif"),
+        (b"RIFF\0\0\0\0WEBPVP8 ", "webp"),
+        (b"RIFF\0\0\0\0AVI LIST", "avi"),
+        (b"\x1a\x45\xdf\xa3", "mkv"),
+        (_ftyp(b"heic", b"mif1heic"), "heic"),
+        (_ftyp(b"avif", b"mif1miaf"), "avif"),
+        (_ftyp(b"avis", b"msf1"), "avif"),
+        (_ftyp(b"crx ", b"isom"), "raw"),
+        (_ftyp(b"qt  ", b"qt  "), "mov"),
+        (_ftyp(b"isom", b"isomiso2avc1mp41"), "mp4"),
+        (_ftyp(b"mp42", b"isom"), "mp4"),
+        (_ftyp(b"3gp5", b"3gp5isom"), "mp4"),
+        (b"\0\0\0\x08wide\0\0\0\0mdat", "mov"),
+    ],
+)
+def test_sniff(header, expected):
+    assert sniff_media_type(header) == expected
+
+
+@pytest.mark.parametrize("brand", [b"M4A ", b"M4B ", b"M4P "])
+def test_audio_is_not_a_video(brand):
+    # Voice memos list video brands as compatible, only the major one counts
+    header = _ftyp(brand, b"M4A mp42isom")
+
+    assert sniff_media_type(header, "memo.m4a") is None
+
+
+def test_unknown_brand_trusts_a_video_extension():
+    header = _ftyp(b"abcd", b"isom")
+
+    assert sniff_media_type(header, "clip.MP4") == "mp4"
+    assert sniff_media_type(header, "clip.bin") is None
+
+
+def test_extension_only_for_videos():
+    assert sniff_media_type(b"\0" * 16, "clip.mts") == "mts"
+    assert sniff_media_type(b"\0" * 16, "photo.jpg") is None
+
+
+def test_detect_media_type(tmp_path):
+    path = tmp_path / "no_extension"
+    path.write_bytes(_ftyp(b"avif", b"mif1") + b"\0" * 100)
+
+    assert detect_media_type(path) == "avif"
+
+
+@pytest.mark.parametrize(
+    "media_type, kind",
+    [("jpeg", IMAGE), ("avif", IMAGE), ("mov", VIDEO), (None, None), ("pdf", None)],
+)
+def test_media_kind(media_type, kind):
+    assert media_kind(media_type) == kind
@@ -0,0 +1,71 @@
+import sqlite3
+from datetime import datetime
+
+from papa_toolkit.metadata_cache import CacheEntry, HashEntry, MetadataCache
+
+_DATE = datetime(2023, 5, 1, 10, 20, 30)
+
+
+def test_entries_follow_size_and_mtime(tmp_path):
+    path = tmp_path / "a.jpg"
+    with MetadataCache(tmp_path / "cache.sqlite") as cache:
+        cache.put(path, 100, 5, "jpeg", _DATE)
+        cache.flush()
+
+        assert cache.get(path, 100, 5) == CacheEntry("jpeg", _DATE)
+        # The file changed: the entry is not valid anymore
+        assert cache.get(path, 101, 5) is None
+        assert cache.get(path, 100, 6) is None
+        assert cache.get(tmp_path / "b.jpg", 100, 5) is None
+
+
+def test_kept_between_runs(tmp_path):
+    path = tmp_path / "a.jpg"
+    with MetadataCache(tmp_path / "cache.sqlite") as cache:
+        cache.put(path, 100, 5, "jpeg", None)
+        cache.put_hashes(path, 100, 5, (1 << 64) - 1, 1, 640 * 480)
+
+    with MetadataCache(tmp_path / "cache.sqlite") as cache:
+        # No date found is a result too
+        assert cache.get(path, 100, 5) == CacheEntry("jpeg", None)
+        assert cache.get_hashes(path, 100, 5) == HashEntry((1 << 64) - 1, 1, 307200)
+
+
+def test_rename(tmp_path):
+    old, new = tmp_path / "source" / "a.jpg", tmp_path / "archive" / "a.jpg"
+    with MetadataCache(tmp_path / "cache.sqlite") as cache:
+        cache.put(old, 100, 5, "jpeg", _DATE)
+        cache.put_hashes(old, 100, 5, 1, 2, 3)
+        cache.rename(old, new)
+
+        assert cache.get(old, 100, 5) is None
+        assert cache.get(new, 100, 5) == CacheEntry("jpeg", _DATE)
+        assert cache.get_hashes(new, 100, 5) == HashEntry(1, 2, 3)
+
+
+def test_evict_missing(tmp_path):
+    kept = tmp_path / "folder" / "kept.jpg"
+    kept.parent.mkdir()
+    kept.write_bytes(b"x")
+    with MetadataCache(tmp_path / "cache.sqlite") as cache:
+        cache.put(kept, 1, 5, "jpeg", None)
+        cache.put(tmp_path / "folder" / "gone.jpg", 1, 5, "jpeg", None)
+        cache.put(tmp_path / "other" / "gone.jpg", 1, 5, "jpeg", None)
+
+        assert cache.evict_missing(tmp_path / "folder") == 1
+        assert cache.get(kept, 1, 5) is not None
+        # Outside the folder: not looked at
+        assert cache.get(tmp_path / "other" / "gone.jpg", 1, 5) is not None
+
+
+def test_old_schema_is_rebuilt(tmp_path):
+    db_path = tmp_path / "cache.sqlite"
+    conn = sqlite3.connect(db_path)
+    conn.execute("CREATE TABLE files (path TEXT PRIMARY KEY, is_image INTEGER)")
+    conn.commit()
+    conn.close()
+
+    with MetadataCache(db_path) as cache:
+        cache.put(tmp_path / "a.jpg", 1, 5, "jpeg", None)
+        cache.flush()
+        assert cache.get(tmp_path / "a.jpg", 1, 5) == CacheEntry("jpeg", None)
@@ -0,0 +1,83 @@
+import os
+from pathlib import Path
+
+from papa_toolkit.mirror import (
+    MANIFEST_FILENAME,
+    apply_mirror,
+    plan_mirror,
+    read_manifest,
+    verify_mirror,
+)
+
+
+def _write(folder: Path, files: dict[str, str]) -> None:
+    for name, content in files.items():
+        path = folder / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content)
+
+
+def _contents(folder: Path) -> dict[str, str]:
+    return {
+        path.relative_to(folder).as_posix(): path.read_text()
+        for path in folder.rglob("*")
+        if path.is_file() and path.name != MANIFEST_FILENAME
+    }
+
+
+def test_mirror_is_incremental(tmp_path):
+    source, mirror = tmp_path / "source", tmp_path / "mirror"
+    _write(source, {"a.jpg": "a", "2023/b.jpg": "b", "2023/.thumbnails/b.jpg": "t"})
+
+    plan = plan_mirror(source, mirror)
+    assert [relative for relative, _ in plan.copies] == ["2023/b.jpg", "a.jpg"]
+    assert apply_mirror(plan, mirror).copied == 2
+    # Thumbnails are not backed up
+    assert _contents(mirror) == {"a.jpg": "a", "2023/b.jpg": "b"}
+
+    _write(source, {"a.jpg": "changed"})
+    os.utime(source / "a.jpg", ns=(0, 10**18))
+    plan = plan_mirror(source, mirror)
+
+    assert [relative for relative, _ in plan.copies] == ["a.jpg"]
+    assert plan.unchanged == 1
+
+
+def test_delete_extraneous(tmp_path):
+    source, mirror = tmp_path / "source", tmp_path / "mirror"
+    _write(source, {"a.jpg": "a"})
+    _write(mirror, {"old.jpg": "o"})
+
+    plan = plan_mirror(source, mirror)
+    assert plan.extraneous == ["old.jpg"]
+    apply_mirror(plan, mirror)
+    assert (mirror / "old.jpg").exists()
+
+    result = apply_mirror(plan_mirror(source, mirror), mirror, delete=True)
+
+    assert result.deleted == 1
+    assert _contents(mirror) == {"a.jpg": "a"}
+
+
+def test_verify_finds_damaged_copies(tmp_path):
+    source, mirror = tmp_path / "source", tmp_path / "mirror"
+    _write(source, {"a.jpg": "a", "b.jpg": "b", "c.jpg": "c"})
+    apply_mirror(plan_mirror(source, mirror), mirror)
+
+    (mirror / "b.jpg").write_text("x")
+    (mirror / "c.jpg").unlink()
+    result = verify_mirror(mirror)
+
+    assert result.checked == 3
+    assert sorted(result.damaged) == [mirror / "b.jpg", mirror / "c.jpg"]
+
+
+def test_copies_without_checksum(tmp_path):
+    source, mirror = tmp_path / "source", tmp_path / "mirror"
+    _write(source, {"a.jpg": "a" * 100_000})
+
+    apply_mirror(plan_mirror(source, mirror), mirror, checksum=False)
+
+    assert _contents(mirror) == _contents(source)
+    assert read_manifest(mirror)["a.jpg"][2] is None
+    assert verify_mirror(mirror).without_hash == 1
@@ -0,0 +1,104 @@
+import errno
+import os
+
+import pytest
+
+from papa_toolkit import file_ops
+from papa_toolkit.file_ops import copy_file, partial_path
+from papa_toolkit.hashing import full_hash, new_hash
+from papa_toolkit.move_executor import MoveExecutor
+
+_CONTENT = bytes(range(256)) * 5000
+
+
+@pytest.fixture
+def source(tmp_path):
+    path = tmp_path / "a.jpg"
+    path.write_bytes(_CONTENT)
+    os.utime(path, ns=(10**18, 10**18))
+    return path
+
+
+def test_copy_file(tmp_path, source):
+    target = tmp_path / "b.jpg"
+
+    assert copy_file(source, target) == len(_CONTENT)
+    assert target.read_bytes() == _CONTENT
+    assert target.stat().st_mtime_ns == 10**18
+
+
+def test_copy_file_hashing(tmp_path, source):
+    hasher = new_hash()
+
+    copy_file(source, tmp_path / "b.jpg", hasher, fsync=True)
+
+    assert (tmp_path / "b.jpg").read_bytes() == _CONTENT
+    assert hasher.hexdigest() == full_hash(source)
+
+
+@pytest.mark.skipif(not hasattr(os, "copy_file_range"), reason="Linux only")
+def test_copy_file_range_unsupported(tmp_path, source, monkeypatch):
+    def unsupported(*args):
+        raise OSError(errno.EXDEV, "cross-device")
+
+    monkeypatch.setattr(file_ops.os, "copy_file_range", unsupported)
+
+    assert copy_file(source, tmp_path / "b.jpg") == len(_CONTENT)
+    assert (tmp_path / "b.jpg").read_bytes() == _CONTENT
+
+
+def test_move_renames_within_a_device(tmp_path, source):
+    target = tmp_path / "2023" / "2023-05-01" / "a.jpg"
+    with MoveExecutor() as mover:
+        assert mover.move(source, target).result() == target
+
+    assert target.read_bytes() == _CONTENT
+    assert not source.exists()
+    assert (mover.renamed, mover.copied) == (1, 0)
+
+
+def test_move_copies_across_devices(tmp_path, source, monkeypatch):
+    monkeypatch.setattr(MoveExecutor, "_same_device", lambda *args: False)
+    target = tmp_path / "archive" / "a.jpg"
+    with MoveExecutor(delete_batch=10) as mover:
+        assert mover.move(source, target).result() == target
+        # Sources are deleted in batches, after their copy is in place
+        assert source.exists()
+
+    assert not source.exists()
+    assert target.read_bytes() == _CONTENT
+    assert target.stat().st_mtime_ns == 10**18
+    assert not partial_path(target).exists()
+    assert (mover.copied, mover.bytes_copied) == (1, len(_CONTENT))
+
+
+def test_failed_copy_keeps_the_source(tmp_path, source, monkeypatch):
+    monkeypatch.setattr(MoveExecutor, "_same_device", lambda *args: False)
+
+    def failing_copy(src, dst, *args, **kwargs):
+        dst.write_bytes(b"partial")
+        raise OSError(errno.ENOSPC, "No space left on device")
+
+    monkeypatch.setattr("papa_toolkit.move_executor.copy_file", failing_copy)
+    target = tmp_path / "archive" / "a.jpg"
+    with MoveExecutor() as mover:
+        with pytest.raises(OSError):
+            mover.move(source, target).result()
+
+    assert source.read_bytes() == _CONTENT
+    assert not target.exists()
+    assert not partial_path(target).exists()
+
+
+def test_unique_destination(tmp_path, source, monkeypatch):
+    monkeypatch.setattr(MoveExecutor, "_same_device", lambda *args: False)
+    (tmp_path / "archive").mkdir()
+    (tmp_path / "archive" / "a.jpg").write_bytes(b"other")
+    with MoveExecutor() as mover:
+        first = mover.unique_destination(tmp_path / "archive" / "a.jpg")
+        mover.move(source, first)
+        # Taken by the copy in progress (or done)
+        second = mover.unique_destination(tmp_path / "archive" / "a.jpg")
+
+    assert first.name == "a (1).jpg"
+    assert second.name == "a (2).jpg"
@@ -0,0 +1,62 @@
+from datetime import datetime
+from pathlib import Path
+
+from papa_toolkit.move_journal import MoveJournal, read_journal
+
+
+def test_round_trip(tmp_path):
+    path = tmp_path / "journal.jsonl"
+    journal = MoveJournal(path)
+    date = datetime(2023, 5, 1, 10, 20, 30)
+    first = journal.planned(Path("src/a.jpg"), Path("dst/a.jpg"), "image", date)
+    journal.planned(Path("src/b.mp4"), Path("dst/b.mp4"), "video")
+    journal.completed(first)
+    journal.close(finished=False)
+
+    entries = read_journal(path)
+
+    assert [(e.source, e.destination, e.completed) for e in entries] == [
+        (Path("src/a.jpg"), Path("dst/a.jpg"), True),
+        (Path("src/b.mp4"), Path("dst/b.mp4"), False),
+    ]
+    assert entries[0].kind == "image"
+    assert entries[0].date_taken == date
+    assert entries[1].date_taken is None
+
+
+def test_truncated_last_line(tmp_path):
+    path = tmp_path / "journal.jsonl"
+    journal = MoveJournal(path)
+    journal.planned(Path("src/a.jpg"), Path("dst/a.jpg"))
+    journal.close(finished=False)
+    # The process died while writing the next record
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('{"op": "move", "id": 2, "src": "src/b.j')
+
+    entries = read_journal(path)
+
+    assert [e.source for e in entries] == [Path("src/a.jpg")]
+    assert not entries[0].completed
+
+
+def test_truncated_done_record(tmp_path):
+    path = tmp_path / "journal.jsonl"
+    journal = MoveJournal(path)
+    entry_id = journal.planned(Path("src/a.jpg"), Path("dst/a.jpg"))
+    journal.close(finished=False)
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(f'{{"op": "done", "id": {entry_id}')
+
+    (entry,) = read_journal(path)
+
+    # Not known to be complete: it is checked on disk when resuming
+    assert not entry.completed
+
+
+def test_finished_journal_is_removed(tmp_path):
+    path = tmp_path / "journal.jsonl"
+    journal = MoveJournal(path)
+    journal.completed(journal.planned(Path("a.jpg"), Path("b.jpg")))
+    journal.close(finished=True)
+
+    assert not path.exists()
@@ -0,0 +1,73 @@
+import random
+
+from PIL import Image
+
+import similar_finder
+from papa_toolkit.metadata_cache import MetadataCache
+from papa_toolkit.perceptual import HashIndex, find_similar, hamming
+
+
+def _picture(path, size=(256, 192), invert=False):
+    """A diagonal gradient with a bright square, saved at ``size``."""
+    image = Image.new("L", (64, 48))
+    for x in range(64):
+        for y in range(48):
+            value = 3 * x + 2 * y + (80 if 10 < x < 30 and 10 < y < 25 else 0)
+            image.putpixel((x, y), min(value, 255) if not invert else 255 - value)
+    image.convert("RGB").resize(size).save(path)
+
+
+def test_hamming():
+    assert hamming(0b1011, 0b0001) == 2
+    assert hamming(0, (1 << 64) - 1) == 64
+
+
+def test_hash_index_matches_brute_force():
+    rng = random.Random(1)
+    hashes = [rng.getrandbits(64) for _ in range(300)]
+    # Some near copies of the first hashes
+    hashes += [
+        h ^ (1 << rng.randrange(64)) ^ (1 << rng.randrange(64)) for h in hashes[:20]
+    ]
+    index = HashIndex()
+    for position, value in enumerate(hashes):
+        index.add(value, position)
+
+    for value in hashes[:40]:
+        found = sorted(index.search(value, 8))
+        expected = sorted(
+            (hamming(value, other), position)
+            for position, other in enumerate(hashes)
+            if hamming(value, other) <= 8
+        )
+        assert found == expected
+
+
+def test_find_similar(tmp_path):
+    _picture(tmp_path / "original.png", (640, 480))
+    _picture(tmp_path / "whatsapp.jpg", (320, 240))
+    _picture(tmp_path / "other.png", invert=True)
+    (tmp_path / "notes.txt").write_text("not a picture")
+
+    with MetadataCache(tmp_path / "cache" / "cache.sqlite") as cache:
+        groups = find_similar([tmp_path], workers=1, cache=cache)
+        cache.flush()
+        stat = (tmp_path / "notes.txt").stat()
+        hashes = cache.get_hashes(
+            tmp_path / "notes.txt", stat.st_size, stat.st_mtime_ns
+        )
+        assert hashes == (None, None, None)
+
+    # The copy with most pixels is kept
+    assert [group.paths for group in groups] == [
+        [tmp_path / "original.png", tmp_path / "whatsapp.jpg"]
+    ]
+
+
+def test_copies_are_only_listed_by_default(tmp_path):
+    _picture(tmp_path / "original.png", (640, 480))
+    _picture(tmp_path / "whatsapp.jpg", (320, 240))
+
+    similar_finder.remove_similar([tmp_path], workers=1)
+
+    assert (tmp_path / "whatsapp.jpg").exists()
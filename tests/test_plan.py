@@ -0,0 +1,60 @@
+import os
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+
+from papa_toolkit.plan import PlanEntry, is_stale, read_plan, write_plan
+
+
+def _entry(path: Path, destination: Path | None) -> PlanEntry:
+    stat = path.stat()
+    return PlanEntry(
+        path,
+        destination,
+        datetime(2023, 5, 1, 10, 20, 30),
+        "image",
+        "jpeg",
+        stat.st_size,
+        stat.st_mtime_ns,
+    )
+
+
+def test_round_trip(tmp_path):
+    source = tmp_path / "a.jpg"
+    source.write_text("a")
+    entries = [_entry(source, tmp_path / "2023-05-01" / "a.jpg"), _entry(source, None)]
+    plan_path = tmp_path / "plan.jsonl"
+
+    assert write_plan(plan_path, "image_syncer", entries) == 2
+
+    assert read_plan(plan_path, "image_syncer") == entries
+
+
+def test_plan_of_another_command(tmp_path):
+    plan_path = tmp_path / "plan.jsonl"
+    write_plan(plan_path, "year_organizer", [])
+
+    with pytest.raises(ValueError, match="year_organizer"):
+        read_plan(plan_path, "image_syncer")
+
+
+def test_invalid_plan(tmp_path):
+    plan_path = tmp_path / "plan.jsonl"
+    plan_path.write_text('{"version": 1, "command": "image_syncer"}\n{"src": ')
+
+    with pytest.raises(ValueError):
+        read_plan(plan_path, "image_syncer")
+
+
+def test_is_stale(tmp_path):
+    source = tmp_path / "a.jpg"
+    source.write_text("a")
+    entry = _entry(source, None)
+    assert not is_stale(entry)
+
+    os.utime(source, ns=(0, 10**18))
+    assert is_stale(entry)
+
+    source.unlink()
+    assert is_stale(entry)
@@ -0,0 +1,68 @@
+from pathlib import Path
+
+from papa_toolkit.prune import prune_folders, prune_tree
+
+
+def _make(root: Path, paths: list[str]) -> None:
+    for relpath in paths:
+        path = root / relpath
+        if relpath.endswith("/"):
+            path.mkdir(parents=True, exist_ok=True)
+        else:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text("x")
+
+
+def _tree(root: Path) -> list[str]:
+    return sorted(path.relative_to(root).as_posix() for path in root.rglob("*"))
+
+
+def test_prune_tree(tmp_path):
+    _make(
+        tmp_path,
+        [
+            "empty/",
+            "nested/a/b/",
+            "settings/.picasa.ini",
+            "settings/Thumbs.db",
+            "kept/photo.jpg",
+            "kept/empty/",
+        ],
+    )
+
+    removed = prune_tree(tmp_path)
+
+    assert removed == [
+        tmp_path / "empty",
+        tmp_path / "kept" / "empty",
+        tmp_path / "nested",
+        tmp_path / "nested" / "a",
+        tmp_path / "nested" / "a" / "b",
+        tmp_path / "settings",
+    ]
+    assert _tree(tmp_path) == ["kept", "kept/photo.jpg"]
+
+
+def test_dry_run(tmp_path):
+    _make(tmp_path, ["empty/", "settings/desktop.ini"])
+
+    assert prune_tree(tmp_path, dry_run=True) == [
+        tmp_path / "empty",
+        tmp_path / "settings",
+    ]
+    assert _tree(tmp_path) == ["empty", "settings", "settings/desktop.ini"]
+
+
+def test_prune_folders_goes_up_to_stop_at(tmp_path):
+    source = tmp_path / "source"
+    _make(tmp_path, ["source/2023/05/", "source/2023/keep.jpg", "source/other/"])
+
+    removed = prune_folders([source / "2023" / "05"], source)
+
+    # Parents are only removed when left empty, untouched folders stay
+    assert removed == [source / "2023" / "05"]
+    assert _tree(source) == ["2023", "2023/keep.jpg", "other"]
+
+    (source / "2023" / "keep.jpg").unlink()
+    assert prune_folders([source / "2023"], source) == [source / "2023"]
+    assert source.exists()
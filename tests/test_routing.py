@@ -0,0 +1,96 @@
+from datetime import date
+from pathlib import Path
+
+import pytest
+
+from papa_toolkit.layout import Layout
+from papa_toolkit.routing import Route, Router, load_routes, parse_route
+
+
+def _route(folder: str) -> Route:
+    return Route(Path(folder), Layout("YYYY-MM-DD"))
+
+
+def test_most_specific_route_wins():
+    router = Router(
+        {
+            "*": _route("/other"),
+            "image": _route("/pictures"),
+            "heic": _route("/iphone"),
+            ".JPG": _route("/jpg"),
+        }
+    )
+
+    assert router.route_for(Path("a.jpg"), "jpeg", "image").destination == Path("/jpg")
+    assert router.route_for(Path("a.heic"), "heic", "image").destination == Path(
+        "/iphone"
+    )
+    assert router.route_for(Path("a.png"), "png", "image").destination == Path(
+        "/pictures"
+    )
+    assert router.route_for(Path("a.mp4"), "mp4", "video").destination == Path("/other")
+    assert router.destinations == [
+        Path("/other"),
+        Path("/pictures"),
+        Path("/iphone"),
+        Path("/jpg"),
+    ]
+
+
+def test_no_route():
+    router = Router({"video": _route("/videos")})
+
+    assert router.route_for(Path("a.jpg"), "jpeg", "image") is None
+
+
+@pytest.mark.parametrize(
+    "spec, key, destination, pattern",
+    [
+        ("video=/videos", "video", "/videos", "YYYY-MM-DD"),
+        ("video=/videos:YYYY/YYYY-MM-DD", "video", "/videos", "YYYY/YYYY-MM-DD"),
+        (r"MOV=D:\Videos", "mov", r"D:\Videos", "YYYY-MM-DD"),
+        (
+            r".heic=D:\Fotos:YYYY/MM/YYYY-MM-DD",
+            ".heic",
+            r"D:\Fotos",
+            "YYYY/MM/YYYY-MM-DD",
+        ),
+    ],
+)
+def test_parse_route(spec, key, destination, pattern):
+    parsed_key, route = parse_route(spec)
+
+    assert parsed_key == key
+    assert route.destination == Path(destination)
+    assert route.layout.pattern == pattern
+
+
+@pytest.mark.parametrize("spec", ["video", "=/videos", "pdf=/docs", "video="])
+def test_invalid_route(spec):
+    with pytest.raises(ValueError):
+        parse_route(spec)
+
+
+def test_load_routes(tmp_path):
+    config = tmp_path / "routes.toml"
+    config.write_text(
+        '[routes.image]\ndestination = "Pictures"\n\n'
+        '[routes.video]\ndestination = "Videos"\nlayout = "YYYY/YYYY-MM-DD"\n'
+    )
+
+    router = load_routes(config)
+
+    video = router.route_for(Path("a.mov"), "mov", "video")
+    assert video.destination == tmp_path / "Videos"
+    assert video.layout.day_folder(tmp_path, date(2023, 5, 1)) == (
+        tmp_path / "2023" / "2023-05-01"
+    )
+    assert router.routes["image"].destination == tmp_path / "Pictures"
+
+
+def test_load_routes_without_destination(tmp_path):
+    config = tmp_path / "routes.toml"
+    config.write_text('[routes.image]\nlayout = "YYYY-MM-DD"\n')
+
+    with pytest.raises(ValueError):
+        load_routes(config)
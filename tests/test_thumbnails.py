@@ -0,0 +1,111 @@
+import os
+from pathlib import Path
+
+from PIL import Image
+
+from papa_toolkit.thumbnails import (
+    THUMBNAILS_FOLDER,
+    CacheState,
+    add_to_cache,
+    apply_thumbnails,
+    archive_folders,
+    evict_thumbnails,
+    plan_thumbnails,
+    read_cache_state,
+    thumbnail_path,
+)
+
+
+def _picture(path: Path, size=(800, 600)) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    Image.new("RGB", size, (200, 120, 40)).save(path)
+
+
+def _thumbnail(folder: Path, name: str, size: int, atime_ns: int) -> Path:
+    path = folder / THUMBNAILS_FOLDER / name
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(b"x" * size)
+    os.utime(path, ns=(atime_ns, atime_ns))
+    return path
+
+
+def test_thumbnail_path():
+    assert thumbnail_path(Path("d/a.JPG")) == Path("d/.thumbnails/a.JPG")
+    assert thumbnail_path(Path("d/a.png")) == Path("d/.thumbnails/a.png.jpg")
+
+
+def test_archive_folders_newest_first(tmp_path):
+    _picture(tmp_path / "2022" / "2022-12-31" / "a.jpg")
+    _picture(tmp_path / "2023" / "2023-01-01" / "a.jpg")
+    (tmp_path / "2023" / "empty").mkdir()
+    # Left with thumbnails only, listed so that those are deleted
+    _thumbnail(tmp_path / "2021-01-01", "a.jpg", 10, 0)
+
+    assert archive_folders(tmp_path) == [
+        tmp_path / "2023" / "2023-01-01",
+        tmp_path / "2022" / "2022-12-31",
+        tmp_path / "2021-01-01",
+    ]
+
+
+def test_make_thumbnails(tmp_path):
+    day = tmp_path / "2023-01-01"
+    _picture(day / "a.jpg")
+    _picture(day / "b.png", (300, 800))
+    (day / "clip.mp4").write_bytes(b"\0\0\0\x18ftypisom" + b"\0" * 16)
+    orphan = _thumbnail(day, "gone.jpg", 10, 0)
+
+    plan = plan_thumbnails([day])
+    assert [picture.name for picture, _, _ in plan.tasks] == ["a.jpg", "b.png"]
+    assert plan.orphans == [orphan]
+
+    result = apply_thumbnails(plan, size=160, workers=1)
+
+    assert (result.created, result.errors) == (2, [])
+    assert not orphan.exists()
+    with Image.open(day / THUMBNAILS_FOLDER / "b.png.jpg") as thumbnail:
+        assert thumbnail.size == (60, 160)
+    # Up to date until their picture changes
+    assert plan_thumbnails([day]).up_to_date == 2
+    os.utime(day / "a.jpg", ns=(0, 10**18))
+    assert [picture.name for picture, _, _ in plan_thumbnails([day]).tasks] == ["a.jpg"]
+
+
+def test_size_limit_keeps_the_newest_folders(tmp_path):
+    new, old = tmp_path / "2023-01-02", tmp_path / "2023-01-01"
+    _picture(new / "a.jpg")
+    _picture(old / "a.jpg")
+
+    plan = plan_thumbnails([new, old], max_bytes=1)
+
+    assert [picture for picture, _, _ in plan.tasks] == [new / "a.jpg"]
+    assert plan.skipped == 1
+
+
+def test_evict_least_recently_used(tmp_path):
+    old = _thumbnail(tmp_path / "2023-01-01", "a.jpg", 100, 1 * 10**18)
+    recent = _thumbnail(tmp_path / "2023-01-02", "a.jpg", 100, 2 * 10**18)
+
+    eviction = evict_thumbnails(tmp_path, max_bytes=150)
+
+    assert (eviction.evicted, eviction.size) == (1, 100)
+    assert not old.exists()
+    assert not old.parent.exists()
+    assert recent.exists()
+
+
+def test_add_to_cache_only_evicts_when_needed(tmp_path):
+    _thumbnail(tmp_path / "2023-01-01", "a.jpg", 100, 1 * 10**18)
+    assert add_to_cache(tmp_path, 0, max_bytes=1000) == (0, 100)
+    assert read_cache_state(tmp_path) == CacheState(1000, 100)
+
+    # Within the stored limit: the archive is not walked
+    recent = _thumbnail(tmp_path / "2023-01-02", "a.jpg", 950, 2 * 10**18)
+    (tmp_path / "2023-01-01" / THUMBNAILS_FOLDER / "a.jpg").unlink()
+    assert add_to_cache(tmp_path, 50) == (0, 150)
+
+    # Over the limit, the last one used for the archive
+    _thumbnail(tmp_path / "2023-01-03", "a.jpg", 100, 3 * 10**18)
+    assert add_to_cache(tmp_path, 950) == (1, 100)
+    assert not recent.exists()
+    assert read_cache_state(tmp_path) == CacheState(1000, 100)
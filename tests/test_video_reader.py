@@ -0,0 +1,150 @@
+import struct
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from papa_toolkit.media_types import detect_media_type
+from papa_toolkit.video_reader import VideoMetadataError, read_video_datetime
+
+_MAC_EPOCH = datetime(1904, 1, 1, tzinfo=timezone.utc)
+
+
+def _box(box_type: bytes, payload: bytes) -> bytes:
+    return struct.pack(">I", 8 + len(payload)) + box_type + payload
+
+
+def _header(box_type: bytes, date: datetime | None, version: int = 0) -> bytes:
+    """mvhd or tkhd box with its creation time, 0 if not set."""
+    seconds = int((date - _MAC_EPOCH).total_seconds()) if date else 0
+    if version == 1:
+        times = struct.pack(">QQ", seconds, seconds)
+    else:
+        times = struct.pack(">II", seconds, seconds)
+    return _box(box_type, bytes([version, 0, 0, 0]) + times + b"\0" * 80)
+
+
+def _quicktime_day(text: str) -> bytes:
+    value = text.encode()
+    return _box(b"udta", _box(b"\xa9day", struct.pack(">HH", len(value), 0) + value))
+
+
+def _itunes_day(text: str) -> bytes:
+    data = _box(b"data", struct.pack(">II", 1, 0) + text.encode())
+    ilst = _box(b"ilst", _box(b"\xa9day", data))
+    hdlr = _box(b"hdlr", b"\0" * 8 + b"mdirappl" + b"\0" * 9)
+    return _box(b"udta", _box(b"meta", b"\0\0\0\0" + hdlr + ilst))
+
+
+def _apple_creation_date(text: str) -> bytes:
+    def key(name: bytes) -> bytes:
+        return struct.pack(">I", 8 + len(name)) + b"mdta" + name
+
+    # The creation date is the second key, its ilst entry is box 2
+    entries = key(b"com.apple.quicktime.make") + key(
+        b"com.apple.quicktime.creationdate"
+    )
+    keys = _box(b"keys", b"\0\0\0\0" + struct.pack(">I", 2) + entries)
+    data = _box(b"data", struct.pack(">II", 1, 0) + text.encode())
+    ilst = _box(b"ilst", _box(struct.pack(">I", 2), data))
+    hdlr = _box(b"hdlr", b"\0" * 8 + b"mdta" + b"\0" * 13)
+    return _box(b"meta", hdlr + keys + ilst)
+
+
+def _mp4(*moov_children: bytes) -> bytes:
+    ftyp = _box(b"ftyp", b"isom" + b"\0\0\0\0" + b"isommp42")
+    # Media data before the moov box, as cameras write it
+    return ftyp + _box(b"mdat", b"\0" * 64) + _box(b"moov", b"".join(moov_children))
+
+
+def _write(tmp_path, data: bytes):
+    path = tmp_path / "a.mp4"
+    path.write_bytes(data)
+    return path
+
+
+def test_mvhd_creation_time(tmp_path):
+    date = datetime(2023, 5, 1, 10, 20, 30, tzinfo=timezone.utc)
+    path = _write(tmp_path, _mp4(_header(b"mvhd", date)))
+
+    assert detect_media_type(path) == "mp4"
+    assert read_video_datetime(path, "mp4") == date
+
+
+def test_mvhd_version_1(tmp_path):
+    date = datetime(2023, 5, 1, 10, 20, 30, tzinfo=timezone.utc)
+    path = _write(tmp_path, _mp4(_header(b"mvhd", date, version=1)))
+
+    assert read_video_datetime(path, "mp4") == date
+
+
+def test_tkhd_when_mvhd_is_not_set(tmp_path):
+    date = datetime(2023, 5, 1, 10, 20, 30, tzinfo=timezone.utc)
+    trak = _box(b"trak", _header(b"tkhd", date))
+    path = _write(tmp_path, _mp4(_header(b"mvhd", None), trak))
+
+    assert read_video_datetime(path, "mp4") == date
+
+
+def test_no_date(tmp_path):
+    path = _write(tmp_path, _mp4(_header(b"mvhd", None)))
+
+    assert read_video_datetime(path, "mp4") is None
+
+
+def test_quicktime_day_before_mvhd(tmp_path):
+    mvhd = _header(b"mvhd", datetime(2000, 1, 1, tzinfo=timezone.utc))
+    path = _write(tmp_path, _mp4(mvhd, _quicktime_day("2023-05-01T10:20:30+02:00")))
+
+    assert read_video_datetime(path, "mov") == datetime(
+        2023, 5, 1, 10, 20, 30, tzinfo=timezone(timedelta(hours=2))
+    )
+
+
+def test_itunes_day(tmp_path):
+    mvhd = _header(b"mvhd", None)
+    path = _write(tmp_path, _mp4(mvhd, _itunes_day("2023-05-01T10:20:30Z")))
+
+    assert read_video_datetime(path, "mp4") == datetime(
+        2023, 5, 1, 10, 20, 30, tzinfo=timezone.utc
+    )
+
+
+def test_year_only_day_falls_back_to_mvhd(tmp_path):
+    date = datetime(2023, 5, 1, 10, 20, 30, tzinfo=timezone.utc)
+    path = _write(tmp_path, _mp4(_header(b"mvhd", date), _quicktime_day("2023")))
+
+    assert read_video_datetime(path, "mp4") == date
+
+
+def test_apple_creation_date_first(tmp_path):
+    mvhd = _header(b"mvhd", datetime(2000, 1, 1, tzinfo=timezone.utc))
+    meta = _apple_creation_date("2023-05-01T10:20:30-0300")
+    path = _write(tmp_path, _mp4(mvhd, meta, _quicktime_day("2010-01-01T00:00:00Z")))
+
+    assert read_video_datetime(path, "mov") == datetime(
+        2023, 5, 1, 10, 20, 30, tzinfo=timezone(-timedelta(hours=3))
+    )
+
+
+def test_missing_moov(tmp_path):
+    path = _write(tmp_path, _box(b"ftyp", b"isom\0\0\0\0") + _box(b"mdat", b"\0"))
+
+    with pytest.raises(VideoMetadataError):
+        read_video_datetime(path, "mp4")
+
+
+def test_truncated_moov(tmp_path):
+    date = datetime(2023, 5, 1, tzinfo=timezone.utc)
+    data = _mp4(_header(b"mvhd", date))
+    # The moov header is there, its mvhd box is cut short
+    path = _write(tmp_path, data[: len(data) - 90])
+
+    with pytest.raises(VideoMetadataError):
+        read_video_datetime(path, "mp4")
+
+
+def test_unsupported_media_type(tmp_path):
+    path = _write(tmp_path, b"RIFF\0\0\0\0AVI ")
+
+    with pytest.raises(VideoMetadataError):
+        read_video_datetime(path, "avi")
@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+# /// script
+# requires-python = ">=3.12"
+# dependencies = [
+#     "pillow",
+# ]
+# ///
+"""
+This script makes small thumbnails of the pictures of the archive, one
+.thumbnails folder per date folder, so browsing the archive does not mean
+opening every photo at full resolution.
+
+It can be run again at any time: only new or changed pictures get a new
+thumbnail. The thumbnails never take more space than --max-size, keeping those
+of the most recent folders and of the pictures looked at lately.
+image_syncer.py --thumbnails updates them after each import, within the last
+--max-size given here.
+"""
+
+import argparse
+import logging
+from pathlib import Path
+
+from papa_toolkit.metrics import Metrics, format_size
+from papa_toolkit.thumbnails import (
+    DEFAULT_MAX_BYTES,
+    DEFAULT_SIZE,
+    CacheState,
+    apply_thumbnails,
+    archive_folders,
+    evict_thumbnails,
+    plan_thumbnails,
+    write_cache_state,
+)
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(levelname)s - %(message)s",
+    datefmt="%H:%M:%S",
+)
+_logger = logging.getLogger(__name__)
+
+
+def _print_banner():
+    """Print a nice banner for the application"""
+    print("=" * 70)
+    print("  🖼️  MINIATURAS DEL ARCHIVO DE FOTOS - PAPA TOOLKIT 📁")
+    print("=" * 70)
+    print()
+
+
+def _print_summary(stats, metrics: Metrics | None = None):
+    """Print a summary of the operation"""
+    print("\n" + "=" * 50)
+    print("  📊 RESUMEN DEL PROCESO")
+    print("=" * 50)
+    print(f"  Miniaturas al día: {stats['up_to_date']}")
+    print(f"  Miniaturas creadas: {stats['created']}")
+    print(f"  Miniaturas de fotos que ya no están: {stats['orphans']}")
+    if stats["skipped"] or stats["evicted"]:
+        print(f"  Fotos sin miniatura por falta de espacio: {stats['skipped']}")
+        print(f"  Miniaturas borradas por falta de espacio: {stats['evicted']}")
+    print(f"  Errores: {stats['errors']}")
+    if stats["dry_run"]:
+        print("  🔍 Modo simulación - No se crearon miniaturas")
+    if metrics is not None:
+        print("-" * 50)
+        for line in metrics.summary_lines("fotos"):
+            print(line)
+    print("=" * 50)
+    print()
+
+
+def update_thumbnails(
+    archive_folder: Path,
+    dry_run: bool,
+    workers: int = 4,
+    size: int = DEFAULT_SIZE,
+    max_bytes: int = DEFAULT_MAX_BYTES,
+) -> None:
+    """
+    Bring the thumbnails of ``archive_folder`` up to date.
+
+    Args:
+        archive_folder: Organized archive, every folder with pictures gets
+            its thumbnails
+        dry_run: If True, only show how many thumbnails would be made
+        workers: Number of processes making thumbnails
+        size: Longest side of the thumbnails, in pixels
+        max_bytes: Space the thumbnails may take in the whole archive
+    """
+    stats = {
+        "up_to_date": 0,
+        "created": 0,
+        "orphans": 0,
+        "skipped": 0,
+        "evicted": 0,
+        "errors": 0,
+        "dry_run": dry_run,
+    }
+    metrics = Metrics()
+
+    print("🔍 Buscando fotos sin miniatura...")
+    with metrics.phase("plan"):
+        plan = plan_thumbnails(archive_folders(archive_folder), max_bytes)
+    stats["up_to_date"] = plan.up_to_date
+    stats["orphans"] = len(plan.orphans)
+    stats["skipped"] = plan.skipped
+    print(f"📋 {len(plan.tasks)} fotos nuevas o modificadas.")
+    print()
+
+    if dry_run:
+        for picture, _, _ in plan.tasks:
+            _logger.debug("Miniatura de %s", picture)
+        stats["created"] = len(plan.tasks)
+    else:
+        with metrics.phase("thumbnails"):
+            result = apply_thumbnails(plan, size, workers)
+        with metrics.phase("evict"):
+            eviction = evict_thumbnails(archive_folder, max_bytes)
+        # Imports with --thumbnails keep to the same limit
+        write_cache_state(archive_folder, CacheState(max_bytes, eviction.size))
+        stats["evicted"] = eviction.evicted
+        stats["created"] = result.created
+        stats["errors"] = len(result.errors)
+
+    metrics.add_items(len(plan.tasks))
+    metrics.stop()
+
+    # Print final summary
+    _print_summary(stats, metrics)
+
+    if stats["errors"]:
+        print("⚠️  Algunas fotos no se pudieron leer.")
+    else:
+        print("✅ ¡Las miniaturas están al día!")
+    print()
+
+
+def main() -> None:
+    # Print banner first
+    _print_banner()
+
+    parser = argparse.ArgumentParser(
+        description="Crea miniaturas de las fotos del archivo, en una carpeta "
+        ".thumbnails dentro de cada carpeta."
+    )
+    parser.add_argument(
+        "archive_folder",
+        type=Path,
+        help="Carpeta con las fotos ya organizadas",
+    )
+    parser.add_argument(
+        "-n",
+        "--dry-run",
+        action="store_true",
+        help="Modo simulación (solo contar las miniaturas que faltan)",
+    )
+    parser.add_argument(
+        "-w",
+        "--workers",
+        type=int,
+        default=4,
+        help="Número de procesos creando miniaturas en paralelo (por defecto: %(default)s)",
+    )
+    parser.add_argument(
+        "--size",
+        type=int,
+        default=DEFAULT_SIZE,
+        help="Lado mayor de las miniaturas en píxeles (por defecto: %(default)s)",
+    )
+    parser.add_argument(
+        "--max-size",
+        type=int,
+        default=DEFAULT_MAX_BYTES // 1024**2,
+        help="Espacio máximo de todas las miniaturas en MB (por defecto: %(default)s)",
+    )
+    parser.add_argument(
+        "-v",
+        "--verbose",
+        action="store_true",
+        help="Mostrar información detallada durante el proceso",
+    )
+    args = parser.parse_args()
+
+    # Set logging level based on verbose flag
+    if args.verbose:
+        logging.getLogger().setLevel(logging.DEBUG)
+
+    archive_folder = args.archive_folder.absolute()
+    if not archive_folder.is_dir():
+        print(f"❌ Error: La carpeta no existe: {archive_folder}")
+        return
+
+    max_bytes = max(0, args.max_size) * 1024**2
+    print(f"📂 Carpeta del archivo: {archive_folder}")
+    print(f"📏 Miniaturas de {args.size} px, hasta {format_size(max_bytes)}")
+    if args.dry_run:
+        print("🔍 Modo simulación activado")
+    print()
+
+    try:
+        update_thumbnails(
+            archive_folder,
+            args.dry_run,
+            max(1, args.workers),
+            max(16, args.size),
+            max_bytes,
+        )
+    except KeyboardInterrupt:
+        print("\n⏹️  Proceso interrumpido por el usuario.")
+    except OSError as e:
+        print(f"\n❌ Error inesperado: {e}")
+        if args.verbose:
+            _logger.error("Error detallado: %s", e, exc_info=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -11,10 +11,23 @@ and moves them into year-based folders (YYYY).
 
 import argparse
 import logging
+import os
 import re
 import shutil
+import time
 from datetime import datetime
 from pathlib import Path
+from typing import TYPE_CHECKING
+
+from papa_toolkit.metrics import Metrics
+from papa_toolkit.plan import FOLDER, PlanEntry, is_stale, read_plan, write_plan
+from papa_toolkit.prune import prune_folders
+
+# The index (SQLite) and merging are imported only when needed, so that a
+# run with nothing to do starts instantly
+if TYPE_CHECKING:
+    from papa_toolkit.archive_index import ArchiveIndex
+    from papa_toolkit.folder_merge import MergeResult
 
 # Configure logging
 logging.basicConfig(
@@ -43,7 +56,7 @@ def _validate_date_folder(folder_name: str) -> tuple[bool, str | None, str | Non
 
     try:
         # Validate the date is actually valid
-        datetime.strptime(f"{year}-{month}-{day}", "%Y-%m-%d")
+        datetime(int(year), int(month), int(day))
         return True, year, None
     except ValueError as e:
         return False, None, f"Invalid date: {str(e)}"
@@ -70,7 +83,7 @@ def _print_banner():
     print()
 
 
-def _print_summary(stats):
+def _print_summary(stats, metrics: Metrics | None = None):
     """Print a summary of the operation"""
     print("\n" + "=" * 50)
     print("  📊 RESUMEN DEL PROCESO")
@@ -78,9 +91,21 @@ def _print_summary(stats):
     print(f"  Carpetas procesadas: {stats['processed']}")
     print(f"  Carpetas movidas: {stats['moved']}")
     print(f"  Carpetas inválidas: {stats['invalid']}")
+    if stats["merged"]:
+        print(f"  Carpetas fusionadas: {stats['merged']}")
+        print(f"  Archivos repetidos descartados: {stats['files_dropped']}")
+        print(f"  Archivos renombrados: {stats['files_renamed']}")
+    if stats["pruned"]:
+        print(f"  Carpetas vacías borradas: {stats['pruned']}")
+    if stats["stale"]:
+        print(f"  Carpetas cambiadas desde el plan: {stats['stale']}")
     print(f"  Errores: {stats['errors']}")
     if stats["dry_run"]:
         print("  🔍 Modo simulación - No se movieron carpetas")
+    if metrics is not None:
+        print("-" * 50)
+        for line in metrics.summary_lines("carpetas"):
+            print(line)
     print("=" * 50)
 
     # Print year summary
@@ -92,26 +117,91 @@ def _print_summary(stats):
     print()
 
 
-def organize_folders_by_year(target_folder: Path, dry_run: bool) -> None:
+def _folder_names(folder: Path) -> set[str]:
+    """Names in ``folder`` (none if it does not exist), listed once."""
+    try:
+        return set(os.listdir(folder))
+    except FileNotFoundError:
+        return set()
+
+
+def _update_index(index: "ArchiveIndex", result: "MergeResult") -> None:
+    for old, new in result.moved:
+        index.rename(old, new)
+    for old, new in result.moved_dirs:
+        index.rename_folder(old, new)
+    for path in result.dropped:
+        index.remove(path)
+    index.commit()
+
+
+def organize_folders_by_year(
+    target_folder: Path,
+    dry_run: bool,
+    metrics_out: Path | None = None,
+    merge: bool = False,
+    prune_empty: bool = False,
+    plan_out: Path | None = None,
+    plan: list[PlanEntry] | None = None,
+) -> None:
     """
     Organize date-based folders by year.
 
     Args:
         target_folder: Directory containing folders to organize
         dry_run: If True, only simulate the operation without moving folders
+        metrics_out: Write the timings and counters of the run to this JSON file
+        merge: If a folder already exists in its year folder, move its files
+            into it (dropping identical files) instead of creating a
+            ``YYYY-MM-DD_01`` folder
+        prune_empty: Delete the day folders of the run that are empty (or
+            hold only .picasa.ini or desktop.ini)
+        plan_out: In a dry run, write what would be done to this file (see
+            papa_toolkit.plan)
+        plan: Entries of a plan written by a dry run: these folders are moved
+            where the plan says. Folders changed since then are moved by their
+            name as usual (merges always look at the current files).
     """
     # Initialize statistics
     stats = {
         "processed": 0,
         "moved": 0,
         "invalid": 0,
+        "merged": 0,
+        "files_dropped": 0,
+        "files_renamed": 0,
+        "pruned": 0,
+        "stale": 0,
         "errors": 0,
         "dry_run": dry_run,
         "years": {},
     }
 
-    # Get all subdirectories
-    all_folders = [f for f in target_folder.iterdir() if f.is_dir()]
+    metrics = Metrics()
+
+    # Folders planned by a dry run are not looked for again
+    planned_names = {}
+    if plan is not None:
+        all_folders = []
+        for entry in plan:
+            if entry.source.parent != target_folder.absolute():
+                _logger.warning("%s no está en %s", entry.source, target_folder)
+                continue
+            if not entry.source.is_dir():
+                stats["stale"] += 1
+                _logger.warning("La carpeta %s ya no existe", entry.source)
+                continue
+            folder = target_folder / entry.source.name
+            if is_stale(entry):
+                stats["stale"] += 1
+            elif entry.destination is not None:
+                # Name in its year folder, e.g. with the _01 of a collision
+                planned_names[folder] = entry.destination.name
+            all_folders.append(folder)
+    else:
+        # Get all subdirectories
+        with metrics.phase("scan"), os.scandir(target_folder) as entries:
+            all_folders = [Path(e.path) for e in entries if e.is_dir()]
 
     if not all_folders:
         print("❌ No se encontraron carpetas en el directorio de destino.")
@@ -119,13 +209,14 @@ def organize_folders_by_year(target_folder: Path, dry_run: bool) -> None:
 
     # Filter folders that might be date-based
     date_folders = []
-    for folder in all_folders:
-        is_valid, year, error = _validate_date_folder(folder.name)
-        if is_valid:
-            date_folders.append((folder, year))
-        elif _DATE_FOLDER_RE.match(folder.name):  # Matches pattern but invalid date
-            stats["invalid"] += 1
-            _logger.warning("Carpeta inválida '%s': %s", folder.name, error)
+    with metrics.phase("validate"):
+        for folder in all_folders:
+            is_valid, year, error = _validate_date_folder(folder.name)
+            if is_valid:
+                date_folders.append((folder, year))
+            elif _DATE_FOLDER_RE.match(folder.name):  # Pattern but invalid date
+                stats["invalid"] += 1
+                _logger.warning("Carpeta inválida '%s': %s", folder.name, error)
 
     total_folders = len(date_folders)
 
@@ -142,6 +233,19 @@ def organize_folders_by_year(target_folder: Path, dry_run: bool) -> None:
         print(f"⚠️  Se ignoraron {stats['invalid']} carpetas con fechas inválidas.")
     print()
 
+    # Keep the index written by image_syncer in sync with the new layout
+    from papa_toolkit.archive_index import INDEX_FILENAME, ArchiveIndex
+
+    index = None
+    if not dry_run and (target_folder / INDEX_FILENAME).exists():
+        index = ArchiveIndex(target_folder)
+
+    # Contents of each year folder, to resolve name collisions in memory
+    year_names: dict[str, set[str]] = {}
+    # Day folders of the run, the only ones looked at by prune_empty
+    touched_folders = set()
+    plan_entries = [] if plan_out is not None and dry_run else None
+
     # Process each folder with progress bar
     for i, (folder_path, year) in enumerate(date_folders, 1):
         folder_name = folder_path.name
@@ -156,31 +260,71 @@ def organize_folders_by_year(target_folder: Path, dry_run: bool) -> None:
             else f"({i}/{total_folders}) {folder_name}",
         )
 
+        start = time.perf_counter()
+
         # Create year folder path
         year_folder = target_folder / year
-        destination_path = year_folder / folder_name
+        destination_path = year_folder / planned_names.get(folder_path, folder_name)
 
         try:
-            # Create year folder if it doesn't exist
-            if not year_folder.exists() and not dry_run:
-                year_folder.mkdir(parents=True)
-                _logger.debug("Creada carpeta de año: %s", year_folder)
+            names = year_names.get(year)
+            if names is None:
+                names = year_names[year] = _folder_names(year_folder)
+                # Create year folder if it doesn't exist
+                if not names and not year_folder.exists() and not dry_run:
+                    year_folder.mkdir(parents=True)
+                    _logger.debug("Creada carpeta de año: %s", year_folder)
 
             # Check if destination already exists
-            if destination_path.exists():
-                _logger.warning("La carpeta de destino ya existe: %s", destination_path)
-                if not dry_run:
-                    # Try to merge by adding a suffix
+            if destination_path.name in names and merge:
+                from papa_toolkit.folder_merge import merge_folder
+
+                with metrics.phase("merge"):
+                    result = merge_folder(folder_path, destination_path, dry_run)
+                if index is not None:
+                    with metrics.phase("index"):
+                        _update_index(index, result)
+                touched_folders.add(folder_path)
+                stats["merged"] += 1
+                stats["files_dropped"] += len(result.dropped)
+                stats["files_renamed"] += len(result.renamed)
+                _logger.debug("Fusionada carpeta %s en %s", folder_name, destination_path)
+            else:
+                if destination_path.name in names:
+                    _logger.warning(
+                        "La carpeta de destino ya existe: %s", destination_path
+                    )
+                    # Keep both folders by adding a suffix
                     counter = 1
-                    while destination_path.exists():
+                    while destination_path.name in names:
                         new_name = f"{folder_name}_{counter:02d}"
                         destination_path = year_folder / new_name
                         counter += 1
                     _logger.info("Renombrando a: %s", destination_path.name)
 
-            # Move the folder
-            if not dry_run:
-                shutil.move(str(folder_path), str(destination_path))
+                # Move the folder
+                if not dry_run:
+                    with metrics.phase("move"):
+                        shutil.move(str(folder_path), str(destination_path))
+                    if index is not None:
+                        with metrics.phase("index"):
+                            index.rename_folder(folder_path, destination_path)
+                names.add(destination_path.name)
+                touched_folders.add(destination_path)
+
+            if plan_entries is not None:
+                stat = folder_path.stat()
+                plan_entries.append(
+                    PlanEntry(
+                        folder_path.absolute(),
+                        destination_path.absolute(),
+                        datetime.strptime(folder_name[:10], "%Y-%m-%d"),
+                        FOLDER,
+                        None,
+                        stat.st_size,
+                        stat.st_mtime_ns,
+                    )
+                )
 
             # Update statistics
             stats["processed"] += 1
@@ -193,8 +337,26 @@ def organize_folders_by_year(target_folder: Path, dry_run: bool) -> None:
             stats["errors"] += 1
             _logger.error("Error moviendo carpeta '%s': %s", folder_name, e)
 
+        metrics.add_latency("carpeta", time.perf_counter() - start)
+
+    if index is not None:
+        index.close()
+
+    if plan_entries is not None:
+        count = write_plan(plan_out, "year_organizer", plan_entries)
+        print(f"📝 Plan de {count} carpetas guardado en {plan_out}")
+        print("   Revíselo y aplíquelo con --apply-plan.")
+
+    if prune_empty and not dry_run and touched_folders:
+        with metrics.phase("prune"):
+            stats["pruned"] = len(prune_folders(touched_folders, target_folder))
+
+    metrics.stop()
+    if metrics_out is not None:
+        metrics.write_json(metrics_out, stats)
+
     # Print final summary
-    _print_summary(stats)
+    _print_summary(stats, metrics)
 
     if stats["moved"] > 0:
         print("✅ ¡Proceso completado exitosamente!")
@@ -221,6 +383,42 @@ def main() -> None:
         action="store_true",
         help="Modo simulación (sin mover ni crear carpetas)",
     )
+    parser.add_argument(
+        "-m",
+        "--merge",
+        action="store_true",
+        help="Fusionar con la carpeta del mismo día si ya existe, descartando archivos repetidos",
+    )
+    parser.add_argument(
+        "--prune-empty",
+        action="store_true",
+        help="Borrar las carpetas de día que estén vacías (o con solo .picasa.ini "
+        "o desktop.ini)",
+    )
+    plan_group = parser.add_mutually_exclusive_group()
+    plan_group.add_argument(
+        "--plan-out",
+        type=Path,
+        metavar="ARCHIVO",
+        help="Guardar en este archivo lo que se haría, para revisarlo y aplicarlo "
+        "después con --apply-plan (implica --dry-run)",
+    )
+    plan_group.add_argument(
+        "--apply-plan",
+        type=Path,
+        metavar="ARCHIVO",
+        help="Mover las carpetas como dice un plan guardado con --plan-out",
+    )
+    parser.add_argument(
+        "--metrics-out",
+        type=Path,
+        help="Guardar los tiempos y contadores del proceso en este archivo JSON",
+    )
+    parser.add_argument(
+        "--profile",
+        type=Path,
+        help="Guardar un perfil de cProfile del proceso en este archivo",
+    )
     parser.add_argument(
         "-v",
         "--verbose",
@@ -235,7 +433,7 @@ def main() -> None:
         logging.getLogger().setLevel(logging.DEBUG)
 
     target_folder = args.target_folder
-    dry_run = args.dry_run
+    dry_run = args.dry_run or args.plan_out is not None
 
     # Validate target folder
     if not target_folder.exists():
@@ -246,20 +444,51 @@ def main() -> None:
         print(f"❌ Error: La ruta no es una carpeta: {target_folder}")
         return
 
+    plan = None
+    if args.apply_plan:
+        try:
+            plan = read_plan(args.apply_plan, "year_organizer")
+        except (OSError, ValueError) as e:
+            print(f"❌ Error en el plan: {e}")
+            return
+
     # Print configuration
     print(f"📂 Carpeta de destino: {target_folder}")
+    if plan is not None:
+        print(f"📝 Aplicando el plan {args.apply_plan} ({len(plan)} carpetas)")
     if dry_run:
         print("🔍 Modo simulación activado")
     print()
 
+    profiler = None
+    if args.profile:
+        import cProfile
+
+        profiler = cProfile.Profile()
+
     try:
-        organize_folders_by_year(target_folder, dry_run)
+        if profiler is not None:
+            profiler.enable()
+        organize_folders_by_year(
+            target_folder,
+            dry_run,
+            args.metrics_out,
+            args.merge,
+            args.prune_empty,
+            args.plan_out,
+            plan,
+        )
     except KeyboardInterrupt:
         print("\n⏹️  Proceso interrumpido por el usuario.")
     except (OSError, PermissionError) as e:
         print(f"\n❌ Error inesperado: {e}")
         if args.verbose:
             _logger.error("Error detallado: %s", e, exc_info=True)
+    finally:
+        if profiler is not None:
+            profiler.disable()
+            profiler.dump_stats(args.profile)
+            print(f"📈 Perfil guardado en {args.profile} (python -m pstats)")
 
 
 if __name__ == "__main__":